@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+分片搜索索引生成
+GitHot - GitHub热门项目评测
+
+原来的 layouts/index.json 把所有文章的标题、摘要、标签输出到一个 JSON 文件，
+首次搜索就要下载整个索引。本脚本按月份把索引拆成分片：
+
+static/search/
+├── manifest.json          # 分片列表（从新到旧）及每个分片的文章数、起始文档编号、内容哈希
+├── shards/2026-08.json    # 当月文章的 title / content / url / date / tags（从旧到新）
+└── terms/c3.json          # 倒排索引：词项 → 文档编号（按词项首字符分桶）
+
+搜索脚本先加载很小的 manifest，查询时只加载查询词所在的词项桶，
+求出命中文档后再加载这些文档所在的分片；无法分词的查询（如单个汉字）
+退回按从新到旧的顺序扫描分片。只有内容发生变化的文件会被重写。
+
+文档编号按从旧到新分配（无日期的独立页面在最前），新文章只会追加新的编号，
+已有文章的编号不变，因此新增一篇文章只改动它所在的分片和它包含的词项所在的桶。
+
+分词规则（static/js/search.js 中的 tokenize 与此保持一致）：
+- 英文与数字按连续字母数字切分为单词，长度至少2，查询时最后一个单词按前缀匹配
+- 中日文按相邻两个字切分为二元组（bigram），不依赖分词词典
+"""
+
+import os
+import re
+import ast
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11 时使用简单的逐行解析
+    tomllib = None
+
+
+INDEX_VERSION = 3
+EXCERPT_CHARS = 300
+TERM_BUCKETS = 16
+
+# 词项所在字段，与文档编号一起编码在倒排表中：(doc_id << 2) | 字段位
+FIELD_TITLE = 1
+FIELD_TAG = 2
+
+_TOKEN_RUN = re.compile(r'[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+')
+
+_HTML_TAG = re.compile(r'<[^>]+>')
+_MD_IMAGE = re.compile(r'!\[([^\]]*)\]\([^)]*\)')
+_MD_LINK = re.compile(r'\[([^\]]*)\]\([^)]*\)')
+_MD_SHORTCODE = re.compile(r'\{\{[<%].*?[%>]\}\}', re.S)
+_MD_MARKUP = re.compile(r'^\s{0,3}(?:#{1,6}\s*|>\s?|[-*+]\s+|\d+\.\s+)|[*_`~|]+', re.M)
+_WHITESPACE = re.compile(r'\s+')
+
+
+def split_front_matter(text: str) -> Tuple[Dict[str, Any], str]:
+    """
+    拆分 Hugo 文章的 front matter（TOML +++ 或 YAML ---）与正文
+
+    Returns:
+        (front matter 字典, 正文)
+    """
+    for delimiter in ('+++', '---'):
+        if text.startswith(delimiter):
+            parts = text.split(f"\n{delimiter}", 1)
+            if len(parts) != 2:
+                break
+            raw = parts[0][len(delimiter):]
+            body = parts[1].split('\n', 1)[1] if '\n' in parts[1] else ''
+            if delimiter == '+++' and tomllib is not None:
+                try:
+                    return tomllib.loads(raw), body
+                except tomllib.TOMLDecodeError:
+                    pass
+            return _parse_simple_front_matter(raw, '=' if delimiter == '+++' else ':'), body
+    return {}, text
+
+
+def _parse_simple_front_matter(raw: str, separator: str) -> Dict[str, Any]:
+    """逐行解析 key = value / key: value 形式的简单 front matter"""
+    data = {}
+    for line in raw.splitlines():
+        if separator not in line or line.lstrip().startswith('#'):
+            continue
+        key, value = line.split(separator, 1)
+        value = value.strip()
+        if value in ('true', 'false'):
+            data[key.strip()] = value == 'true'
+            continue
+        try:
+            data[key.strip()] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            data[key.strip()] = value
+    return data
+
+
+def plain_text(markdown: str) -> str:
+    """粗略去掉 Markdown / HTML 标记，得到与 Hugo .Plain 接近的纯文本"""
+    text = _MD_SHORTCODE.sub(' ', markdown)
+    text = _HTML_TAG.sub(' ', text)
+    text = _MD_IMAGE.sub(r'\1', text)
+    text = _MD_LINK.sub(r'\1', text)
+    text = _MD_MARKUP.sub('', text)
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    把文本切分为索引词项（英文单词 + 中文二元组），结果可能重复
+
+    Examples:
+        tokenize('Claude Code提示词') -> ['claude', 'code', '提示', '示词']
+    """
+    tokens = []
+    for run in _TOKEN_RUN.findall(text.lower()):
+        if run.isascii():
+            if len(run) >= 2:
+                tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def term_bucket(term: str) -> str:
+    """词项所在的桶：英文按首字母（保证前缀查询只需一个桶），中文按首字编码取模"""
+    first = term[0]
+    if first.isascii():
+        return first
+    return f"c{ord(first) % TERM_BUCKETS:x}"
+
+
+def truncate(text: str, limit: int = EXCERPT_CHARS) -> str:
+    return text if len(text) <= limit else text[:limit].rstrip() + '…'
+
+
+def parse_date(value: Any) -> Optional[datetime]:
+    """解析 front matter 中的日期（字符串或 TOML 日期时间）"""
+    if isinstance(value, datetime):
+        return value
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class SearchIndexBuilder:
+    """按月份分片的搜索索引生成器"""
+
+    def __init__(self, content_dir: str = 'content', output_dir: str = 'static/search', url_prefix: str = '/search'):
+        """
+        初始化生成器
+
+        Args:
+            content_dir: Hugo 内容目录
+            output_dir: 索引输出目录
+            url_prefix: 索引在站点中的URL前缀
+        """
+        self.content_dir = content_dir
+        self.output_dir = output_dir
+        self.shard_dir = os.path.join(output_dir, 'shards')
+        self.term_dir = os.path.join(output_dir, 'terms')
+        self.url_prefix = url_prefix.rstrip('/')
+
+    def collect_documents(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        """
+        读取所有文章与独立页面（与原 index.json 的范围一致）
+
+        草稿和未来日期的文章不会被 Hugo 发布，也不进入索引。
+
+        Returns:
+            文档列表，按日期从新到旧排序
+        """
+        now = now or datetime.now(timezone.utc)
+        documents = []
+        for rel_path in self._content_files():
+            with open(os.path.join(self.content_dir, rel_path), 'r', encoding='utf-8') as f:
+                front_matter, body = split_front_matter(f.read())
+            if front_matter.get('draft'):
+                continue
+
+            date = parse_date(front_matter.get('date'))
+            if date is not None:
+                if date.tzinfo is None:
+                    date = date.replace(tzinfo=timezone.utc)
+                if date > now:
+                    continue
+
+            tags = front_matter.get('tags')
+            documents.append({
+                'title': str(front_matter.get('title', '')),
+                'content': truncate(plain_text(body)),
+                'url': self._page_url(rel_path, front_matter),
+                'date': date.strftime('%Y-%m-%d') if date else '',
+                'tags': tags if isinstance(tags, list) else None
+            })
+
+        documents.sort(key=lambda doc: (doc['date'], doc['url']), reverse=True)
+        return documents
+
+    def build(self, documents: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        生成分片和 manifest，只重写内容变化的文件
+
+        Returns:
+            manifest 内容，附带本次写入/删除的分片数（_written / _removed，不写入文件）
+        """
+        if documents is None:
+            documents = self.collect_documents()
+
+        shards: Dict[str, List[Dict[str, Any]]] = {}
+        for doc in documents:
+            shards.setdefault(doc['date'][:7] or 'undated', []).append(doc)
+
+        os.makedirs(self.shard_dir, exist_ok=True)
+        entries = []
+        ordered = []
+        written = 0
+        # 文档编号从旧到新分配（没有日期的页面在最前），新文章追加在末尾，已有编号保持不变
+        for shard_id in sorted(shards, key=lambda key: (key != 'undated', key)):
+            docs = sorted(shards[shard_id], key=lambda doc: (doc['date'], doc['url']))
+            payload = json.dumps(docs, ensure_ascii=False, separators=(',', ':'))
+            if self._write_if_changed(os.path.join(self.shard_dir, f"{shard_id}.json"), payload):
+                written += 1
+            entries.append({
+                'id': shard_id,
+                'url': f"{self.url_prefix}/shards/{shard_id}.json",
+                'count': len(docs),
+                'offset': len(ordered),
+                'hash': hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+            })
+            ordered.extend(docs)
+        # manifest 中的分片从新到旧排列，供扫描时优先加载最近的分片
+        entries.reverse()
+
+        removed = self._remove_stale(self.shard_dir, shards)
+
+        # 文档编号 = 文档在各分片（从旧到新）首尾相接后的位置，分片内位置 = 编号 - offset
+        buckets = self.build_terms(ordered)
+        os.makedirs(self.term_dir, exist_ok=True)
+        term_entries = {}
+        for bucket in sorted(buckets):
+            payload = json.dumps(buckets[bucket], ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+            if self._write_if_changed(os.path.join(self.term_dir, f"{bucket}.json"), payload):
+                written += 1
+            term_entries[bucket] = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+        removed += self._remove_stale(self.term_dir, buckets)
+
+        manifest = {
+            'version': INDEX_VERSION,
+            'total': len(documents),
+            'shards': entries,
+            'terms': {'url': f"{self.url_prefix}/terms/", 'buckets': term_entries}
+        }
+        self._write_if_changed(os.path.join(self.output_dir, 'manifest.json'),
+                               json.dumps(manifest, ensure_ascii=False, indent=2))
+        return {**manifest, '_written': written, '_removed': removed}
+
+    @staticmethod
+    def build_terms(documents: List[Dict[str, Any]]) -> Dict[str, Dict[str, List[int]]]:
+        """
+        生成按桶划分的倒排索引
+
+        Args:
+            documents: 按文档编号排列的文档
+
+        Returns:
+            {桶: {词项: 倒排表}}，倒排表为 (doc_id << 2 | 字段位) 升序后的差值编码
+        """
+        postings: Dict[str, Dict[int, int]] = {}
+        for doc_id, doc in enumerate(documents):
+            fields = [(doc['title'], FIELD_TITLE), (doc['content'], 0)]
+            fields.extend((tag, FIELD_TAG) for tag in doc.get('tags') or [])
+            for text, field in fields:
+                for term in tokenize(str(text)):
+                    docs = postings.setdefault(term, {})
+                    docs[doc_id] = docs.get(doc_id, 0) | field
+
+        buckets: Dict[str, Dict[str, List[int]]] = {}
+        for term, docs in postings.items():
+            previous = 0
+            encoded = []
+            for doc_id in sorted(docs):
+                value = (doc_id << 2) | docs[doc_id]
+                encoded.append(value - previous)
+                previous = value
+            buckets.setdefault(term_bucket(term), {})[term] = encoded
+        return buckets
+
+    def _content_files(self) -> List[str]:
+        """content/posts 下的文章及 content 根目录下的独立页面"""
+        files = []
+        for root, dirs, names in os.walk(self.content_dir):
+            rel_root = os.path.relpath(root, self.content_dir).replace(os.sep, '/')
+            if rel_root != '.' and rel_root.split('/')[0] != 'posts':
+                continue
+            for name in names:
+                if name.endswith('.md') and not name.startswith('_index'):
+                    files.append(name if rel_root == '.' else f"{rel_root}/{name}")
+        return sorted(files)
+
+    @staticmethod
+    def _page_url(rel_path: str, front_matter: Dict[str, Any]) -> str:
+        """与 Hugo 默认规则一致的页面URL（支持 front matter 中的 url / slug）"""
+        if front_matter.get('url'):
+            return str(front_matter['url'])
+        directory, filename = os.path.split(rel_path)
+        stem = str(front_matter.get('slug') or os.path.splitext(filename)[0])
+        return f"/{directory}/{stem}/" if directory else f"/{stem}/"
+
+    @staticmethod
+    def _remove_stale(directory: str, keep: Dict[str, Any]) -> int:
+        removed = 0
+        for name in os.listdir(directory):
+            if name.endswith('.json') and name[:-5] not in keep:
+                os.remove(os.path.join(directory, name))
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _write_if_changed(path: str, payload: str) -> bool:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == payload:
+                    return False
+        except FileNotFoundError:
+            pass
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+        return True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='生成按月分片的站内搜索索引')
+    parser.add_argument('--content-dir', default='content', help='Hugo内容目录')
+    parser.add_argument('--output-dir', default='static/search', help='索引输出目录')
+    args = parser.parse_args(argv)
+
+    builder = SearchIndexBuilder(args.content_dir, args.output_dir)
+    manifest = builder.build()
+
+    print(f"🔍 搜索索引: {manifest['total']} 篇文章，{len(manifest['shards'])} 个分片，"
+          f"{len(manifest['terms']['buckets'])} 个词项桶")
+    print(f"  - 更新文件: {manifest['_written']}，删除文件: {manifest['_removed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
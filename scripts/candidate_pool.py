@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+跨分析器共享的候选项目池
+GitHot - GitHub热门项目评测
+
+ClaudeAgentAnalyzer 与 ClaudePromptsAnalyzer 各自搜索 GitHub，关键词有重叠
+（claude-code、claude-agent 等），同一仓库一天内可能被获取、补充详情和评估两次，
+甚至出现在两篇文章里。候选池提供：
+
+- 当日搜索结果缓存：相同查询只请求一次
+- 当日详情缓存：按 ProjectDeduplicator 的项目标识符（owner/repo）缓存 README、
+  最近提交、语言、Releases、Issues 等字段，并发请求同一字段时只有一个线程真正获取
+- 选用登记（claim）：仓库被某个分析器选入文章后登记到 data/featured_projects.json，
+  其他分析器不再选用，避免同一仓库出现在两篇文章中
+
+搜索和详情缓存只在进程内有效（统一调度器 run_daily_analysis.py 为所有分析器注入
+同一个候选池）；选用登记持久化，单独运行各分析器时同样生效。
+各分析器仍按自己的过滤条件从池中选择项目。
+"""
+
+import os
+import json
+import datetime
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Callable, Iterable, Tuple
+
+from project_deduplicator import project_identifier
+
+FEATURED_VERSION = 1
+DEFAULT_FEATURED_PATH = 'data/featured_projects.json'
+
+
+class CandidatePool:
+    """候选项目池（线程安全）"""
+
+    def __init__(self,
+                 featured_path: str = DEFAULT_FEATURED_PATH,
+                 today: Callable[[], datetime.date] = datetime.date.today):
+        """
+        初始化候选池
+
+        Args:
+            featured_path: 选用登记文件路径
+            today: 日期函数（跨天时清空当日缓存，便于测试）
+        """
+        self.featured_path = featured_path
+        self.today = today
+        self._lock = threading.Lock()
+        self._day = today()
+        self._entries: Dict[Tuple, Future] = {}
+        self._featured: Optional[Dict[str, Dict[str, Any]]] = None
+        self.stats = {'search_hits': 0, 'search_misses': 0, 'field_hits': 0, 'field_misses': 0}
+
+    # ---- 当日缓存 ----
+
+    def _get_or_fetch(self, key: Tuple, fetch: Callable[[], Any], kind: str) -> Any:
+        """
+        获取缓存值，没有时调用 fetch
+
+        同一键的并发请求等待第一个请求的结果；fetch 返回 None 或抛出异常时不缓存，
+        之后的调用会重新获取。
+        """
+        with self._lock:
+            today = self.today()
+            if today != self._day:
+                self._day = today
+                self._entries.clear()
+            future = self._entries.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._entries[key] = future
+            self.stats[f"{kind}_{'misses' if owner else 'hits'}"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+        except BaseException as e:
+            self._discard(key, future)
+            future.set_exception(e)
+            raise
+        if value is None:
+            self._discard(key, future)
+        future.set_result(value)
+        return value
+
+    def _discard(self, key: Tuple, future: Future) -> None:
+        with self._lock:
+            if self._entries.get(key) is future:
+                del self._entries[key]
+
+    def search(self, query: str, per_page: int, fetch: Callable[[], Optional[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+        """
+        当日缓存的仓库搜索
+
+        Args:
+            query: 搜索查询
+            per_page: 每页结果数（与查询一起作为缓存键）
+            fetch: 实际执行搜索的函数，失败时返回None
+
+        Returns:
+            搜索结果的浅拷贝（调用方可以自由修改）
+        """
+        items = self._get_or_fetch(('search', query, per_page), fetch, 'search')
+        return [dict(item) for item in items or []]
+
+    def field(self, project: Dict[str, Any], name: str, fetch: Callable[[], Any]) -> Any:
+        """
+        当日缓存的项目详情字段
+
+        Args:
+            project: 项目信息（用于计算标识符）
+            name: 字段名，如 'readme_content'、'recent_commits'
+            fetch: 获取字段值的函数，失败时返回None或抛出异常
+
+        Returns:
+            字段值
+        """
+        return self._get_or_fetch(('field', project_identifier(project), name), fetch, 'field')
+
+    def cached_fields(self, project: Dict[str, Any], names: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """已缓存的字段（任一字段缺失或仍在获取时返回None）"""
+        identifier = project_identifier(project)
+        result = {}
+        with self._lock:
+            if self.today() != self._day:
+                return None
+            for name in names:
+                future = self._entries.get(('field', identifier, name))
+                if future is None or not future.done():
+                    return None
+                result[name] = future.result()
+        return result
+
+    def store_fields(self, project: Dict[str, Any], values: Dict[str, Any]) -> None:
+        """写入批量获取（如GraphQL）得到的字段，已有的字段不覆盖"""
+        identifier = project_identifier(project)
+        with self._lock:
+            for name, value in values.items():
+                key = ('field', identifier, name)
+                if value is None or key in self._entries:
+                    continue
+                future = Future()
+                future.set_result(value)
+                self._entries[key] = future
+
+    # ---- 选用登记 ----
+
+    def _load_featured(self) -> Dict[str, Dict[str, Any]]:
+        """加载选用登记（持锁调用）"""
+        if self._featured is None:
+            self._featured = {}
+            try:
+                with open(self.featured_path, 'r', encoding='utf-8') as f:
+                    self._featured = json.load(f).get('projects', {})
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"⚠️  读取选用记录失败: {e}")
+        return self._featured
+
+    def _save_featured(self) -> None:
+        """原子写入选用登记（持锁调用）"""
+        directory = os.path.dirname(self.featured_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.featured_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': FEATURED_VERSION, 'projects': self._featured},
+                          f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.featured_path)
+        except OSError as e:
+            print(f"⚠️  保存选用记录失败: {e}")
+
+    def claimed_by(self, project: Dict[str, Any]) -> Optional[str]:
+        """返回已选用该项目的分析器名称，未被选用时返回None"""
+        with self._lock:
+            record = self._load_featured().get(project_identifier(project))
+        return record.get('analyzer') if record else None
+
+    def is_available(self, project: Dict[str, Any], analyzer: str) -> bool:
+        """项目未被其他分析器选用"""
+        return self.claimed_by(project) in (None, analyzer)
+
+    def claim(self, project: Dict[str, Any], analyzer: str) -> bool:
+        """
+        登记分析器选用该项目
+
+        Returns:
+            True: 登记成功（或已由同一分析器登记）
+            False: 已被其他分析器选用
+        """
+        identifier = project_identifier(project)
+        with self._lock:
+            featured = self._load_featured()
+            record = featured.get(identifier)
+            if record:
+                return record.get('analyzer') == analyzer
+            featured[identifier] = {
+                'analyzer': analyzer,
+                'date': self.today().isoformat(),
+            }
+            self._save_featured()
+        return True
+
+    def release(self, project: Dict[str, Any], analyzer: str) -> None:
+        """撤销登记（文章生成失败时调用）"""
+        identifier = project_identifier(project)
+        with self._lock:
+            featured = self._load_featured()
+            if featured.get(identifier, {}).get('analyzer') == analyzer:
+                del featured[identifier]
+                self._save_featured()
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取缓存命中统计"""
+        with self._lock:
+            return dict(self.stats)
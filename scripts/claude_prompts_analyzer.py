@@ -4,19 +4,28 @@ Claude Code Prompts项目自动分析和评测生成器
 每日抓取GitHub上最热门的Claude Code Prompts项目和教程，生成专业评测文章
 """
 
-import requests
 import json
 import os
 import datetime
 from typing import List, Dict, Any, Set
-import time
 import re
 from project_deduplicator import ProjectDeduplicator
+from http_client import HTTPClient, get_shared_client
+from pipeline_profiler import pipeline_run, profiled
+from candidate_pool import CandidatePool
+from star_history import StarHistory
+from readme_loader import ReadmeLoader, readme_text
+
+# 候选池中的选用登记名称
+CLAIM_NAME = 'claude_prompts'
 
 
 class ClaudePromptsAnalyzer:
-    def __init__(self, github_token: str = None):
+    def __init__(self, github_token: str = None, http_client: HTTPClient = None,
+                 deduplicator: ProjectDeduplicator = None, candidate_pool: CandidatePool = None,
+                 star_history: StarHistory = None, readme_loader: ReadmeLoader = None):
         self.github_token = github_token
+        self.http = http_client or get_shared_client()
         self.headers = {
             'Accept': 'application/vnd.github.v3+json',
             'User-Agent': 'Claude-Prompts-Analyzer/1.0'
@@ -26,7 +35,13 @@ class ClaudePromptsAnalyzer:
 
         self.history_file = 'data/claude_prompts_projects.json'
         self.ensure_data_directory()
-        self.deduplicator = ProjectDeduplicator(self.history_file)
+        self.deduplicator = deduplicator or ProjectDeduplicator(self.history_file)
+        # 跨分析器共享的候选池（搜索/详情当日缓存与选用登记）
+        self.candidate_pool = candidate_pool or CandidatePool()
+        # Star 历史快照（与 Claude Agent 分析器共用，用于计算真实增速）
+        self.star_history = star_history or StarHistory()
+        # README 按需加载（流式读取摘要，内容未变化时复用本地摘要）
+        self.readme_loader = readme_loader or ReadmeLoader(self.headers, self.http)
 
         self.search_keywords = [
             'claude code',
@@ -52,18 +67,20 @@ class ClaudePromptsAnalyzer:
             'order': 'desc',
             'per_page': per_page
         }
-        try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=30)
-            if response.status_code == 403:
-                print("⚠️  GitHub API速率限制，等待重试...")
-                time.sleep(60)
-                response = requests.get(url, headers=self.headers, params=params, timeout=30)
+        def fetch() -> List[Dict]:
+            # 速率限制由共享HTTP客户端的配额调度器处理（限流时按 Retry-After/重置时间等待后重试）
+            response = self.http.get(url, headers=self.headers, params=params, timeout=30)
             response.raise_for_status()
             return response.json().get('items', [])
+
+        try:
+            # 同一查询当日只请求一次，结果与其他分析器共享
+            return self.candidate_pool.search(query, per_page, fetch)
         except Exception as e:
             print(f"❌ 搜索失败 ({query}): {e}")
             return []
 
+    @profiled('github.search')
     def search_github_repositories(self, keyword: str, days_back: int = 30) -> List[Dict]:
         """双轨搜索：新项目 + 活跃成熟项目"""
         date_filter = (datetime.datetime.now() - datetime.timedelta(days=days_back)).strftime('%Y-%m-%d')
@@ -73,8 +90,6 @@ class ClaudePromptsAnalyzer:
         print(f"🔍 搜索新项目: {keyword}")
         raw_new = self._search_github(query_new, per_page=15)
 
-        time.sleep(1)
-
         # 轨道B: 持续活跃的成熟项目
         query_active = f"{keyword} pushed:>{date_filter} stars:>50"
         print(f"🔍 搜索活跃项目: {keyword}")
@@ -100,6 +115,7 @@ class ClaudePromptsAnalyzer:
                     'topics': repo.get('topics', []),
                     'created_at': repo['created_at'],
                     'updated_at': repo['updated_at'],
+                    'pushed_at': repo.get('pushed_at'),
                     'keyword': keyword
                 })
 
@@ -136,32 +152,20 @@ class ClaudePromptsAnalyzer:
             pass
         return True
 
+    @profiled('github.details')
     def get_repository_details(self, repo: Dict) -> Dict:
-        """获取仓库详细信息"""
+        """
+        获取仓库详细信息（README 和最近提交经候选池缓存，与其他分析器共享）
+
+        README 只挂上加载函数，由 readme_text 在质量分析等阶段首次访问时才获取。
+        """
         try:
-            readme_url = f"https://api.github.com/repos/{repo['full_name']}/readme"
-            readme_response = requests.get(readme_url, headers=self.headers, timeout=15)
-            readme_content = ""
-            if readme_response.status_code == 200:
-                readme_data = readme_response.json()
-                if readme_data.get('content'):
-                    import base64
-                    readme_content = base64.b64decode(readme_data['content']).decode('utf-8', errors='ignore')
-                    readme_content = readme_content[:2000]
-
-            commits_url = f"https://api.github.com/repos/{repo['full_name']}/commits"
-            commits_response = requests.get(commits_url, headers=self.headers, params={'per_page': 5}, timeout=15)
-            recent_commits = []
-            if commits_response.status_code == 200:
-                for commit in commits_response.json():
-                    recent_commits.append({
-                        'message': commit['commit']['message'][:100],
-                        'date': commit['commit']['author']['date'],
-                        'author': commit['commit']['author']['name']
-                    })
-
-            repo['readme_content'] = readme_content
-            repo['recent_commits'] = recent_commits
+            repo['readme_loader'] = lambda: self.candidate_pool.field(
+                repo, 'readme_content', lambda: self.readme_loader.load(repo)
+            )
+            repo['recent_commits'] = self.candidate_pool.field(
+                repo, 'recent_commits', lambda: self._fetch_recent_commits(repo['full_name'])
+            )
             return repo
 
         except Exception as e:
@@ -170,6 +174,21 @@ class ClaudePromptsAnalyzer:
             repo['recent_commits'] = []
             return repo
 
+    def _fetch_recent_commits(self, full_name: str) -> List[Dict]:
+        """获取最近3次提交"""
+        commits_url = f"https://api.github.com/repos/{full_name}/commits"
+        commits_response = self.http.get(commits_url, headers=self.headers, params={'per_page': 3}, timeout=15)
+        if commits_response.status_code != 200:
+            return []
+        return [
+            {
+                'message': commit['commit']['message'][:100],
+                'date': commit['commit']['author']['date'],
+                'author': commit['commit']['author']['name']
+            }
+            for commit in commits_response.json()[:3]
+        ]
+
     def analyze_project_quality(self, repo: Dict) -> Dict:
         """分析项目质量"""
         score = 0
@@ -191,7 +210,7 @@ class ClaudePromptsAnalyzer:
         else:
             analysis['weaknesses'].append("Star数量较少，可能是新项目")
 
-        readme = repo.get('readme_content', '')
+        readme = readme_text(repo)
         if len(readme) > 500:
             score += 15
             analysis['strengths'].append("详细的README文档")
@@ -237,6 +256,7 @@ class ClaudePromptsAnalyzer:
 
         return analysis
 
+    @profiled('render.article')
     def generate_article(self, projects: List[Dict]) -> bool:
         """生成评测文章"""
         if not projects:
@@ -390,6 +410,7 @@ hidden = false
             print(f"❌ 生成文章失败: {e}")
             return False
 
+    @profiled('claude_prompts.run_analysis')
     def run_analysis(self, days_back: int = 30, max_projects: int = 3) -> bool:
         """运行完整的分析流程"""
         print("🚀 开始Claude Code项目分析...")
@@ -400,15 +421,27 @@ hidden = false
         all_projects = []
         MAX_PER_KEYWORD = 10
 
+        candidates = []
         for keyword in self.search_keywords:
             repositories = self.search_github_repositories(keyword, days_back)
             # 按 stars 排序，每关键词最多取 top N
             repositories.sort(key=lambda x: x['stars'], reverse=True)
-            repositories = repositories[:MAX_PER_KEYWORD]
+            candidates.extend(repositories[:MAX_PER_KEYWORD])
 
-            for repo in repositories:
-                if self.deduplicator.is_duplicate_project(repo):
-                    continue
+        try:
+            self.star_history.record(candidates)
+        except Exception as e:
+            print(f"⚠️  Star历史记录失败: {e}")
+
+        # 一次性过滤已分析项目及不同关键词之间的重复项目，以及已被其他分析器选用的项目
+        new_repositories = [
+            repo for repo in self.deduplicator.filter_new_projects(candidates)
+            if self.candidate_pool.is_available(repo, CLAIM_NAME)
+        ]
+
+        # 批量标记已分析项目，循环结束时统一写入历史文件
+        with self.deduplicator.batch():
+            for repo in new_repositories:
                 if not self._is_quality_project(repo):
                     continue
 
@@ -420,8 +453,6 @@ hidden = false
                 # 立即标记为已分析，防止文章生成失败时丢失去重状态
                 self.deduplicator.add_analyzed_project(repo)
 
-            time.sleep(2)
-
         if all_projects:
             # 获取最近文章中已包含的项目（用于多样性采样）
             recent_project_names = self.get_recent_article_projects(days=3)
@@ -435,17 +466,28 @@ hidden = false
             
             # 按综合分数排序
             all_projects.sort(key=lambda x: x['final_score'], reverse=True)
-            top_projects = all_projects[:max_projects]
+
+            # 按分数依次登记选用，其他分析器同时选中的项目让给对方
+            top_projects = []
+            for project in all_projects:
+                if len(top_projects) >= max_projects:
+                    break
+                if self.candidate_pool.claim(project, CLAIM_NAME):
+                    top_projects.append(project)
+                else:
+                    print(f"⏭️  {project['name']} 已被其他分析器选用，跳过")
             
             print(f"📊 项目选择详情:")
             for i, p in enumerate(top_projects, 1):
                 freshness_label = "🆕新项目" if p['freshness_score'] > 1.2 else "⭐成熟项目"
                 print(f"  {i}. {p['name']} (stars:{p['stars']}, fresh:{p['freshness_score']:.2f}, final:{p['final_score']:.2f}) [{freshness_label}]")
             
-            success = self.generate_article(top_projects)
+            success = self.generate_article(top_projects) if top_projects else False
             if success:
                 print(f"🎉 分析完成！共分析 {len(top_projects)} 个项目")
                 return True
+            for project in top_projects:
+                self.candidate_pool.release(project, CLAIM_NAME)
 
         print("📝 今日无新项目需要分析")
         return False
@@ -568,8 +610,10 @@ def main():
     days_back = int(os.getenv('DAYS_BACK', 30))
     max_projects = int(os.getenv('MAX_PROJECTS', 3))
 
-    analyzer = ClaudePromptsAnalyzer(github_token)
-    success = analyzer.run_analysis(days_back, max_projects)
+    with pipeline_run('claude_prompts'):
+        analyzer = ClaudePromptsAnalyzer(github_token)
+        success = analyzer.run_analysis(days_back, max_projects)
+        analyzer.deduplicator.close()
 
     if not success:
         print("❌ 分析过程中出现问题")
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Hugo 内容清单（路径 → SHA-256）
+GitHot - GitHub热门项目评测
+
+每日工作流生成文章后，对 content/ 下的文件计算哈希并与上次提交的清单比较：
+- 输出新增 / 修改 / 删除的文件及对应页面URL，供构建与部署步骤使用
+- 没有任何变化时输出 has_changes=false，工作流跳过 Hugo 构建和提交
+- 清单保存在 data/content_manifest.json，随文章一起提交
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+MANIFEST_VERSION = 1
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def page_url(rel_path: str) -> str:
+    """
+    内容文件对应的页面URL（Hugo 默认 permalink 规则）
+
+    Args:
+        rel_path: 相对 content 目录的路径，如 posts/foo.md
+
+    Returns:
+        页面URL，如 /posts/foo/
+    """
+    directory, filename = os.path.split(rel_path)
+    stem, ext = os.path.splitext(filename)
+    if ext != '.md':
+        return f"/{rel_path}"
+    if stem in ('_index', 'index'):
+        return f"/{directory}/" if directory else '/'
+    return f"/{directory}/{stem}/" if directory else f"/{stem}/"
+
+
+class ContentManifest:
+    """content 目录的文件哈希清单"""
+
+    def __init__(self, content_dir: str = 'content', manifest_path: str = 'data/content_manifest.json'):
+        """
+        初始化清单
+
+        Args:
+            content_dir: Hugo 内容目录
+            manifest_path: 清单文件路径
+        """
+        self.content_dir = content_dir
+        self.manifest_path = manifest_path
+
+    def load(self) -> Dict[str, str]:
+        """读取上次保存的清单，不存在或损坏时返回空清单"""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data.get('files', {})
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            print(f"⚠️  读取内容清单失败，将视为全部新增: {e}")
+            return {}
+
+    def scan(self) -> Dict[str, str]:
+        """计算 content 目录下所有文件的哈希（路径统一为 / 分隔）"""
+        files = {}
+        for root, dirs, names in os.walk(self.content_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(names):
+                if name.startswith('.'):
+                    continue
+                path = os.path.join(root, name)
+                rel_path = os.path.relpath(path, self.content_dir).replace(os.sep, '/')
+                files[rel_path] = hash_file(path)
+        return files
+
+    @staticmethod
+    def diff(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        比较两个清单
+
+        Returns:
+            {'added': [...], 'modified': [...], 'removed': [...]}，均已排序
+        """
+        return {
+            'added': sorted(path for path in new if path not in old),
+            'modified': sorted(path for path in new if path in old and old[path] != new[path]),
+            'removed': sorted(path for path in old if path not in new)
+        }
+
+    def save(self, files: Dict[str, str]) -> bool:
+        """原子写入清单"""
+        directory = os.path.dirname(self.manifest_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        data = {
+            'version': MANIFEST_VERSION,
+            'updated_at': datetime.now().isoformat(),
+            'total_files': len(files),
+            'files': files
+        }
+        tmp_path = f"{self.manifest_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.manifest_path)
+            return True
+        except Exception as e:
+            print(f"⚠️  保存内容清单失败: {e}")
+            return False
+
+    def update(self, dry_run: bool = False) -> Dict[str, List[str]]:
+        """
+        扫描内容目录，与上次清单比较，并在有变化时保存新清单
+
+        Args:
+            dry_run: 只比较不保存
+
+        Returns:
+            变化列表，见 diff
+        """
+        old = self.load()
+        new = self.scan()
+        changes = self.diff(old, new)
+        if not dry_run and any(changes.values()):
+            self.save(new)
+        return changes
+
+
+def write_github_output(changes: Dict[str, List[str]], output_path: str) -> None:
+    """把变化写入 GITHUB_OUTPUT（多行值使用分隔符语法）"""
+    changed = changes['added'] + changes['modified']
+    pages = [page_url(path) for path in changed + changes['removed']]
+    total = len(changed) + len(changes['removed'])
+
+    with open(output_path, 'a', encoding='utf-8') as f:
+        f.write(f"has_changes={'true' if total else 'false'}\n")
+        f.write(f"changed_count={total}\n")
+        for key in ('added', 'modified', 'removed'):
+            f.write(f"{key}_count={len(changes[key])}\n")
+        for key, values in (('changed_files', changed + changes['removed']), ('changed_pages', pages)):
+            f.write(f"{key}<<EOF_{key.upper()}\n")
+            for value in values:
+                f.write(f"{value}\n")
+            f.write(f"EOF_{key.upper()}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='Hugo内容清单：检测本次运行改动的文章')
+    parser.add_argument('--content-dir', default='content', help='Hugo内容目录')
+    parser.add_argument('--manifest', default='data/content_manifest.json', help='清单文件路径')
+    parser.add_argument('--dry-run', action='store_true', help='只输出变化，不更新清单')
+    args = parser.parse_args(argv)
+
+    manifest = ContentManifest(args.content_dir, args.manifest)
+    changes = manifest.update(dry_run=args.dry_run)
+
+    total = sum(len(paths) for paths in changes.values())
+    print(f"📋 内容变化: 新增 {len(changes['added'])}，修改 {len(changes['modified'])}，删除 {len(changes['removed'])}")
+    for key, mark in (('added', '+'), ('modified', '~'), ('removed', '-')):
+        for path in changes[key]:
+            print(f"  {mark} {path} -> {page_url(path)}")
+    if not total:
+        print("ℹ️ 内容没有变化，可跳过构建和提交")
+
+    github_output = os.getenv('GITHUB_OUTPUT')
+    if github_output:
+        write_github_output(changes, github_output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,16 +8,38 @@ import requests
 import json
 import os
 import datetime
-from typing import List, Dict, Any, Set
-import time
+from typing import List, Dict, Any, Set, Callable, Optional
 import re
 import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from project_deduplicator import ProjectDeduplicator
 from github_repo_evaluator import GitHubRepoEvaluator
+from http_client import HTTPClient, get_shared_client
+from github_graphql import GitHubGraphQLFetcher
+from pipeline_profiler import pipeline_run, profiled, propagate
+from candidate_pool import CandidatePool
+from star_history import StarHistory
+from project_deduplicator import project_identifier
+from readme_loader import ReadmeLoader, readme_text
+
+# 候选池中的选用登记名称
+CLAIM_NAME = 'claude_agent'
+
+# 排序使用的 Star 增速窗口（天），历史不足时按实际记录天数计算
+VELOCITY_WINDOW = int(os.getenv('STAR_VELOCITY_WINDOW', '7'))
+
+# 与 GitHubGraphQLFetcher 返回结构一致的详情字段（最近3次提交）
+# README 不在其中：由 readme_loader 在评估、分类首次访问时才获取
+DETAIL_FIELDS = ('recent_commits', 'languages', 'releases', 'issues')
+
 
 class ClaudeAgentAnalyzer:
-    def __init__(self, github_token: str = None):
+    def __init__(self, github_token: str = None, http_client: HTTPClient = None,
+                 deduplicator: ProjectDeduplicator = None, candidate_pool: CandidatePool = None,
+                 star_history: StarHistory = None, readme_loader: ReadmeLoader = None):
         self.github_token = github_token
+        self.http = http_client or get_shared_client()
         self.headers = {
             'Accept': 'application/vnd.github.v3+json',
             'User-Agent': 'SmartWallex-Analyzer/1.0'
@@ -29,8 +51,27 @@ class ClaudeAgentAnalyzer:
         self.history_file = 'data/analyzed_projects.json'
         self.ensure_data_directory()
         
-        # 初始化项目去重器
-        self.deduplicator = ProjectDeduplicator(self.history_file)
+        # 初始化项目去重器（统一调度器会注入进程内共享的实例）
+        self.deduplicator = deduplicator or ProjectDeduplicator(self.history_file)
+
+        # 跨分析器共享的候选池（搜索/详情当日缓存与选用登记）
+        self.candidate_pool = candidate_pool or CandidatePool()
+
+        # Star 历史快照（每次搜索记录，用于计算真实增速）
+        self.star_history = star_history or StarHistory()
+
+        # README 按需加载（流式读取摘要，blob SHA 未变化时复用本地摘要）
+        self.readme_loader = readme_loader or ReadmeLoader(self.headers, self.http)
+
+        # GitHub并发请求上限（所有项目及子请求共享）
+        self.max_concurrency = max(1, int(os.getenv('GITHUB_MAX_CONCURRENCY', '8')))
+        self._request_slots = threading.BoundedSemaphore(self.max_concurrency)
+
+        # GraphQL批量获取详情（需要Token，GITHUB_GRAPHQL=0 时关闭）
+        self.graphql = GitHubGraphQLFetcher(
+            self.headers, self.http, batch_size=int(os.getenv('GITHUB_GRAPHQL_BATCH', '20'))
+        )
+        self.use_graphql = self.graphql.available and os.getenv('GITHUB_GRAPHQL', '1') != '0'
     
     def ensure_data_directory(self):
         """确保data目录存在"""
@@ -38,6 +79,7 @@ class ClaudeAgentAnalyzer:
     
 
     
+    @profiled('github.search')
     def search_claude_agents(self, days_back: int = 7, max_projects: int = 5) -> List[Dict[str, Any]]:
         """搜索热门项目，使用去重器确保不重复已分析的项目"""
 
@@ -58,35 +100,34 @@ class ClaudeAgentAnalyzer:
             try:
                 projects = strategy()
                 all_projects.extend(projects)
-                time.sleep(2)
             except Exception as e:
                 print(f"⚠️  搜索策略执行失败: {e}")
                 continue
 
-        # 使用去重器进行去重和过滤
-        unique_projects = {}
-        new_projects = []
-
-        for project in all_projects:
-            repo_id = project['id']
+        self._apply_star_velocity(all_projects)
 
-            if repo_id in unique_projects:
-                continue
+        # 使用去重器批量去重（含多个搜索策略之间的重复），再做质量过滤
+        unseen_projects = self.deduplicator.filter_new_projects(
+            all_projects,
+            on_duplicate=lambda project: print(f"⏭️  跳过已分析项目: {project['name']}")
+        )
+        new_projects = []
 
-            if self.deduplicator.is_duplicate_project(project):
-                print(f"⏭️  跳过已分析项目: {project['name']}")
+        for project in unseen_projects:
+            claimed_by = self.candidate_pool.claimed_by(project)
+            if claimed_by not in (None, CLAIM_NAME):
+                print(f"⏭️  跳过已被 {claimed_by} 选用的项目: {project['name']}")
                 continue
-
             if self._is_quality_project(project):
-                unique_projects[repo_id] = project
                 new_projects.append(project)
                 print(f"✅ 新项目候选: {project['name']} ({project['stargazers_count']} ⭐)")
 
-        # 按 stars 增量速度排序，优先 trending 来源
+        # 按 stars 增量速度排序，优先 trending 来源；实测增速与估算增速口径不同，只在同类之间比较
         sorted_projects = sorted(
             new_projects,
             key=lambda x: (
                 x.get('_source') == 'trending',  # trending 来源优先
+                x.get('_velocity_source') == 'measured',  # 有历史快照的项目优先
                 x.get('_stars_velocity', 0),
                 x['stargazers_count'],
                 -self._days_since_updated(x)
@@ -156,6 +197,11 @@ class ClaudeAgentAnalyzer:
 
         return projects
 
+    DEFAULT_TRENDING_LANGUAGES = [
+        'Python', 'JavaScript', 'TypeScript', 'Go', 'Rust',
+        'Java', 'C++', 'C', 'Ruby', 'Swift', 'Kotlin', 'Shell'
+    ]
+
     def _search_by_trending_now(self, mode: str = 'daily') -> List[Dict[str, Any]]:
         """
         按 GitHub Trending 风格搜索热门项目（所有语言）
@@ -163,11 +209,15 @@ class ClaudeAgentAnalyzer:
         mode=daily   - 今日活跃项目（pushed 最近1天）
         mode=weekly  - 本周活跃项目（pushed 最近7天）
         mode=balanced - 混合（1天+7天）
+
+        各语言的搜索并发执行（受搜索配额调度器约束），按完成顺序合并。
+        语言列表和每种语言的结果数可通过环境变量 TRENDING_LANGUAGES（逗号分隔）
+        和 TRENDING_PER_LANGUAGE 配置。
         """
-        trending_languages = [
-            'Python', 'JavaScript', 'TypeScript', 'Go', 'Rust',
-            'Java', 'C++', 'C', 'Ruby', 'Swift', 'Kotlin', 'Shell'
-        ]
+        languages_env = os.getenv('TRENDING_LANGUAGES', '')
+        trending_languages = [lang.strip() for lang in languages_env.split(',') if lang.strip()] \
+            or self.DEFAULT_TRENDING_LANGUAGES
+        per_language = int(os.getenv('TRENDING_PER_LANGUAGE', '5'))
 
         date_map = {'daily': 1, 'weekly': 7, 'balanced': 3}
         days = date_map.get(mode, 1)
@@ -176,21 +226,52 @@ class ClaudeAgentAnalyzer:
         start_date = end_date - datetime.timedelta(days=days)
         date_filter = start_date.strftime('%Y-%m-%d')
 
-        all_projects = []
-
-        for lang in trending_languages:
+        def search_language(lang: str) -> List[Dict[str, Any]]:
             query = f'language:{lang} pushed:>{date_filter} stars:>100'
-            results = self._search_github(query, per_page=5)
-            for p in results:
-                p['_stars_velocity'] = self._estimate_stars_velocity(p)
-            all_projects.extend(results)
-            time.sleep(1)
+            return self._search_github(query, per_page=per_language)
+
+        all_projects = []
 
-        for p in all_projects:
-            p['_source'] = 'trending'
+        with ThreadPoolExecutor(max_workers=min(len(trending_languages), self.max_concurrency)) as executor:
+            futures = [executor.submit(propagate(search_language), lang) for lang in trending_languages]
+            for future in as_completed(futures):
+                results = future.result()
+                for p in results:
+                    p['_source'] = 'trending'
+                all_projects.extend(results)
 
         return all_projects
 
+    def _apply_star_velocity(self, projects: List[Dict[str, Any]]) -> None:
+        """
+        记录本次看到的所有仓库的 Star 快照，并写入排序用的 _stars_velocity
+
+        有历史快照时使用窗口内的真实日均增量，否则回退到总星数/项目天数的估算；
+        _velocity_source 记录来源（measured / estimated），排序时两者不混合比较。
+        快照来自搜索结果本身，不产生额外请求。
+        """
+        if not projects:
+            return
+        try:
+            self.star_history.record(projects)
+            deltas = self.star_history.deltas(projects, (VELOCITY_WINDOW,))
+        except Exception as e:
+            print(f"⚠️  Star历史记录失败，使用估算增速: {e}")
+            deltas = {}
+
+        measured = 0
+        for project in projects:
+            delta = deltas.get(project_identifier(project), {}).get(VELOCITY_WINDOW)
+            if delta:
+                project['_stars_velocity'] = delta['stars_per_day']
+                project['_velocity_days'] = delta['days']
+                project['_velocity_source'] = 'measured'
+                measured += 1
+            else:
+                project['_stars_velocity'] = self._estimate_stars_velocity(project)
+                project['_velocity_source'] = 'estimated'
+        print(f"📈 Star增速: {measured}/{len(projects)} 个项目有历史快照（窗口 {VELOCITY_WINDOW} 天）")
+
     def _estimate_stars_velocity(self, project: Dict[str, Any]) -> float:
         """估算项目每日新增 stars 速度"""
         stars = project.get('stargazers_count', 1)
@@ -205,7 +286,11 @@ class ClaudeAgentAnalyzer:
             return 0.0
     
     def _search_github(self, query: str, per_page: int = 10) -> List[Dict[str, Any]]:
-        """执行GitHub搜索"""
+        """执行GitHub搜索（同一查询当日只请求一次，结果与其他分析器共享）"""
+        return self.candidate_pool.search(query, per_page, lambda: self._fetch_search(query, per_page))
+
+    def _fetch_search(self, query: str, per_page: int) -> List[Dict[str, Any]]:
+        """请求GitHub搜索API，失败时返回None"""
         try:
             search_url = 'https://api.github.com/search/repositories'
             params = {
@@ -215,18 +300,18 @@ class ClaudeAgentAnalyzer:
                 'per_page': per_page
             }
             
-            response = requests.get(search_url, headers=self.headers, params=params)
+            response = self.http.get(search_url, headers=self.headers, params=params)
             
             if response.status_code == 200:
                 data = response.json()
                 return data.get('items', [])
             else:
                 print(f"⚠️  搜索失败: {query}, 状态码: {response.status_code}")
-                return []
+                return None
                 
         except Exception as e:
             print(f"❌ 搜索执行失败: {e}")
-            return []
+            return None
     
     def _is_quality_project(self, project: Dict[str, Any]) -> bool:
         """判断项目是否符合质量标准"""
@@ -260,89 +345,169 @@ class ClaudeAgentAnalyzer:
         updated_at = datetime.datetime.strptime(project['updated_at'], '%Y-%m-%dT%H:%M:%SZ')
         return (datetime.datetime.now() - updated_at).days
     
+    def _github_get(self, url: str, **kwargs) -> requests.Response:
+        """在并发上限内执行GitHub GET请求"""
+        kwargs.setdefault('headers', self.headers)
+        with self._request_slots:
+            return self.http.get(url, **kwargs)
+
+    def _lazy_readme(self, project: Dict[str, Any], sha: Optional[str] = None) -> Callable[[], str]:
+        """
+        生成README延迟加载函数（放入 project_details['readme_loader']，由 readme_text 调用）
+
+        摘要经候选池缓存，与其他分析器共享；实际请求受并发上限约束。
+        """
+        def load_readme() -> str:
+            with self._request_slots:
+                return self.readme_loader.load(project, sha)
+
+        return lambda: self.candidate_pool.field(project, 'readme_content', load_readme)
+
+    def _fetch_recent_commits(self, repo_url: str) -> List[Dict[str, Any]]:
+        """获取最近的提交信息"""
+        commits_response = self._github_get(f"{repo_url}/commits?per_page=5")
+        if commits_response.status_code == 200:
+            commits_data = commits_response.json()
+            return [
+                {
+                    'message': commit['commit']['message'][:100],
+                    'date': commit['commit']['author']['date'],
+                    'author': commit['commit']['author']['name']
+                }
+                for commit in commits_data[:3]
+            ]
+        return []
+
+    def _fetch_languages(self, repo_url: str) -> Dict[str, int]:
+        """获取语言统计"""
+        languages_response = self._github_get(f"{repo_url}/languages")
+        if languages_response.status_code == 200:
+            return languages_response.json()
+        return {}
+
+    def _fetch_releases(self, repo_url: str) -> List[Dict[str, Any]]:
+        """获取 Releases（失败时返回空列表）"""
+        try:
+            releases_resp = self._github_get(f"{repo_url}/releases", timeout=10)
+            if releases_resp.status_code == 200:
+                return releases_resp.json()[:5]
+        except Exception:
+            pass
+        return []
+
+    def _fetch_issues(self, repo_url: str) -> List[Dict[str, Any]]:
+        """获取 Issues（失败时返回空列表）"""
+        try:
+            issues_resp = self._github_get(
+                f"{repo_url}/issues",
+                params={'state': 'all', 'per_page': 30},
+                timeout=10
+            )
+            if issues_resp.status_code == 200:
+                return issues_resp.json()
+        except Exception:
+            pass
+        return []
+
+    @profiled('github.details')
     def get_project_details(self, project: Dict[str, Any]) -> Dict[str, Any]:
-        """获取项目详细信息"""
+        """
+        获取项目详细信息（提交、语言、Releases、Issues 并发获取，README 按需加载）
+
+        各字段经候选池缓存，其他分析器当日已获取的字段不再请求。
+        """
         
         repo_url = project['url']
+        fetchers = {
+            'recent_commits': self._fetch_recent_commits,
+            'languages': self._fetch_languages,
+            'releases': self._fetch_releases,
+            'issues': self._fetch_issues,
+        }
         
         try:
-            # 获取README内容
-            readme_url = f"{repo_url}/readme"
-            readme_response = requests.get(readme_url, headers=self.headers)
-            readme_content = ""
-            
-            if readme_response.status_code == 200:
-                readme_data = readme_response.json()
-                if readme_data.get('encoding') == 'base64':
-                    import base64
-                    readme_content = base64.b64decode(readme_data['content']).decode('utf-8')
-            
-            # 获取最近的提交信息
-            commits_url = f"{repo_url}/commits"
-            commits_response = requests.get(f"{commits_url}?per_page=5", headers=self.headers)
-            recent_commits = []
-            
-            if commits_response.status_code == 200:
-                commits_data = commits_response.json()
-                recent_commits = [
-                    {
-                        'message': commit['commit']['message'][:100],
-                        'date': commit['commit']['author']['date'],
-                        'author': commit['commit']['author']['name']
-                    }
-                    for commit in commits_data[:3]
-                ]
-            
-            # 获取语言统计
-            languages_url = f"{repo_url}/languages"
-            languages_response = requests.get(languages_url, headers=self.headers)
-            languages = {}
-
-            if languages_response.status_code == 200:
-                languages = languages_response.json()
-
-            # 获取 Releases
-            releases = []
-            try:
-                releases_resp = requests.get(f"{repo_url}/releases", headers=self.headers, timeout=10)
-                if releases_resp.status_code == 200:
-                    releases = releases_resp.json()[:5]
-            except Exception:
-                pass
-
-            # 获取 Issues
-            issues = []
-            try:
-                issues_resp = requests.get(
-                    f"{repo_url}/issues",
-                    headers=self.headers,
-                    params={'state': 'all', 'per_page': 30},
-                    timeout=10
-                )
-                if issues_resp.status_code == 200:
-                    issues = issues_resp.json()
-            except Exception:
-                pass
+            with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+                futures = {
+                    key: executor.submit(propagate(self.candidate_pool.field), project, key,
+                                         lambda fetch=fetch: fetch(repo_url))
+                    for key, fetch in fetchers.items()
+                }
+                results = {key: future.result() for key, future in futures.items()}
 
             return {
                 'basic_info': project,
-                'readme_content': readme_content[:2000],
-                'recent_commits': recent_commits,
-                'languages': languages,
+                'readme_loader': self._lazy_readme(project),
+                'recent_commits': results['recent_commits'],
+                'languages': results['languages'],
                 'topics': project.get('topics', []),
-                'releases': releases,
-                'issues': issues
+                'releases': results['releases'],
+                'issues': results['issues']
             }
             
         except Exception as e:
             print(f"获取项目详情失败: {e}")
             return {'basic_info': project}
+
+    @profiled('github.details_batch')
+    def get_projects_details(self, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        并发获取多个项目的详细信息
+
+        配置了Token时优先使用GraphQL批量查询（每批最多 GITHUB_GRAPHQL_BATCH 个仓库一次请求），
+        否则所有项目及其子请求并发进行，实际并发的HTTP请求数受 GITHUB_MAX_CONCURRENCY 限制。
+        返回结果与输入项目顺序一致。
+        """
+        if not projects:
+            return []
+
+        if self.use_graphql:
+            try:
+                return self._get_projects_details_graphql(projects)
+            except Exception as e:
+                print(f"⚠️  GraphQL批量获取失败，回退到REST: {e}")
+
+        with ThreadPoolExecutor(max_workers=min(len(projects), self.max_concurrency)) as executor:
+            return list(executor.map(propagate(self.get_project_details), projects))
+
+    def _get_projects_details_graphql(self, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        通过GraphQL批量获取详情，README 只取 blob SHA，摘要按需加载
+
+        候选池中已有完整详情的项目不再查询，新获取的详情写回候选池。
+        GraphQL 返回 null 的仓库（重命名、删除或无权访问）改走 REST get_project_details。
+        """
+        cached = {}
+        for i, project in enumerate(projects):
+            fields = self.candidate_pool.cached_fields(project, DETAIL_FIELDS)
+            if fields is not None:
+                cached[i] = {'basic_info': project, 'topics': project.get('topics', []),
+                             'readme_loader': self._lazy_readme(project), **fields}
+        pending = [project for i, project in enumerate(projects) if i not in cached]
+        fetched = self.graphql.fetch_details(pending) if pending else []
+
+        missing = []
+        for i, details in enumerate(fetched):
+            if 'languages' not in details:
+                missing.append(i)
+                continue
+            self.candidate_pool.store_fields(details['basic_info'], {key: details[key] for key in DETAIL_FIELDS})
+            details['readme_loader'] = self._lazy_readme(details['basic_info'], details.pop('readme_sha', None))
+
+        if missing:
+            print(f"⚠️  GraphQL未返回 {len(missing)} 个仓库，改用REST获取详情")
+            with ThreadPoolExecutor(max_workers=min(len(missing), self.max_concurrency)) as executor:
+                retried = executor.map(propagate(self.get_project_details), [pending[i] for i in missing])
+                for i, details in zip(missing, retried):
+                    fetched[i] = details
+
+        fetched_iter = iter(fetched)
+        return [cached[i] if i in cached else next(fetched_iter) for i in range(len(projects))]
     
     def analyze_project_category(self, project_details: Dict[str, Any]) -> str:
         """分析项目类别"""
         
         basic_info = project_details['basic_info']
-        readme = project_details.get('readme_content', '').lower()
+        readme = readme_text(project_details).lower()
         topics = project_details.get('topics', [])
         description = basic_info.get('description', '').lower()
         
@@ -365,6 +530,7 @@ class ClaudeAgentAnalyzer:
         
         return 'AI助手工具'
     
+    @profiled('render.review')
     def generate_review_content(self, project_details: Dict[str, Any], evaluation_result: Dict = None) -> str:
         """生成评测文章内容"""
         
@@ -462,7 +628,7 @@ class ClaudeAgentAnalyzer:
 
         # 插入七维度评估报告
         if evaluation_result:
-            evaluator = GitHubRepoEvaluator(self.headers)
+            evaluator = GitHubRepoEvaluator(self.headers, self.http)
             content += '\n\n' + evaluator.render_markdown(evaluation_result, name)
 
         content += f"""
@@ -493,8 +659,16 @@ class ClaudeAgentAnalyzer:
 
         return content
 
-def main():
-    """主函数"""
+def main(analyzer: ClaudeAgentAnalyzer = None) -> int:
+    """
+    主函数
+
+    Args:
+        analyzer: 已创建的分析器（统一调度器注入共享HTTP客户端和去重器），默认按环境变量创建
+
+    Returns:
+        生成的文章数
+    """
     
     # 从环境变量获取参数
     days_back = int(os.getenv('DAYS_BACK', '7'))
@@ -516,7 +690,10 @@ def main():
         if not os.getenv('GITHUB_ACTIONS'):
             print("💡 提示: 请在 .env.local 文件中设置 GITHUB_TOKEN=your_token")
     
-    analyzer = ClaudeAgentAnalyzer(github_token)
+    # 注入的分析器（及其去重器）由调用方负责关闭
+    owns_analyzer = analyzer is None
+    if owns_analyzer:
+        analyzer = ClaudeAgentAnalyzer(github_token)
     
     print("🔍 开始搜索热门Claude Code Agent项目...")
     
@@ -528,12 +705,12 @@ def main():
         projects = analyzer.search_claude_agents(days_back=days_back, max_projects=max_projects)
     except Exception as e:
         print(f"❌ 搜索项目时出错: {e}")
-        return
+        return 0
     
     if not projects:
         print("❌ 未找到符合条件的新项目")
         print("💡 提示: 所有最近的项目可能都已经分析过了")
-        return
+        return 0
     
     print(f"✅ 找到 {len(projects)} 个新项目")
     
@@ -548,19 +725,24 @@ def main():
     
     if len(existing_articles) >= 3:  # 每日最多3篇
         print(f"ℹ️  今日已存在 {len(existing_articles)} 篇文章，达到每日限制")
-        return
+        return 0
     
     generated_count = 0
     
-    for i, project in enumerate(projects, 1):
+    # 并发获取所有候选项目的详细信息
+    print(f"⚡ 并发获取 {len(projects)} 个项目详情 (并发上限: {analyzer.max_concurrency})")
+    all_details = analyzer.get_projects_details(projects)
+    
+    for i, (project, project_details) in enumerate(zip(projects, all_details), 1):
+        if not analyzer.candidate_pool.claim(project, CLAIM_NAME):
+            print(f"⏭️  项目 {project['name']} 已被其他分析器选用，跳过")
+            continue
+
         try:
             print(f"\n📊 分析项目 {i}: {project['name']}")
-            
-            # 获取详细信息
-            project_details = analyzer.get_project_details(project)
 
             # 执行七维度评估
-            evaluator = GitHubRepoEvaluator(analyzer.headers)
+            evaluator = GitHubRepoEvaluator(analyzer.headers, analyzer.http)
             evaluation_result = evaluator.evaluate(project_details)
             print(f"📊 七维度评估: {evaluation_result['decision']} ({evaluation_result['total_score']}/7)")
 
@@ -676,13 +858,17 @@ hidden = false
             analyzer.deduplicator.add_analyzed_project(project)
             print(f"📝 已标记项目为已分析: {project['name']}")
             
-            # 避免API限制
-            time.sleep(2)
-            
         except Exception as e:
             print(f"❌ 处理项目 {project['name']} 时出错: {e}")
+            analyzer.candidate_pool.release(project, CLAIM_NAME)
             continue
     
+    # 保存去重历史（自行创建时关闭，追加日志后端会压缩回 v2 JSON 快照）
+    if owns_analyzer:
+        analyzer.deduplicator.close()
+    else:
+        analyzer.deduplicator.flush()
+    
     # 显示最终统计信息
     final_stats = analyzer.deduplicator.get_project_statistics()
     
@@ -693,5 +879,8 @@ hidden = false
         print(f"\n⚠️  未能生成任何文章")
         print(f"💡 建议: 尝试扩大搜索范围或等待新项目出现")
 
+    return generated_count
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with pipeline_run('claude_agents'):
+        main()
\ No newline at end of file
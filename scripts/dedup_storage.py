@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+项目去重历史存储后端
+
+ProjectDeduplicator 原先每添加一个项目就以 indent=2 重写整个历史文件，
+批量添加时总开销为 O(n²)。本模块把存储抽象为可插拔后端：
+
+- JSONFileStorage: 兼容现有 v2 JSON 格式，添加只修改内存，flush 时整体写入
+- JSONLLogStorage（默认）: v2 JSON 快照 + 追加式 JSONL 日志，每次添加只追加一行，
+  日志超过阈值或 close 时压缩回快照，提交到仓库的仍是 v2 JSON 文件
+
+两种后端都在内存中维护按标识符和按哈希的索引，查询均为 O(1)，
+并支持与 v2 JSON 格式互相导入导出。
+"""
+
+import os
+import abc
+import json
+import hashlib
+import datetime
+import threading
+from typing import Dict, Any, List, Optional, Union
+
+
+STORAGE_VERSION = '2.0'
+
+
+def migrate_v1_list(old_data: list) -> Dict[str, Any]:
+    """
+    将 v1 列表格式（仅包含 owner/repo）转换为 v2 字典格式
+
+    Args:
+        old_data: 旧格式的项目列表
+
+    Returns:
+        新格式的项目字典
+    """
+    migrated_data = {}
+    current_time = datetime.datetime.now().isoformat()
+
+    for project_key in old_data:
+        if isinstance(project_key, str):
+            migrated_data[project_key] = {
+                'added_date': current_time,
+                'project_hash': hashlib.sha256(project_key.encode('utf-8')).hexdigest(),
+                'github_url': f"https://github.com/{project_key}",
+                'stars_when_analyzed': 0,
+                'migrated_from_v1': True
+            }
+
+    print(f"✅ 已迁移 {len(migrated_data)} 个项目记录到新格式")
+    return migrated_data
+
+
+class DedupStorage(abc.ABC):
+    """去重历史存储后端基类（线程安全）"""
+
+    def __init__(self, path: str):
+        """
+        初始化存储后端
+
+        Args:
+            path: v2 JSON 历史文件路径
+        """
+        self.path = path
+        self.records: Dict[str, Dict[str, Any]] = {}
+        self._hash_index: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    # ---- 子类实现 ----
+
+    def _after_load(self) -> None:
+        """快照加载完成后的额外处理（如回放日志）"""
+
+    @abc.abstractmethod
+    def _persist(self, identifier: str, record: Dict[str, Any]) -> None:
+        """记录一次写入（由 put 在持锁时调用）"""
+
+    @abc.abstractmethod
+    def flush(self) -> None:
+        """将未持久化的修改写入磁盘"""
+
+    def close(self) -> None:
+        """刷新并释放资源"""
+        self.flush()
+
+    # ---- 通用实现 ----
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """
+        从磁盘加载历史记录并重建索引
+
+        Returns:
+            标识符到记录的字典（与 self.records 为同一对象）
+        """
+        with self._lock:
+            self.records.clear()
+            self.records.update(self._read_snapshot())
+            self._after_load()
+            self._rebuild_hash_index()
+            return self.records
+
+    def put(self, identifier: str, record: Dict[str, Any]) -> None:
+        """添加或覆盖一条记录"""
+        with self._lock:
+            previous = self.records.get(identifier)
+            if previous and previous.get('project_hash'):
+                self._hash_index.pop(previous['project_hash'], None)
+            self.records[identifier] = record
+            if record.get('project_hash'):
+                self._hash_index[record['project_hash']] = identifier
+            self._persist(identifier, record)
+
+    def get(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """按标识符查询记录"""
+        return self.records.get(identifier)
+
+    def contains(self, identifier: str) -> bool:
+        """标识符是否已存在"""
+        return identifier in self.records
+
+    def find_by_hash(self, project_hash: str) -> Optional[str]:
+        """按项目哈希查询标识符"""
+        return self._hash_index.get(project_hash)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def export_v2(self) -> Dict[str, Any]:
+        """导出为 v2 JSON 结构"""
+        with self._lock:
+            return {
+                'version': STORAGE_VERSION,
+                'last_updated': datetime.datetime.now().isoformat(),
+                'total_projects': len(self.records),
+                'analyzed_projects': dict(self.records)
+            }
+
+    def import_v2(self, data: Dict[str, Any]) -> int:
+        """
+        导入 v2（或 v1 列表）格式的数据，已存在的标识符会被覆盖
+
+        Args:
+            data: v2 JSON 结构
+
+        Returns:
+            导入的记录数
+        """
+        projects = self._parse_projects(data)
+        with self._lock:
+            for identifier, record in projects.items():
+                self.put(identifier, record)
+        return len(projects)
+
+    def _read_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return self._parse_projects(json.load(f))
+        except Exception as e:
+            print(f"⚠️  加载项目历史记录失败: {e}")
+        return {}
+
+    def _parse_projects(self, data: Any) -> Dict[str, Dict[str, Any]]:
+        projects: Union[list, dict, None] = data.get('analyzed_projects') if isinstance(data, dict) else None
+        if isinstance(projects, list):
+            return migrate_v1_list(projects)
+        if isinstance(projects, dict):
+            return projects
+        return {}
+
+    def _rebuild_hash_index(self) -> None:
+        self._hash_index = {
+            record['project_hash']: identifier
+            for identifier, record in self.records.items()
+            if isinstance(record, dict) and record.get('project_hash')
+        }
+
+    def _write_snapshot(self) -> bool:
+        """以原子替换方式写入 v2 JSON 快照，失败时返回 False"""
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.export_v2(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            return True
+        except Exception as e:
+            print(f"⚠️  保存项目历史记录失败: {e}")
+            return False
+
+
+class JSONFileStorage(DedupStorage):
+    """v2 JSON 文件后端：修改只标记为脏，flush 时整体写入一次"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._dirty = False
+
+    def _persist(self, identifier: str, record: Dict[str, Any]) -> None:
+        self._dirty = True
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._dirty and self._write_snapshot():
+                self._dirty = False
+
+
+class JSONLLogStorage(DedupStorage):
+    """v2 JSON 快照 + 追加式 JSONL 日志后端"""
+
+    def __init__(self, path: str, log_path: str = None, compact_threshold: int = 500):
+        """
+        初始化存储后端
+
+        Args:
+            path: v2 JSON 快照路径
+            log_path: 追加日志路径，默认为 <path>.log
+            compact_threshold: 日志条目超过该值时在 flush 中压缩回快照
+        """
+        super().__init__(path)
+        self.log_path = log_path or f"{path}.log"
+        self.compact_threshold = compact_threshold
+        self._pending: List[str] = []
+        self._log_entries = 0
+
+    def _after_load(self) -> None:
+        """回放快照之后追加的日志"""
+        self._pending = []
+        self._log_entries = 0
+        if not os.path.exists(self.log_path):
+            return
+        try:
+            with open(self.log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 进程中断时最后一行可能不完整
+                        continue
+                    self.records[entry['id']] = entry['record']
+                    self._log_entries += 1
+        except Exception as e:
+            print(f"⚠️  回放项目历史日志失败: {e}")
+
+    def _persist(self, identifier: str, record: Dict[str, Any]) -> None:
+        self._pending.append(json.dumps({'id': identifier, 'record': record}, ensure_ascii=False))
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._pending and not os.path.exists(self.path):
+                # 还没有快照时直接写入快照，保证历史文件始终存在
+                self.compact()
+                return
+            if self._pending:
+                try:
+                    with open(self.log_path, 'a', encoding='utf-8') as f:
+                        f.write('\n'.join(self._pending) + '\n')
+                    self._log_entries += len(self._pending)
+                    self._pending = []
+                except Exception as e:
+                    print(f"⚠️  保存项目历史记录失败: {e}")
+                    return
+            if self._log_entries > self.compact_threshold:
+                self.compact()
+
+    def compact(self) -> None:
+        """将日志合并进 v2 JSON 快照并清空日志"""
+        with self._lock:
+            if not self._write_snapshot():
+                return
+            self._pending = []
+            self._log_entries = 0
+            try:
+                if os.path.exists(self.log_path):
+                    os.remove(self.log_path)
+            except OSError as e:
+                print(f"⚠️  清理项目历史日志失败: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            if self._log_entries:
+                self.compact()
+
+
+STORAGE_BACKENDS = {
+    'json': JSONFileStorage,
+    'jsonl': JSONLLogStorage,
+}
+
+
+def create_storage(path: str, backend: str = None) -> DedupStorage:
+    """
+    按名称创建存储后端
+
+    Args:
+        path: v2 JSON 历史文件路径
+        backend: 后端名称（json / jsonl），默认读取 DEDUP_STORAGE 环境变量，未设置时为 jsonl
+
+    Returns:
+        存储后端实例
+    """
+    name = (backend or os.getenv('DEDUP_STORAGE') or 'jsonl').lower()
+    if name not in STORAGE_BACKENDS:
+        raise ValueError(f"未知的去重存储后端: {name}（可选: {', '.join(STORAGE_BACKENDS)}）")
+    return STORAGE_BACKENDS[name](path)
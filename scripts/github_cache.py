@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+GitHub API 持久化响应缓存
+GitHot - GitHub热门项目评测
+
+将 repo、readme、languages、releases、issues 等端点的响应体连同
+ETag / Last-Modified 一起保存在 data/ 目录下：
+- TTL 内直接返回本地缓存，不发送请求
+- TTL 过期后发送条件请求（If-None-Match / If-Modified-Since），
+  GitHub 返回 304 时不计入速率限制，直接复用本地响应体
+- 按条目数和总字节数做 LRU 淘汰，避免缓存无限增长
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+
+class GitHubResponseCache:
+    """基于 ETag/Last-Modified 重新验证的 GitHub API 磁盘缓存"""
+
+    # 可缓存的端点：/repos/{owner}/{repo} 及其 readme/languages/releases/issues 子资源
+    CACHEABLE_PATH = re.compile(r'^/repos/[^/]+/[^/]+(?:/(?:readme|languages|releases|issues))?/?$')
+    CACHEABLE_HOSTS = ('api.github.com',)
+
+    # 需要随缓存保存的响应头
+    KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+    def __init__(self,
+                 cache_dir: str = 'data/github_cache',
+                 ttl_seconds: int = 3600,
+                 max_entries: int = 5000,
+                 max_bytes: int = 50 * 1024 * 1024):
+        """
+        初始化缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_seconds: 缓存新鲜期（秒），期内直接命中，过期后走条件请求
+            max_entries: 最大缓存条目数
+            max_bytes: 缓存响应体总字节数上限
+        """
+        self.cache_dir = cache_dir
+        self.index_file = os.path.join(cache_dir, 'index.json')
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._index = self._load_index()
+        self._dirty = False
+        self.stats = {'fresh_hits': 0, 'revalidated': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+    @classmethod
+    def from_env(cls) -> Optional['GitHubResponseCache']:
+        """
+        根据环境变量创建缓存，GITHUB_CACHE=0 时禁用
+
+        支持的环境变量: GITHUB_CACHE_DIR, GITHUB_CACHE_TTL, GITHUB_CACHE_MAX_ENTRIES, GITHUB_CACHE_MAX_MB
+        """
+        if os.getenv('GITHUB_CACHE', '1') == '0':
+            return None
+        return cls(
+            cache_dir=os.getenv('GITHUB_CACHE_DIR', 'data/github_cache'),
+            ttl_seconds=int(os.getenv('GITHUB_CACHE_TTL', '3600')),
+            max_entries=int(os.getenv('GITHUB_CACHE_MAX_ENTRIES', '5000')),
+            max_bytes=int(float(os.getenv('GITHUB_CACHE_MAX_MB', '50')) * 1024 * 1024)
+        )
+
+    def is_cacheable(self, url: str) -> bool:
+        """判断URL是否属于可缓存的GitHub端点"""
+        parsed = urlparse(url)
+        return parsed.hostname in self.CACHEABLE_HOSTS and bool(self.CACHEABLE_PATH.match(parsed.path))
+
+    def make_key(self, url: str, headers: Optional[Dict[str, str]] = None) -> str:
+        """
+        生成缓存键
+
+        Args:
+            url: 含查询参数的完整URL
+            headers: 请求头（Accept 不同的响应分开缓存）
+        """
+        accept = (headers or {}).get('Accept', '')
+        return hashlib.sha256(f"{url}|{accept}".encode('utf-8')).hexdigest()
+
+    def record(self, event: str) -> None:
+        """记录缓存命中统计"""
+        with self._lock:
+            self.stats[event] = self.stats.get(event, 0) + 1
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """查找缓存条目（响应体文件丢失时视为未命中）"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry and not os.path.exists(self._body_path(key)):
+                self._index.pop(key, None)
+                return None
+            return entry
+
+    def is_fresh(self, entry: Dict[str, Any]) -> bool:
+        """判断缓存条目是否仍在新鲜期内"""
+        return time.time() - entry.get('validated_at', 0) < self.ttl_seconds
+
+    def conditional_headers(self, entry: Dict[str, Any]) -> Dict[str, str]:
+        """生成条件请求头"""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, key: str, url: str, response: requests.Response) -> None:
+        """保存成功响应（仅缓存带验证器的200响应）"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+
+        body = response.content
+        now = time.time()
+        with self._lock:
+            body_path = self._body_path(key)
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            with open(body_path, 'wb') as f:
+                f.write(body)
+
+            self._index[key] = {
+                'url': url,
+                'etag': etag,
+                'last_modified': last_modified,
+                'headers': {h: response.headers[h] for h in self.KEPT_HEADERS if h in response.headers},
+                'size': len(body),
+                'stored_at': now,
+                'validated_at': now,
+                'last_access': now
+            }
+            self.stats['stored'] += 1
+            self._evict()
+            # 索引在 flush 时统一写入（HTTPClient.close 与退出钩子会调用）
+            self._dirty = True
+
+    def mark_revalidated(self, key: str) -> None:
+        """304 响应后刷新条目的验证时间"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry:
+                entry['validated_at'] = time.time()
+                self.stats['revalidated'] += 1
+                self._dirty = True
+
+    def build_response(self, key: str, entry: Dict[str, Any]) -> requests.Response:
+        """由缓存条目构造 requests.Response"""
+        with self._lock:
+            with open(self._body_path(key), 'rb') as f:
+                body = f.read()
+            entry['last_access'] = time.time()
+            self._dirty = True
+
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.headers = CaseInsensitiveDict(entry.get('headers', {}))
+        response.url = entry['url']
+        response.encoding = 'utf-8'
+        response.from_cache = True
+        return response
+
+    def flush(self) -> None:
+        """持久化索引（新条目、重新验证时间与最近访问时间）"""
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    def _body_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.body')
+
+    def _evict(self) -> None:
+        """按最近访问时间做LRU淘汰，直到满足条目数和字节数上限"""
+        total_bytes = sum(e.get('size', 0) for e in self._index.values())
+        if len(self._index) <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1].get('last_access', 0)):
+            if len(self._index) <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            self._index.pop(key)
+            total_bytes -= entry.get('size', 0)
+            self.stats['evicted'] += 1
+            try:
+                os.remove(self._body_path(key))
+            except OSError:
+                pass
+
+    def _load_index(self) -> Dict[str, Any]:
+        try:
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f).get('entries', {})
+        except Exception as e:
+            print(f"⚠️  加载GitHub缓存索引失败: {e}")
+        return {}
+
+    def _save_index(self) -> None:
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_file = f'{self.index_file}.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'version': '1.0', 'entries': self._index}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.index_file)
+            self._dirty = False
+        except Exception as e:
+            print(f"⚠️  保存GitHub缓存索引失败: {e}")
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+GitHub GraphQL 批量项目详情获取器
+GitHot - GitHub热门项目评测
+
+用一次带别名的 GraphQL 查询获取多个仓库的最近提交、语言、Releases 和 Issues，
+返回与 ClaudeAgentAnalyzer.get_project_details 相同结构的 project_details 字典，
+供 GitHubRepoEvaluator.evaluate 和 generate_review_content 直接使用。
+
+README 只查询 blob SHA（readme_sha），不随批量查询下载全文；摘要由
+readme_loader.ReadmeLoader 在需要时获取，SHA 未变化时直接复用本地摘要。
+
+每个仓库在 REST 下需要 5 次请求，GraphQL 下每 batch_size 个仓库只需 1 次。
+GraphQL API 要求认证，未配置 GITHUB_TOKEN 时不可用。
+"""
+
+from typing import Dict, List, Any, Optional, Tuple
+
+from http_client import HTTPClient, get_shared_client
+
+
+# 单个仓库查询的字段（别名 repoN 由 build_query 生成）
+REPOSITORY_FIELDS = """
+    readmeUpper: object(expression: "HEAD:README.md") { ... on Blob { oid } }
+    readmeLower: object(expression: "HEAD:readme.md") { ... on Blob { oid } }
+    readmePlain: object(expression: "HEAD:README") { ... on Blob { oid } }
+    defaultBranchRef {
+      target {
+        ... on Commit {
+          history(first: 3) { nodes { message author { name date } } }
+        }
+      }
+    }
+    languages(first: 20, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }
+    releases(first: 5, orderBy: {field: CREATED_AT, direction: DESC}) { nodes { tagName name publishedAt } }
+    issues(first: 30, orderBy: {field: CREATED_AT, direction: DESC}) { nodes { title body state createdAt } }
+"""
+
+
+class GitHubGraphQLFetcher:
+    """通过 GraphQL 批量获取仓库详情"""
+
+    ENDPOINT = 'https://api.github.com/graphql'
+
+    def __init__(self, headers: Dict[str, str], http_client: HTTPClient = None, batch_size: int = 20):
+        """
+        初始化获取器
+
+        Args:
+            headers: GitHub请求头（需包含 Authorization）
+            http_client: 共享HTTP客户端
+            batch_size: 每次查询包含的仓库数
+        """
+        self.headers = {k: v for k, v in headers.items() if k != 'Accept'}
+        self.http = http_client or get_shared_client()
+        self.batch_size = max(1, batch_size)
+
+    @property
+    def available(self) -> bool:
+        """GraphQL API 需要认证"""
+        return 'Authorization' in self.headers
+
+    def build_query(self, projects: List[Dict[str, Any]]) -> Tuple[str, Dict[str, str]]:
+        """
+        构建带别名的批量查询
+
+        Returns:
+            (query, variables)
+        """
+        declarations = []
+        selections = []
+        variables = {}
+        for i, project in enumerate(projects):
+            owner, name = project['full_name'].split('/', 1)
+            variables[f'owner{i}'] = owner
+            variables[f'name{i}'] = name
+            declarations.append(f'$owner{i}: String!, $name{i}: String!')
+            selections.append(f'  repo{i}: repository(owner: $owner{i}, name: $name{i}) {{{REPOSITORY_FIELDS}  }}')
+
+        query = f"query({', '.join(declarations)}) {{\n" + '\n'.join(selections) + '\n}'
+        return query, variables
+
+    def fetch_details(self, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量获取项目详情
+
+        Args:
+            projects: GitHub 搜索 API 返回的仓库列表（需包含 full_name）
+
+        Returns:
+            与输入顺序一致的 project_details 列表；查询失败的仓库只包含 basic_info
+        """
+        results = []
+        for start in range(0, len(projects), self.batch_size):
+            batch = projects[start:start + self.batch_size]
+            results.extend(self._fetch_batch(batch))
+        return results
+
+    def _fetch_batch(self, projects: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        query, variables = self.build_query(projects)
+        response = self.http.post(
+            self.ENDPOINT,
+            headers=self.headers,
+            json={'query': query, 'variables': variables},
+            timeout=30
+        )
+        response.raise_for_status()
+        payload = response.json()
+
+        data = payload.get('data') or {}
+        if not data and payload.get('errors'):
+            raise RuntimeError(f"GraphQL查询失败: {payload['errors'][0].get('message')}")
+
+        return [self._to_project_details(project, data.get(f'repo{i}')) for i, project in enumerate(projects)]
+
+    def _to_project_details(self, project: Dict[str, Any], repo: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        将 GraphQL 仓库节点转换为 REST 风格的 project_details
+
+        注意：GraphQL 的 issues 不包含 Pull Request，而 REST /issues 会把 PR 一并返回，
+        因此 issues 数量统计的是纯 Issue。仓库节点为 null 时只返回 basic_info，由调用方回退到 REST。
+        """
+        if not repo:
+            return {'basic_info': project}
+
+        readme_sha = None
+        for alias in ('readmeUpper', 'readmeLower', 'readmePlain'):
+            blob = repo.get(alias)
+            if blob and blob.get('oid'):
+                readme_sha = blob['oid']
+                break
+
+        history = (((repo.get('defaultBranchRef') or {}).get('target') or {}).get('history') or {}).get('nodes', [])
+        recent_commits = [
+            {
+                'message': (commit.get('message') or '')[:100],
+                'date': (commit.get('author') or {}).get('date', ''),
+                'author': (commit.get('author') or {}).get('name', '')
+            }
+            for commit in history
+        ]
+
+        languages = {
+            edge['node']['name']: edge['size']
+            for edge in (repo.get('languages') or {}).get('edges', [])
+        }
+
+        releases = [
+            {'tag_name': r.get('tagName', ''), 'name': r.get('name'), 'published_at': r.get('publishedAt')}
+            for r in (repo.get('releases') or {}).get('nodes', [])
+        ]
+
+        issues = [
+            {
+                'title': i.get('title'),
+                'body': i.get('body'),
+                'state': (i.get('state') or '').lower(),
+                'created_at': i.get('createdAt')
+            }
+            for i in (repo.get('issues') or {}).get('nodes', [])
+        ]
+
+        details = {
+            'basic_info': project,
+            'recent_commits': recent_commits,
+            'languages': languages,
+            'topics': project.get('topics', []),
+            'releases': releases,
+            'issues': issues
+        }
+        if readme_sha:
+            # 非标准文件名的README没有SHA，由调用方直接通过REST获取
+            details['readme_sha'] = readme_sha
+        return details
@@ -4,25 +4,30 @@ GitHub Repo Evaluator - 七维度项目评估器
 基于 github-repo-evaluator 评分体系，对 GitHub 项目进行快速评估
 """
 
-import requests
 import datetime
 import re
 from typing import Dict, List, Any, Tuple
+from http_client import HTTPClient, get_shared_client
+from pipeline_profiler import profiled
+from readme_loader import readme_text
 
 
 class GitHubRepoEvaluator:
     """GitHub 仓库七维度评估器"""
 
-    def __init__(self, headers: Dict[str, str] = None):
+    def __init__(self, headers: Dict[str, str] = None, http_client: HTTPClient = None):
         self.headers = headers or {}
+        self.http = http_client or get_shared_client()
 
+    @profiled('evaluate.repo')
     def evaluate(self, project_details: Dict[str, Any]) -> Dict[str, Any]:
         """
         对项目进行全面评估
         返回: {dimensions, total_score, decision, decision_reason}
         """
         basic_info = project_details.get('basic_info', {})
-        readme = project_details.get('readme_content', '') or ''
+        # README 按需加载（project_details 可能只携带 readme_loader）
+        readme = readme_text(project_details)
         releases = project_details.get('releases', [])
         issues = project_details.get('issues', [])
         discussions = project_details.get('discussions', [])
@@ -248,7 +253,7 @@ class GitHubRepoEvaluator:
         result = {'releases': [], 'issues': [], 'discussions': []}
 
         try:
-            releases_resp = requests.get(
+            releases_resp = self.http.get(
                 f'{repo_url}/releases', headers=self.headers, timeout=10
             )
             if releases_resp.status_code == 200:
@@ -257,7 +262,7 @@ class GitHubRepoEvaluator:
             pass
 
         try:
-            issues_resp = requests.get(
+            issues_resp = self.http.get(
                 f'{repo_url}/issues',
                 headers=self.headers,
                 params={'state': 'all', 'per_page': 30},
@@ -269,7 +274,7 @@ class GitHubRepoEvaluator:
             pass
 
         try:
-            discussions_resp = requests.get(
+            discussions_resp = self.http.get(
                 f'{repo_url}/discussions', headers=self.headers, timeout=10
             )
             if discussions_resp.status_code == 200:
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+GLM-4.5 Token 预算控制
+GitHot - GitHub热门项目评测
+
+GLM4Client 原本只在请求完成后统计 Token。本模块在发送前估算提示词 Token，
+按 GLM4Config 中 budget 段配置的单次运行 / 每日 Token 与费用上限进行控制：
+
+1. 预算充足时请求保持不变
+2. 预算不足时先降低 max_tokens，再切换到更便宜的备用模型
+3. 仍然无法满足时抛出 BudgetExceededError
+
+每日用量保存在 JSON 文件中（加文件锁），多个进程共享同一份每日预算。
+"""
+
+import os
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+try:
+    import fcntl
+except ImportError:  # Windows 下不加文件锁
+    fcntl = None
+
+
+class BudgetExceededError(Exception):
+    """预算不足且无法降级时抛出"""
+
+
+def _is_cjk(char: str) -> bool:
+    code = ord(char)
+    return (
+        0x4E00 <= code <= 0x9FFF or      # CJK统一表意文字
+        0x3400 <= code <= 0x4DBF or      # 扩展A
+        0x3000 <= code <= 0x303F or      # CJK标点
+        0xFF00 <= code <= 0xFFEF or      # 全角字符
+        0x3040 <= code <= 0x30FF or      # 日文假名
+        0xAC00 <= code <= 0xD7AF         # 韩文
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    本地估算文本的Token数（偏保守）
+
+    中日韩字符约1个字符1个Token，其余文本约4个字符1个Token。
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for char in text if _is_cjk(char))
+    other = len(text) - cjk
+    return cjk + (other + 3) // 4
+
+
+def estimate_prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    """估算消息列表的提示词Token数（每条消息另加角色等格式开销）"""
+    total = 3
+    for message in messages:
+        content = message.get('content', '')
+        if not isinstance(content, str):
+            content = json.dumps(content, ensure_ascii=False)
+        total += 4 + estimate_tokens(content)
+    return total
+
+
+class GLM4Budget:
+    """单次运行与每日 Token / 费用上限控制器（线程安全）"""
+
+    def __init__(self,
+                 per_run_tokens: int = 0,
+                 per_day_tokens: int = 0,
+                 per_run_cost: float = 0,
+                 per_day_cost: float = 0,
+                 prices: Optional[Dict[str, float]] = None,
+                 fallback_model: Optional[str] = None,
+                 min_max_tokens: int = 256,
+                 state_path: str = 'data/glm4_budget.json',
+                 clock: Callable[[], datetime] = datetime.now):
+        """
+        初始化预算控制器
+
+        Args:
+            per_run_tokens: 单次运行Token上限，0表示不限
+            per_day_tokens: 每日Token上限，0表示不限
+            per_run_cost: 单次运行费用上限（元），0表示不限
+            per_day_cost: 每日费用上限（元），0表示不限
+            prices: 各模型每百万Token价格（元）
+            fallback_model: 预算不足时切换的备用模型
+            min_max_tokens: 降低 max_tokens 时的下限
+            state_path: 每日用量文件路径
+            clock: 当前时间函数（便于测试）
+        """
+        self.per_run_tokens = per_run_tokens
+        self.per_day_tokens = per_day_tokens
+        self.per_run_cost = per_run_cost
+        self.per_day_cost = per_day_cost
+        self.prices = prices or {}
+        self.fallback_model = fallback_model
+        self.min_max_tokens = min_max_tokens
+        self.state_path = state_path
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._run = {'tokens': 0, 'cost': 0.0, 'requests': 0}
+        # 已发送但尚未完成的请求预占的额度（并发请求不会同时越过上限）
+        self._reserved = {'tokens': 0, 'cost': 0.0}
+        self.degraded_requests = 0
+
+        directory = os.path.dirname(state_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, config) -> Optional['GLM4Budget']:
+        """根据 GLM4Config 的 budget 配置创建，未启用时返回None"""
+        if not config.get('budget.enabled'):
+            return None
+        return cls(
+            per_run_tokens=config.get('budget.per_run_tokens', 0),
+            per_day_tokens=config.get('budget.per_day_tokens', 0),
+            per_run_cost=config.get('budget.per_run_cost', 0),
+            per_day_cost=config.get('budget.per_day_cost', 0),
+            prices=config.get('budget.prices', {}),
+            fallback_model=config.get('budget.fallback_model'),
+            min_max_tokens=config.get('budget.min_max_tokens', 256),
+            state_path=config.get('budget.state_path') or 'data/glm4_budget.json'
+        )
+
+    def cost(self, model: str, tokens: int) -> float:
+        """按模型单价计算费用（元）"""
+        return tokens * self.prices.get(model, 0) / 1_000_000
+
+    def plan(self, request_data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        在发送前检查预算，必要时降级请求并预占额度
+
+        Args:
+            request_data: 聊天完成请求体
+
+        Returns:
+            (实际发送的请求体, 预占记录)；预占记录需交给 commit 或 release
+
+        Raises:
+            BudgetExceededError: 降级后仍超出预算
+        """
+        prompt_tokens = estimate_prompt_tokens(request_data.get('messages', []))
+        requested_max = request_data.get('max_tokens') or 4096
+
+        with self._lock:
+            day = self._load_day()
+            token_room = self._room(self.per_run_tokens, self._run['tokens'], self.per_day_tokens, day['tokens'],
+                                    self._reserved['tokens'])
+
+            candidates = [request_data.get('model')]
+            if self.fallback_model and self.fallback_model not in candidates:
+                candidates.append(self.fallback_model)
+
+            for model in candidates:
+                cost_room = self._room(self.per_run_cost, self._run['cost'], self.per_day_cost, day['cost'],
+                                       self._reserved['cost'])
+                price = self.prices.get(model, 0)
+                room = token_room
+                if cost_room is not None and price:
+                    affordable = int(cost_room * 1_000_000 / price)
+                    room = affordable if room is None else min(room, affordable)
+
+                if room is None or prompt_tokens + requested_max <= room:
+                    max_tokens = requested_max
+                elif room - prompt_tokens >= self.min_max_tokens:
+                    max_tokens = room - prompt_tokens
+                else:
+                    continue
+
+                planned = dict(request_data, model=model, max_tokens=max_tokens)
+                degraded = model != request_data.get('model') or max_tokens != requested_max
+                if degraded:
+                    self.degraded_requests += 1
+                    print(f"⚠️  GLM-4.5 预算不足，请求降级: {request_data.get('model')}/{requested_max} -> {model}/{max_tokens}")
+
+                reservation = {
+                    'model': model,
+                    'tokens': prompt_tokens + max_tokens,
+                    'cost': self.cost(model, prompt_tokens + max_tokens),
+                    'prompt_tokens': prompt_tokens,
+                    'degraded': degraded
+                }
+                self._reserved['tokens'] += reservation['tokens']
+                self._reserved['cost'] += reservation['cost']
+                return planned, reservation
+
+        raise BudgetExceededError(
+            f"GLM-4.5 预算不足：预计提示词 {prompt_tokens} Token，"
+            f"降级到 {self.min_max_tokens} 输出Token后仍超出上限"
+        )
+
+    def commit(self, reservation: Dict[str, Any], usage: Dict[str, Any]) -> None:
+        """请求完成后按实际用量记账并释放预占额度"""
+        tokens = usage.get('total_tokens') or 0
+        cost = self.cost(reservation['model'], tokens)
+        with self._lock:
+            self._release(reservation)
+            self._run['tokens'] += tokens
+            self._run['cost'] += cost
+            self._run['requests'] += 1
+            self._add_day(tokens, cost)
+
+    def release(self, reservation: Dict[str, Any]) -> None:
+        """请求失败时释放预占额度"""
+        with self._lock:
+            self._release(reservation)
+
+    def get_status(self) -> Dict[str, Any]:
+        """获取当前预算使用情况"""
+        with self._lock:
+            day = self._load_day()
+            return {
+                'run_tokens': self._run['tokens'],
+                'run_cost': round(self._run['cost'], 4),
+                'day_tokens': day['tokens'],
+                'day_cost': round(day['cost'], 4),
+                'per_run_tokens': self.per_run_tokens,
+                'per_day_tokens': self.per_day_tokens,
+                'per_run_cost': self.per_run_cost,
+                'per_day_cost': self.per_day_cost,
+                'degraded_requests': self.degraded_requests
+            }
+
+    # ---- 内部方法（调用方持有 self._lock） ----
+
+    @staticmethod
+    def _room(run_limit, run_used, day_limit, day_used, reserved):
+        """剩余额度，不限时返回None"""
+        rooms = []
+        if run_limit:
+            rooms.append(run_limit - run_used - reserved)
+        if day_limit:
+            rooms.append(day_limit - day_used - reserved)
+        return max(min(rooms), 0) if rooms else None
+
+    def _release(self, reservation: Dict[str, Any]) -> None:
+        self._reserved['tokens'] = max(self._reserved['tokens'] - reservation['tokens'], 0)
+        self._reserved['cost'] = max(self._reserved['cost'] - reservation['cost'], 0.0)
+
+    def _today(self) -> str:
+        return self.clock().strftime('%Y-%m-%d')
+
+    def _load_day(self) -> Dict[str, Any]:
+        state = self._read_state()
+        return state.get('days', {}).get(self._today(), {'tokens': 0, 'cost': 0.0, 'requests': 0})
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'days': {}}
+        except Exception as e:
+            print(f"⚠️  读取GLM-4.5预算用量失败: {e}")
+            return {'days': {}}
+
+    def _add_day(self, tokens: int, cost: float) -> None:
+        """在文件锁内读-改-写每日用量，只保留最近30天"""
+        try:
+            with open(self.state_path, 'a+', encoding='utf-8') as f:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_EX)
+                f.seek(0)
+                content = f.read()
+                state = json.loads(content) if content.strip() else {'days': {}}
+
+                days = state.setdefault('days', {})
+                day = days.setdefault(self._today(), {'tokens': 0, 'cost': 0.0, 'requests': 0})
+                day['tokens'] += tokens
+                day['cost'] = round(day['cost'] + cost, 6)
+                day['requests'] += 1
+                for old in sorted(days)[:-30]:
+                    del days[old]
+
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            print(f"⚠️  保存GLM-4.5预算用量失败: {e}")
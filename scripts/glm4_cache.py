@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+GLM-4.5 请求/响应缓存
+GitHot - GitHub热门项目评测
+
+以请求内容（模型、消息、temperature 等全部参数）的规范化哈希为键，
+把成功的聊天完成响应保存在本地 SQLite 中：
+- 重跑失败的工作流时，已生成过的段落直接命中缓存，不再消耗 Token
+- 超过 TTL 的条目视为未命中并在写入时清理
+- 条目数超过上限时按最近访问时间淘汰
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Dict, Any, Optional
+
+
+class GLM4ResponseCache:
+    """以请求哈希为键的 GLM-4.5 响应磁盘缓存（线程安全）"""
+
+    def __init__(self,
+                 db_path: str = 'data/glm4_cache.sqlite3',
+                 ttl_seconds: int = 7 * 24 * 3600,
+                 max_entries: int = 2000):
+        """
+        初始化缓存
+
+        Args:
+            db_path: SQLite 数据库路径
+            ttl_seconds: 缓存有效期（秒）
+            max_entries: 最大缓存条目数
+        """
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0, 'tokens_saved': 0}
+
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                total_tokens INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    @classmethod
+    def from_config(cls, config) -> Optional['GLM4ResponseCache']:
+        """根据 GLM4Config 的 cache 配置创建，未启用时返回None"""
+        if not config.get('cache.enabled'):
+            return None
+        return cls(
+            db_path=config.get('cache.path') or 'data/glm4_cache.sqlite3',
+            ttl_seconds=config.get('cache.ttl_seconds', 7 * 24 * 3600),
+            max_entries=config.get('cache.max_entries', 2000)
+        )
+
+    @staticmethod
+    def make_key(request_data: Dict[str, Any]) -> str:
+        """请求参数的规范化哈希（键顺序无关）"""
+        canonical = json.dumps(request_data, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查询缓存，命中时返回响应并刷新访问时间"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, total_tokens FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.stats['hits'] += 1
+            self.stats['tokens_saved'] += row[1]
+            return json.loads(row[0])
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        """保存成功的响应"""
+        now = time.time()
+        total_tokens = (response.get('usage') or {}).get('total_tokens', 0)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, total_tokens, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, response.get('model'), json.dumps(response, ensure_ascii=False), total_tokens, now, now)
+            )
+            self.stats['stored'] += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """清理过期条目，并按最近访问时间淘汰超出上限的条目"""
+        expired = self._conn.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,)
+            )
+        self.stats['evicted'] += expired + max(overflow, 0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -9,26 +9,48 @@ with comprehensive logging of requests, responses, and token usage.
 
 import os
 import json
+import queue
+import atexit
+import asyncio
+import threading
+import hashlib
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, List
-import requests
-from logging.handlers import RotatingFileHandler
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+from http_client import HTTPClient, get_shared_client
+from glm4_config import GLM4Config
+from glm4_cache import GLM4ResponseCache
+from glm4_budget import GLM4Budget, estimate_tokens
+
+
+PAYLOAD_MODES = ('full', 'truncate', 'hash', 'none')
 
 
 class GLM4Client:
     """GLM-4.5 API客户端，带有详细的日志记录功能"""
     
-    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://open.bigmodel.cn/api/paas/v4/"):
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://open.bigmodel.cn/api/paas/v4/",
+                 http_client: Optional[HTTPClient] = None, config: Optional[GLM4Config] = None,
+                 cache: Optional[GLM4ResponseCache] = None, budget: Optional[GLM4Budget] = None):
         """
         初始化GLM-4.5客户端
         
         Args:
             api_key: GLM-4.5 API密钥
             base_url: API基础URL
+            http_client: 共享HTTP客户端，默认使用进程内共享实例
+            config: 配置管理器，默认加载脚本目录下的 glm4_config.json
+            cache: 响应缓存，默认按配置 cache.enabled 决定是否启用
+            budget: Token预算控制器，默认按配置 budget.enabled 决定是否启用
         """
         self.api_key = api_key or os.getenv('GLM4_API_KEY')
         self.base_url = base_url.rstrip('/')
+        self.http = http_client or get_shared_client()
+        self.config = config or GLM4Config()
+        self.cache = cache if cache is not None else GLM4ResponseCache.from_config(self.config)
+        self.budget = budget if budget is not None else GLM4Budget.from_config(self.config)
         
         if not self.api_key:
             raise ValueError("GLM-4.5 API密钥未设置。请设置环境变量GLM4_API_KEY或传入api_key参数")
@@ -36,21 +58,35 @@ class GLM4Client:
         # 设置日志记录
         self._setup_logging()
         
-        # 初始化统计信息
+        # 初始化统计信息（批量请求时多个线程同时更新）
+        self._stats_lock = threading.Lock()
         self.stats = {
             'total_requests': 0,
             'total_tokens_consumed': 0,
             'total_input_tokens': 0,
             'total_output_tokens': 0,
             'successful_requests': 0,
-            'failed_requests': 0
+            'failed_requests': 0,
+            'aborted_streams': 0,
+            'cache_hits': 0,
+            'cache_misses': 0,
+            'cache_tokens_saved': 0
         }
     
     def _setup_logging(self):
         """设置日志记录系统"""
+        logging_config = self.config.get_logging_config()
+        self.log_format = logging_config.get('request_format') or 'pretty'
+        self.log_payload = logging_config.get('payload') or 'full'
+        self.payload_max_chars = logging_config.get('payload_max_chars') or 500
+        if self.log_payload not in PAYLOAD_MODES:
+            raise ValueError(f"未知的日志内容记录方式: {self.log_payload}（可选: {', '.join(PAYLOAD_MODES)}）")
+        async_logging = bool(logging_config.get('async'))
+        
         # 创建logs目录
-        log_dir = os.path.join(os.path.dirname(__file__), 'logs')
+        log_dir = logging_config.get('dir') or os.path.join(os.path.dirname(__file__), 'logs')
         os.makedirs(log_dir, exist_ok=True)
+        self.log_dir = log_dir
         
         # 设置主日志文件
         log_file = os.path.join(log_dir, 'glm4_client.log')
@@ -64,8 +100,8 @@ class GLM4Client:
             # 创建rotatingfile handler
             file_handler = RotatingFileHandler(
                 log_file,
-                maxBytes=10*1024*1024,  # 10MB
-                backupCount=5,
+                maxBytes=logging_config.get('max_file_size') or 10*1024*1024,  # 10MB
+                backupCount=logging_config.get('backup_count') or 5,
                 encoding='utf-8'
             )
             
@@ -82,27 +118,48 @@ class GLM4Client:
             console_handler.setFormatter(formatter)
             
             # 添加handlers
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            self._attach_handlers(self.logger, [file_handler, console_handler], async_logging)
         
-        # 设置详细请求日志文件
-        request_log_file = os.path.join(log_dir, 'glm4_requests.log')
-        self.request_logger = logging.getLogger('GLM4Requests')
+        # 设置详细请求日志文件：pretty 为多行JSON，jsonl 为每行一个JSON对象
+        if self.log_format == 'jsonl':
+            request_log_file = os.path.join(log_dir, 'glm4_requests.jsonl')
+            self.request_logger = logging.getLogger('GLM4RequestsJSONL')
+            request_formatter = logging.Formatter('%(message)s')
+        else:
+            request_log_file = os.path.join(log_dir, 'glm4_requests.log')
+            self.request_logger = logging.getLogger('GLM4Requests')
+            request_formatter = logging.Formatter(
+                '%(asctime)s | %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         self.request_logger.setLevel(logging.INFO)
         
         if not self.request_logger.handlers:
             request_handler = RotatingFileHandler(
                 request_log_file,
-                maxBytes=50*1024*1024,  # 50MB
-                backupCount=10,
+                maxBytes=logging_config.get('request_log_size') or 50*1024*1024,  # 50MB
+                backupCount=logging_config.get('request_backup_count') or 10,
                 encoding='utf-8'
             )
-            request_formatter = logging.Formatter(
-                '%(asctime)s | %(message)s',
-                datefmt='%Y-%m-%d %H:%M:%S'
-            )
             request_handler.setFormatter(request_formatter)
-            self.request_logger.addHandler(request_handler)
+            self._attach_handlers(self.request_logger, [request_handler], async_logging)
+    
+    @staticmethod
+    def _attach_handlers(logger: logging.Logger, handlers: List[logging.Handler], async_logging: bool):
+        """
+        为logger添加handler；异步模式下请求线程只把记录放入队列，
+        由 QueueListener 后台线程写文件，进程退出时刷新队列
+        """
+        if not async_logging:
+            for handler in handlers:
+                logger.addHandler(handler)
+            return
+        
+        log_queue = queue.Queue(-1)
+        listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        logger.addHandler(QueueHandler(log_queue))
     
     def chat_completion(self, 
                        messages: List[Dict[str, str]], 
@@ -122,6 +179,9 @@ class GLM4Client:
             
         Returns:
             API响应数据
+        
+        Raises:
+            BudgetExceededError: 启用预算控制且降级后仍超出预算
         """
         request_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         
@@ -134,6 +194,27 @@ class GLM4Client:
             **kwargs
         }
         
+        # 相同请求命中缓存时不再调用API
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.make_key(request_data)
+            cached = self.cache.get(cache_key)
+            self._record_cache_lookup(cached)
+            if cached is not None:
+                self._log_cache_hit(request_id, cached)
+                return cached
+        
+        # 预算不足时请求可能被降级（更小的 max_tokens 或备用模型）
+        request_data, reservation = self._plan_budget(request_data)
+        if reservation is not None and reservation['degraded'] and cache_key is not None:
+            cache_key = self.cache.make_key(request_data)
+            cached = self.cache.get(cache_key)
+            self._record_cache_lookup(cached)
+            if cached is not None:
+                self.budget.release(reservation)
+                self._log_cache_hit(request_id, cached)
+                return cached
+        
         # 记录请求开始
         self.logger.info(f"开始GLM-4.5 API请求 | RequestID: {request_id}")
         self._log_request_details(request_id, request_data)
@@ -141,6 +222,8 @@ class GLM4Client:
         try:
             # 发送API请求
             response = self._make_api_request(request_data)
+            if reservation is not None:
+                self.budget.commit(reservation, response.get('usage') or {})
             
             # 记录响应
             self._log_response_details(request_id, response)
@@ -148,6 +231,9 @@ class GLM4Client:
             # 更新统计信息
             self._update_stats(response, success=True)
             
+            if cache_key is not None:
+                self.cache.put(cache_key, response)
+            
             self.logger.info(f"GLM-4.5 API请求成功 | RequestID: {request_id}")
             
             return response
@@ -155,8 +241,107 @@ class GLM4Client:
         except Exception as e:
             self.logger.error(f"GLM-4.5 API请求失败 | RequestID: {request_id} | Error: {str(e)}")
             self._update_stats({}, success=False)
+            if reservation is not None:
+                self.budget.release(reservation)
             raise
     
+    def chat_completion_stream(self,
+                               messages: List[Dict[str, str]],
+                               model: str = "glm-4-plus",
+                               temperature: float = 0.7,
+                               max_tokens: int = 4096,
+                               **kwargs) -> 'GLM4Stream':
+        """
+        以流式（SSE）方式发送聊天完成请求
+        
+        参数与 chat_completion 相同。请求在开始迭代时才发送；迭代得到增量文本，
+        结束后 stream.response 为与 chat_completion 返回值结构相同的完整响应，
+        统计信息和请求/响应日志与非流式请求一致。中途 close() 会断开连接，
+        不再为剩余的输出付费。
+        
+        Examples:
+            stream = client.chat_completion_stream(messages)
+            for text in stream:
+                print(text, end='', flush=True)
+            print(stream.response['usage'])
+        
+        Returns:
+            GLM4Stream，可用 for 或 async for 迭代
+        """
+        request_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        
+        # 构建请求数据
+        request_data = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **kwargs,
+            "stream": True
+        }
+        request_data, reservation = self._plan_budget(request_data)
+        
+        # 记录请求开始
+        self.logger.info(f"开始GLM-4.5 API流式请求 | RequestID: {request_id}")
+        self._log_request_details(request_id, request_data)
+        
+        return GLM4Stream(self, request_id, request_data, reservation)
+    
+    def chat_completion_batch(self,
+                              message_sets: List[List[Dict[str, str]]],
+                              max_concurrency: Optional[int] = None,
+                              **params) -> List[Dict[str, Any]]:
+        """
+        并发发送多组对话请求
+        
+        Args:
+            message_sets: 多组对话消息列表
+            max_concurrency: 同时进行的请求数，默认读取配置 api.max_concurrency
+            **params: 传给 chat_completion 的公共参数（model、temperature 等）
+            
+        Returns:
+            与输入顺序一致的结果列表，每项为
+            {'index', 'success', 'response', 'error'}，单项失败不影响其他请求
+        """
+        if not message_sets:
+            return []
+        
+        limit = max_concurrency or self.config.get('api.max_concurrency') or 4
+        
+        def run(item):
+            index, messages = item
+            try:
+                response = self.chat_completion(messages, **params)
+                return {'index': index, 'success': True, 'response': response, 'error': None}
+            except Exception as e:
+                return {'index': index, 'success': False, 'response': None, 'error': str(e)}
+        
+        self.logger.info(f"开始批量请求 | 数量: {len(message_sets)} | 并发: {limit}")
+        with ThreadPoolExecutor(max_workers=min(limit, len(message_sets))) as executor:
+            results = list(executor.map(run, enumerate(message_sets)))
+        
+        failed = sum(1 for r in results if not r['success'])
+        self.logger.info(f"批量请求完成 | 成功: {len(results) - failed} | 失败: {failed}")
+        return results
+    
+    async def achat_completion_batch(self,
+                                     message_sets: List[List[Dict[str, str]]],
+                                     max_concurrency: Optional[int] = None,
+                                     **params) -> List[Dict[str, Any]]:
+        """
+        chat_completion_batch 的异步版本，在线程池中执行，不阻塞事件循环
+        
+        Returns:
+            与 chat_completion_batch 相同的结果列表
+        """
+        return await asyncio.to_thread(self.chat_completion_batch, message_sets, max_concurrency, **params)
+    
+    def _plan_budget(self, request_data: Dict[str, Any]):
+        """未启用预算控制时原样返回请求，预占记录为None"""
+        if self.budget is None:
+            return request_data, None
+        return self.budget.plan(request_data)
+    
     def _make_api_request(self, request_data: Dict[str, Any]) -> Dict[str, Any]:
         """发送API请求"""
         headers = {
@@ -166,7 +351,7 @@ class GLM4Client:
         
         url = f"{self.base_url}/chat/completions"
         
-        response = requests.post(
+        response = self.http.post(
             url,
             headers=headers,
             json=request_data,
@@ -176,6 +361,30 @@ class GLM4Client:
         response.raise_for_status()
         return response.json()
     
+    def _open_stream(self, request_data: Dict[str, Any]):
+        """发送流式API请求，返回未读取响应体的 Response"""
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream'
+        }
+        
+        response = self.http.post(
+            f"{self.base_url}/chat/completions",
+            headers=headers,
+            json=request_data,
+            timeout=60,
+            stream=True
+        )
+        
+        try:
+            response.raise_for_status()
+        except Exception:
+            response.close()
+            raise
+        response.encoding = 'utf-8'
+        return response
+    
     def _log_request_details(self, request_id: str, request_data: Dict[str, Any]):
         """记录详细的请求信息"""
         log_entry = {
@@ -186,12 +395,13 @@ class GLM4Client:
             'temperature': request_data.get('temperature'),
             'max_tokens': request_data.get('max_tokens'),
             'message_count': len(request_data.get('messages', [])),
-            'messages': request_data.get('messages', []),
             'other_params': {k: v for k, v in request_data.items() 
                            if k not in ['model', 'messages', 'temperature', 'max_tokens']}
         }
+        if self.log_payload != 'none':
+            log_entry['messages'] = [self._redact_message(m) for m in request_data.get('messages', [])]
         
-        self.request_logger.info(f"REQUEST | {json.dumps(log_entry, ensure_ascii=False, indent=2)}")
+        self._write_request_log('REQUEST', log_entry)
     
     def _log_response_details(self, request_id: str, response_data: Dict[str, Any]):
         """记录详细的响应信息"""
@@ -205,7 +415,6 @@ class GLM4Client:
             'model': response_data.get('model'),
             'response_id': response_data.get('id'),
             'choices_count': len(choices),
-            'choices': choices,
             'token_usage': {
                 'prompt_tokens': usage.get('prompt_tokens', 0),
                 'completion_tokens': usage.get('completion_tokens', 0),
@@ -214,8 +423,10 @@ class GLM4Client:
             'created': response_data.get('created'),
             'object': response_data.get('object')
         }
+        if self.log_payload != 'none':
+            log_entry['choices'] = [self._redact_choice(c) for c in choices]
         
-        self.request_logger.info(f"RESPONSE | {json.dumps(log_entry, ensure_ascii=False, indent=2)}")
+        self._write_request_log('RESPONSE', log_entry)
         
         # 单独记录token使用情况
         self.logger.info(f"Token使用 | RequestID: {request_id} | "
@@ -223,22 +434,86 @@ class GLM4Client:
                         f"输出: {usage.get('completion_tokens', 0)} | "
                         f"总计: {usage.get('total_tokens', 0)}")
     
-    def _update_stats(self, response_data: Dict[str, Any], success: bool = True):
-        """更新统计信息"""
-        self.stats['total_requests'] += 1
-        
-        if success:
-            self.stats['successful_requests'] += 1
-            usage = response_data.get('usage', {})
-            self.stats['total_input_tokens'] += usage.get('prompt_tokens', 0)
-            self.stats['total_output_tokens'] += usage.get('completion_tokens', 0)
-            self.stats['total_tokens_consumed'] += usage.get('total_tokens', 0)
+    def _log_cache_hit(self, request_id: str, response_data: Dict[str, Any]):
+        """记录缓存命中及节省的Token"""
+        usage = response_data.get('usage', {})
+        log_entry = {
+            'request_id': request_id,
+            'timestamp': datetime.now().isoformat(),
+            'type': 'CACHE_HIT',
+            'model': response_data.get('model'),
+            'response_id': response_data.get('id'),
+            'token_usage': {
+                'prompt_tokens': usage.get('prompt_tokens', 0),
+                'completion_tokens': usage.get('completion_tokens', 0),
+                'total_tokens': usage.get('total_tokens', 0)
+            }
+        }
+        self._write_request_log('CACHE_HIT', log_entry)
+        self.logger.info(f"GLM-4.5 响应命中缓存 | RequestID: {request_id} | 节省Token: {usage.get('total_tokens', 0)}")
+    
+    def _write_request_log(self, log_type: str, log_entry: Dict[str, Any]):
+        """按配置的格式写入请求日志"""
+        if self.log_format == 'jsonl':
+            self.request_logger.info(json.dumps(log_entry, ensure_ascii=False, separators=(',', ':')))
         else:
-            self.stats['failed_requests'] += 1
+            self.request_logger.info(f"{log_type} | {json.dumps(log_entry, ensure_ascii=False, indent=2)}")
+    
+    def _redact_text(self, text: Any) -> Any:
+        """按 payload 配置截断或哈希文本内容"""
+        if not isinstance(text, str) or self.log_payload == 'full':
+            return text
+        if self.log_payload == 'hash':
+            return {'sha256': hashlib.sha256(text.encode('utf-8')).hexdigest(), 'chars': len(text)}
+        if len(text) > self.payload_max_chars:
+            return f"{text[:self.payload_max_chars]}…(+{len(text) - self.payload_max_chars})"
+        return text
+    
+    def _redact_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(message, dict) or 'content' not in message:
+            return message
+        return {**message, 'content': self._redact_text(message['content'])}
+    
+    def _redact_choice(self, choice: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(choice, dict) or not isinstance(choice.get('message'), dict):
+            return choice
+        return {**choice, 'message': self._redact_message(choice['message'])}
+    
+    def _update_stats(self, response_data: Dict[str, Any], success: bool = True):
+        """更新统计信息（线程安全）"""
+        usage = response_data.get('usage', {}) if success else {}
+        with self._stats_lock:
+            self.stats['total_requests'] += 1
+            
+            if success:
+                self.stats['successful_requests'] += 1
+                self.stats['total_input_tokens'] += usage.get('prompt_tokens', 0)
+                self.stats['total_output_tokens'] += usage.get('completion_tokens', 0)
+                self.stats['total_tokens_consumed'] += usage.get('total_tokens', 0)
+            else:
+                self.stats['failed_requests'] += 1
+    
+    def _record_cache_lookup(self, cached: Optional[Dict[str, Any]]):
+        with self._stats_lock:
+            if cached is None:
+                self.stats['cache_misses'] += 1
+            else:
+                self.stats['cache_hits'] += 1
+                self.stats['cache_tokens_saved'] += (cached.get('usage') or {}).get('total_tokens', 0)
+    
+    def _record_aborted_stream(self):
+        """记录被调用方中止的流式请求（用量未知，不计入成功或失败）"""
+        with self._stats_lock:
+            self.stats['total_requests'] += 1
+            self.stats['aborted_streams'] += 1
     
     def get_stats(self) -> Dict[str, Any]:
-        """获取统计信息"""
-        return self.stats.copy()
+        """获取统计信息（启用预算控制时附带 budget 用量）"""
+        with self._stats_lock:
+            stats = self.stats.copy()
+        if self.budget is not None:
+            stats['budget'] = self.budget.get_status()
+        return stats
     
     def save_stats(self, filename: Optional[str] = None):
         """保存统计信息到文件"""
@@ -246,8 +521,7 @@ class GLM4Client:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"glm4_stats_{timestamp}.json"
         
-        stats_dir = os.path.join(os.path.dirname(__file__), 'logs')
-        stats_file = os.path.join(stats_dir, filename)
+        stats_file = os.path.join(self.log_dir, filename)
         
         stats_data = {
             'timestamp': datetime.now().isoformat(),
@@ -264,6 +538,139 @@ class GLM4Client:
         self.logger.info(f"统计信息已保存到: {stats_file}")
 
 
+
+class GLM4Stream:
+    """流式聊天响应：迭代得到增量文本，结束后 response 为完整响应"""
+    
+    def __init__(self, client: GLM4Client, request_id: str, request_data: Dict[str, Any],
+                 reservation: Optional[Dict[str, Any]] = None):
+        self.client = client
+        self.request_id = request_id
+        self.request_data = request_data
+        self.reservation = reservation
+        self.response: Optional[Dict[str, Any]] = None
+        self._iterator: Optional[Iterator[str]] = None
+        self._started = False
+    
+    def __iter__(self) -> Iterator[str]:
+        if self._iterator is None:
+            self._iterator = self._iterate()
+        return self._iterator
+    
+    async def __aiter__(self) -> AsyncIterator[str]:
+        """异步迭代：在线程中读取下一段文本，不阻塞事件循环"""
+        iterator = iter(self)
+        done = object()
+        try:
+            while True:
+                text = await asyncio.to_thread(next, iterator, done)
+                if text is done:
+                    break
+                yield text
+        finally:
+            iterator.close()
+    
+    def close(self):
+        """中止流式请求并断开连接"""
+        if self._iterator is not None:
+            self._iterator.close()
+        if not self._started and self.reservation is not None:
+            # 尚未开始迭代时生成器主体没有运行，预占额度需在这里归还
+            self.client.budget.release(self.reservation)
+            self.reservation = None
+    
+    def __enter__(self) -> 'GLM4Stream':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _iterate(self) -> Iterator[str]:
+        self._started = True
+        client = self.client
+        choices: Dict[int, Dict[str, Any]] = {}
+        meta: Dict[str, Any] = {}
+        http_response = None
+        finished = False
+        
+        try:
+            http_response = client._open_stream(self.request_data)
+            for chunk in _iter_sse_events(http_response):
+                for key in ('id', 'model', 'created'):
+                    if chunk.get(key) is not None:
+                        meta[key] = chunk[key]
+                if chunk.get('usage'):
+                    meta['usage'] = chunk['usage']
+                
+                for delta_choice in chunk.get('choices', []):
+                    choice = choices.setdefault(delta_choice.get('index', 0), {'role': 'assistant', 'parts': [], 'finish_reason': None})
+                    delta = delta_choice.get('delta') or {}
+                    if delta.get('role'):
+                        choice['role'] = delta['role']
+                    if delta_choice.get('finish_reason'):
+                        choice['finish_reason'] = delta_choice['finish_reason']
+                    if delta.get('content'):
+                        choice['parts'].append(delta['content'])
+                        yield delta['content']
+            finished = True
+        except GeneratorExit:
+            client.logger.info(f"GLM-4.5 API流式请求已中止 | RequestID: {self.request_id}")
+            client._record_aborted_stream()
+            if self.reservation is not None:
+                # 中止时没有 usage，按提示词和已收到的内容估算计入预算
+                received = ''.join(''.join(choice['parts']) for choice in choices.values())
+                estimated = self.reservation['prompt_tokens'] + estimate_tokens(received)
+                client.budget.commit(self.reservation, {'total_tokens': estimated})
+            raise
+        except Exception as e:
+            client.logger.error(f"GLM-4.5 API请求失败 | RequestID: {self.request_id} | Error: {str(e)}")
+            client._update_stats({}, success=False)
+            if self.reservation is not None:
+                client.budget.release(self.reservation)
+            raise
+        finally:
+            if http_response is not None:
+                http_response.close()
+            if finished or choices:
+                # 中止时保留已收到的部分内容，但只有完整响应才记录日志和用量
+                self.response = self._build_response(choices, meta)
+            if finished:
+                client._log_response_details(self.request_id, self.response)
+                client._update_stats(self.response, success=True)
+                if self.reservation is not None:
+                    client.budget.commit(self.reservation, self.response.get('usage') or {})
+                client.logger.info(f"GLM-4.5 API请求成功 | RequestID: {self.request_id}")
+    
+    def _build_response(self, choices: Dict[int, Dict[str, Any]], meta: Dict[str, Any]) -> Dict[str, Any]:
+        """将增量数据组装为与非流式请求相同结构的响应"""
+        return {
+            'id': meta.get('id'),
+            'model': meta.get('model', self.request_data.get('model')),
+            'created': meta.get('created'),
+            'object': 'chat.completion',
+            'choices': [
+                {
+                    'index': index,
+                    'message': {'role': choice['role'], 'content': ''.join(choice['parts'])},
+                    'finish_reason': choice['finish_reason']
+                }
+                for index, choice in sorted(choices.items())
+            ],
+            'usage': meta.get('usage', {})
+        }
+
+def _iter_sse_events(response) -> Iterator[Dict[str, Any]]:
+    """解析 SSE 响应中的 data 事件，遇到 [DONE] 结束"""
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or line.startswith(':'):
+            continue
+        if not line.startswith('data:'):
+            continue
+        data = line[5:].strip()
+        if data == '[DONE]':
+            break
+        yield json.loads(data)
+
 def main():
     """测试GLM-4.5客户端"""
     try:
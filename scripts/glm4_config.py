@@ -7,6 +7,7 @@ GitHot - GitHub热门项目评测
 """
 
 import os
+import copy
 import json
 from typing import Dict, Any, Optional
 from pathlib import Path
@@ -21,7 +22,8 @@ class GLM4Config:
             "base_url": "https://open.bigmodel.cn/api/paas/v4/",
             "timeout": 60,
             "max_retries": 3,
-            "retry_delay": 1.0
+            "retry_delay": 1.0,
+            "max_concurrency": 4  # chat_completion_batch 同时进行的请求数
         },
         "models": {
             "default": "glm-4-plus",
@@ -42,10 +44,39 @@ class GLM4Config:
         },
         "logging": {
             "level": "INFO",
+            "dir": None,  # 日志目录，默认为脚本目录下的 logs
             "max_file_size": 10485760,  # 10MB
             "backup_count": 5,
             "request_log_size": 52428800,  # 50MB
-            "request_backup_count": 10
+            "request_backup_count": 10,
+            "request_format": "pretty",  # pretty: 多行JSON (glm4_requests.log); jsonl: 每行一条 (glm4_requests.jsonl)
+            "payload": "full",  # full / truncate / hash / none：消息与回复内容的记录方式
+            "payload_max_chars": 500,  # truncate 模式下保留的字符数
+            "async": False  # 通过 QueueHandler 在后台线程写日志
+        },
+        "cache": {
+            "enabled": False,  # 相同请求直接返回本地缓存的响应
+            "path": "data/glm4_cache.sqlite3",
+            "ttl_seconds": 604800,  # 7天
+            "max_entries": 2000
+        },
+        "budget": {
+            "enabled": False,  # 发送前估算Token并按上限控制
+            "per_run_tokens": 0,  # 单次运行Token上限，0表示不限
+            "per_day_tokens": 0,  # 每日Token上限（跨进程累计）
+            "per_run_cost": 0,  # 单次运行费用上限（元）
+            "per_day_cost": 0,  # 每日费用上限（元）
+            "fallback_model": "glm-4-flash",  # 预算不足时切换的备用模型
+            "min_max_tokens": 256,  # 降低 max_tokens 的下限
+            "state_path": "data/glm4_budget.json",
+            "prices": {  # 每百万Token价格（元），请按官方价格调整
+                "glm-4-plus": 50,
+                "glm-4-0520": 100,
+                "glm-4": 100,
+                "glm-4-air": 1,
+                "glm-4-airx": 10,
+                "glm-4-flash": 0
+            }
         },
         "stats": {
             "auto_save": True,
@@ -77,14 +108,14 @@ class GLM4Config:
                     config = json.load(f)
                 
                 # 合并默认配置和用户配置
-                merged_config = self._merge_configs(self.DEFAULT_CONFIG.copy(), config)
+                merged_config = self._merge_configs(copy.deepcopy(self.DEFAULT_CONFIG), config)
                 return merged_config
                 
             except (json.JSONDecodeError, IOError) as e:
                 print(f"加载配置文件失败: {e}")
                 print("使用默认配置")
                 
-        return self.DEFAULT_CONFIG.copy()
+        return copy.deepcopy(self.DEFAULT_CONFIG)
     
     def _merge_configs(self, default: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
         """合并默认配置和用户配置"""
@@ -201,6 +232,7 @@ class GLM4Config:
             'timeout': self.get('api.timeout'),
             'max_retries': self.get('api.max_retries'),
             'retry_delay': self.get('api.retry_delay'),
+            'max_concurrency': self.get('api.max_concurrency'),
             'api_key': self.api_key
         }
     
@@ -208,12 +240,21 @@ class GLM4Config:
         """获取日志相关配置"""
         return {
             'level': self.get('logging.level'),
+            'dir': self.get('logging.dir'),
             'max_file_size': self.get('logging.max_file_size'),
             'backup_count': self.get('logging.backup_count'),
             'request_log_size': self.get('logging.request_log_size'),
-            'request_backup_count': self.get('logging.request_backup_count')
+            'request_backup_count': self.get('logging.request_backup_count'),
+            'request_format': self.get('logging.request_format'),
+            'payload': self.get('logging.payload'),
+            'payload_max_chars': self.get('logging.payload_max_chars'),
+            'async': self.get('logging.async')
         }
     
+    def get_budget_config(self) -> Dict[str, Any]:
+        """获取预算相关配置"""
+        return dict(self.get('budget', {}))
+    
     def create_sample_config(self):
         """创建示例配置文件"""
         sample_config = {
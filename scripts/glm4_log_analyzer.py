@@ -9,21 +9,35 @@ GitHot - GitHub热门项目评测
 import os
 import json
 import re
+import hashlib
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable
 from pathlib import Path
 import argparse
 
 
+# 每条日志记录以 "YYYY-MM-DD HH:MM:SS | " 开头，之后的行（如 indent=2 的JSON）属于同一条记录
+RECORD_START = re.compile(rb'^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}) \| ')
+
+# JSONL 请求日志每行一条记录
+JSONL_RECORD_START = re.compile(rb'^\{')
+
+# 用文件开头若干字节识别 inode 是否被新文件复用
+HEAD_BYTES = 128
+
+STATE_VERSION = 1
+
+
 class GLM4LogAnalyzer:
     """GLM-4.5日志分析器"""
     
-    def __init__(self, log_dir: Optional[str] = None):
+    def __init__(self, log_dir: Optional[str] = None, state_file: Optional[str] = None):
         """
         初始化日志分析器
         
         Args:
             log_dir: 日志目录路径
+            state_file: 增量分析检查点文件，默认为日志目录下的 glm4_analyzer_state.json
         """
         self.script_dir = Path(__file__).parent
         self.log_dir = Path(log_dir) if log_dir else self.script_dir / 'logs'
@@ -34,30 +48,24 @@ class GLM4LogAnalyzer:
         # 日志文件路径
         self.main_log = self.log_dir / 'glm4_client.log'
         self.request_log = self.log_dir / 'glm4_requests.log'
+        self.request_jsonl_log = self.log_dir / 'glm4_requests.jsonl'
+        self.state_file = Path(state_file) if state_file else self.log_dir / 'glm4_analyzer_state.json'
         
         # 统计数据
-        self.stats = {
-            'total_requests': 0,
-            'successful_requests': 0,
-            'failed_requests': 0,
-            'total_tokens': 0,
-            'input_tokens': 0,
-            'output_tokens': 0,
-            'models_used': {},
-            'daily_usage': {},
-            'hourly_usage': {},
-            'average_response_time': 0,
-            'token_costs': {},
-            'error_types': {}
-        }
+        self._reset_stats()
     
-    def analyze_logs(self, start_date: Optional[str] = None, end_date: Optional[str] = None) -> Dict[str, Any]:
+    def analyze_logs(self, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                     full_rescan: bool = False) -> Dict[str, Any]:
         """
         分析日志文件
         
+        只读取上次检查点之后新增的字节，按天累计的统计保存在检查点文件中，
+        报告基于累计结果生成。
+        
         Args:
             start_date: 开始日期 (YYYY-MM-DD)
             end_date: 结束日期 (YYYY-MM-DD)
+            full_rescan: 忽略检查点，从头重新分析全部日志
             
         Returns:
             分析结果字典
@@ -70,18 +78,28 @@ class GLM4LogAnalyzer:
         # 解析日期范围
         date_filter = self._parse_date_range(start_date, end_date)
         
-        # 分析请求日志
-        if self.request_log.exists():
-            self._analyze_request_log(date_filter)
+        state = self._new_state() if full_rescan else self._load_state()
+        
+        # 分析请求日志（多行JSON格式与JSONL格式）
+        if self._log_files(self.request_log) or self._log_files(self.request_jsonl_log):
+            print("分析请求日志...")
+            self._ingest_log(self.request_log, state, self._process_request_record)
+            self._ingest_log(self.request_jsonl_log, state, self._process_jsonl_record, JSONL_RECORD_START)
         else:
             print(f"请求日志文件不存在: {self.request_log}")
         
         # 分析主日志
-        if self.main_log.exists():
-            self._analyze_main_log(date_filter)
+        if self._log_files(self.main_log):
+            print("分析主日志...")
+            self._ingest_log(self.main_log, state, self._process_main_record)
         else:
             print(f"主日志文件不存在: {self.main_log}")
         
+        self._save_state(state)
+        
+        # 按日期范围汇总每日统计
+        self._aggregate_daily(state['daily'], date_filter)
+        
         # 计算派生统计数据
         self._calculate_derived_stats()
         
@@ -102,7 +120,9 @@ class GLM4LogAnalyzer:
             'average_response_time': 0,
             'token_costs': {},
             'error_types': {},
-            'request_details': []
+            'cache_hits': 0,
+            'tokens_saved': 0,
+            'request_details': []  # 仅包含本次新增读取的响应
         }
     
     def _parse_date_range(self, start_date: Optional[str], end_date: Optional[str]) -> Optional[Tuple[datetime, datetime]]:
@@ -118,137 +138,263 @@ class GLM4LogAnalyzer:
             print(f"日期格式错误: {e}")
             return None
     
-    def _analyze_request_log(self, date_filter: Optional[Tuple[datetime, datetime]]):
-        """分析请求日志"""
-        print("分析请求日志...")
-        
+    # ---- 检查点 ----
+    
+    def _new_state(self) -> Dict[str, Any]:
+        return {'version': STATE_VERSION, 'files': {}, 'daily': {}}
+    
+    def _load_state(self) -> Dict[str, Any]:
+        """加载检查点，文件不存在或版本不符时从头分析"""
         try:
-            with open(self.request_log, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    try:
-                        self._process_request_log_line(line, date_filter)
-                    except Exception as e:
-                        print(f"处理请求日志第{line_num}行时出错: {e}")
-                        
+            if self.state_file.exists():
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    state = json.load(f)
+                if state.get('version') == STATE_VERSION:
+                    return state
         except Exception as e:
-            print(f"读取请求日志失败: {e}")
+            print(f"读取分析检查点失败，将重新分析: {e}")
+        return self._new_state()
     
-    def _process_request_log_line(self, line: str, date_filter: Optional[Tuple[datetime, datetime]]):
-        """处理单行请求日志"""
-        line = line.strip()
-        if not line:
-            return
+    def _save_state(self, state: Dict[str, Any]):
+        """原子写入检查点"""
+        tmp_file = self.state_file.with_name(self.state_file.name + '.tmp')
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False)
+            os.replace(tmp_file, self.state_file)
+        except Exception as e:
+            print(f"保存分析检查点失败: {e}")
+    
+    def _log_files(self, base: Path) -> List[Path]:
+        """返回日志文件及其轮转备份，按从旧到新排序（.N ... .1, 当前文件）"""
+        backups = []
+        for path in base.parent.glob(base.name + '.*'):
+            suffix = path.name[len(base.name) + 1:]
+            if suffix.isdigit():
+                backups.append((int(suffix), path))
+        files = [path for _, path in sorted(backups, reverse=True)]
+        if base.exists():
+            files.append(base)
+        return files
+    
+    @staticmethod
+    def _head_digest(path: Path, length: int) -> str:
+        with open(path, 'rb') as f:
+            return hashlib.sha1(f.read(length)).hexdigest()
+    
+    def _ingest_log(self, base: Path, state: Dict[str, Any], handler: Callable,
+                    record_start=RECORD_START) -> None:
+        """
+        增量读取日志及其轮转备份
         
-        # 解析日志行
-        parts = line.split(' | ', 2)
-        if len(parts) < 3:
-            return
+        RotatingFileHandler 轮转时只重命名文件，inode 不变，因此检查点按 inode 记录
+        读取偏移；同时校验文件开头的摘要，防止 inode 被新文件复用时跳过内容。
+        """
+        checkpoints = state['files'].setdefault(base.name, {})
+        seen = {}
         
-        timestamp_str, log_type, content = parts
+        for path in self._log_files(base):
+            key = None
+            try:
+                stat = path.stat()
+                key = str(stat.st_ino)
+                entry = checkpoints.get(key)
+                
+                offset = 0
+                if entry and entry['offset'] <= stat.st_size and \
+                        self._head_digest(path, entry['head_len']) == entry['head']:
+                    offset = entry['offset']
+                
+                if offset < stat.st_size:
+                    offset = self._stream_records(path, offset, handler, state['daily'], record_start)
+                
+                head_len = min(HEAD_BYTES, offset)
+                seen[key] = {
+                    'path': path.name,
+                    'offset': offset,
+                    'head_len': head_len,
+                    'head': self._head_digest(path, head_len)
+                }
+            except Exception as e:
+                print(f"读取日志失败 {path}: {e}")
+                if key in checkpoints:
+                    seen[key] = checkpoints[key]
+        
+        # 已被删除的备份不再保留检查点
+        state['files'][base.name] = seen
+    
+    def _stream_records(self, path: Path, offset: int, handler: Callable, daily: Dict[str, Any],
+                        record_start_pattern=RECORD_START) -> int:
+        """
+        从 offset 开始逐条处理日志记录
+        
+        Returns:
+            已完整处理的字节偏移；文件末尾尚未写完的记录留到下次处理
+        """
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            record_start = offset
+            position = offset
+            buffer: List[bytes] = []
+            
+            for line in f:
+                match = record_start_pattern.match(line)
+                if match and buffer:
+                    self._handle_record(buffer, handler, daily)
+                    buffer = []
+                    record_start = position
+                if match or buffer:
+                    buffer.append(line)
+                else:
+                    # 记录开头之前的残余内容
+                    record_start = position + len(line)
+                position += len(line)
+            
+            if buffer:
+                if buffer[-1].endswith(b'\n') and self._handle_record(buffer, handler, daily):
+                    return position
+                return record_start
+            return position
+    
+    def _handle_record(self, lines: List[bytes], handler: Callable, daily: Dict[str, Any]) -> bool:
+        """解析一条记录并交给处理函数，记录不完整时返回False"""
+        text = b''.join(lines).decode('utf-8', errors='replace').rstrip('\n')
+        try:
+            return handler(text, daily)
+        except Exception as e:
+            print(f"处理日志记录时出错 ({text[:40]}): {e}")
+            return True
+    
+    @staticmethod
+    def _day_bucket(daily: Dict[str, Any], timestamp: datetime) -> Dict[str, Any]:
+        return daily.setdefault(timestamp.strftime('%Y-%m-%d'), {
+            'requests': 0,
+            'successful_requests': 0,
+            'failed_requests': 0,
+            'input_tokens': 0,
+            'output_tokens': 0,
+            'total_tokens': 0,
+            'models': {},
+            'hours': {},
+            'error_types': {},
+            'cache_hits': 0,
+            'tokens_saved': 0
+        })
+    
+    # ---- 记录处理 ----
+    
+    def _process_request_record(self, text: str, daily: Dict[str, Any]) -> bool:
+        """处理请求日志中的一条 "时间戳 | REQUEST/RESPONSE | JSON" 记录"""
+        timestamp = datetime.strptime(text[:19], '%Y-%m-%d %H:%M:%S')
+        log_type, _, json_str = text[22:].partition(' | ')
+        if log_type not in ('REQUEST', 'RESPONSE', 'CACHE_HIT'):
+            return True
         
-        # 解析时间戳
         try:
-            timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-        except ValueError:
-            return
+            data = json.loads(json_str)
+        except json.JSONDecodeError:
+            return False
         
-        # 应用日期过滤器
-        if date_filter:
-            start_date, end_date = date_filter
-            if not (start_date <= timestamp < end_date):
-                return
+        self._dispatch_entry(log_type, timestamp, data, daily)
+        return True
+    
+    def _process_jsonl_record(self, text: str, daily: Dict[str, Any]) -> bool:
+        """处理 JSONL 请求日志中的一行"""
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return False
         
-        # 处理请求或响应
+        timestamp = datetime.fromisoformat(data['timestamp'])
+        self._dispatch_entry(data.get('type'), timestamp, data, daily)
+        return True
+    
+    def _dispatch_entry(self, log_type: str, timestamp: datetime, data: Dict[str, Any], daily: Dict[str, Any]):
         if log_type == 'REQUEST':
-            self._process_request_entry(timestamp, content)
+            self._process_request_entry(timestamp, data, daily)
         elif log_type == 'RESPONSE':
-            self._process_response_entry(timestamp, content)
+            self._process_response_entry(timestamp, data, daily)
+        elif log_type == 'CACHE_HIT':
+            self._process_cache_hit_entry(timestamp, data, daily)
     
-    def _process_request_entry(self, timestamp: datetime, content: str):
+    def _process_request_entry(self, timestamp: datetime, data: Dict[str, Any], daily: Dict[str, Any]):
         """处理请求条目"""
-        try:
-            if content.startswith('REQUEST | '):
-                json_str = content[10:]  # 去掉 'REQUEST | ' 前缀
-                data = json.loads(json_str)
-                
-                # 记录请求信息
-                self.stats['total_requests'] += 1
-                
-                # 按日期统计
-                date_key = timestamp.strftime('%Y-%m-%d')
-                self.stats['daily_usage'][date_key] = self.stats['daily_usage'].get(date_key, 0) + 1
-                
-                # 按小时统计
-                hour_key = timestamp.strftime('%H')
-                self.stats['hourly_usage'][hour_key] = self.stats['hourly_usage'].get(hour_key, 0) + 1
-                
-                # 模型使用统计
-                model = data.get('model', 'unknown')
-                self.stats['models_used'][model] = self.stats['models_used'].get(model, 0) + 1
-                
-        except (json.JSONDecodeError, KeyError) as e:
-            # 忽略解析错误
-            pass
+        bucket = self._day_bucket(daily, timestamp)
+        bucket['requests'] += 1
+        
+        # 按小时统计
+        hour_key = timestamp.strftime('%H')
+        bucket['hours'][hour_key] = bucket['hours'].get(hour_key, 0) + 1
+        
+        # 模型使用统计
+        model = data.get('model') or 'unknown'
+        bucket['models'][model] = bucket['models'].get(model, 0) + 1
     
-    def _process_response_entry(self, timestamp: datetime, content: str):
+    def _process_response_entry(self, timestamp: datetime, data: Dict[str, Any], daily: Dict[str, Any]):
         """处理响应条目"""
-        try:
-            if content.startswith('RESPONSE | '):
-                json_str = content[11:]  # 去掉 'RESPONSE | ' 前缀
-                data = json.loads(json_str)
-                
-                # 成功请求计数
-                self.stats['successful_requests'] += 1
-                
-                # Token使用统计
-                token_usage = data.get('token_usage', {})
-                self.stats['input_tokens'] += token_usage.get('prompt_tokens', 0)
-                self.stats['output_tokens'] += token_usage.get('completion_tokens', 0)
-                self.stats['total_tokens'] += token_usage.get('total_tokens', 0)
-                
-                # 保存请求详情
-                self.stats['request_details'].append({
-                    'timestamp': timestamp.isoformat(),
-                    'request_id': data.get('request_id'),
-                    'model': data.get('model'),
-                    'token_usage': token_usage,
-                    'choices_count': data.get('choices_count', 0)
-                })
-                
-        except (json.JSONDecodeError, KeyError):
-            # 忽略解析错误
-            pass
-    
-    def _analyze_main_log(self, date_filter: Optional[Tuple[datetime, datetime]]):
-        """分析主日志"""
-        print("分析主日志...")
+        bucket = self._day_bucket(daily, timestamp)
+        bucket['successful_requests'] += 1
         
-        try:
-            with open(self.main_log, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    try:
-                        self._process_main_log_line(line, date_filter)
-                    except Exception as e:
-                        print(f"处理主日志第{line_num}行时出错: {e}")
-                        
-        except Exception as e:
-            print(f"读取主日志失败: {e}")
+        # Token使用统计
+        token_usage = data.get('token_usage', {})
+        bucket['input_tokens'] += token_usage.get('prompt_tokens', 0)
+        bucket['output_tokens'] += token_usage.get('completion_tokens', 0)
+        bucket['total_tokens'] += token_usage.get('total_tokens', 0)
+        
+        # 保存请求详情
+        self.stats['request_details'].append({
+            'timestamp': timestamp.isoformat(),
+            'request_id': data.get('request_id'),
+            'model': data.get('model'),
+            'token_usage': token_usage,
+            'choices_count': data.get('choices_count', 0)
+        })
     
-    def _process_main_log_line(self, line: str, date_filter: Optional[Tuple[datetime, datetime]]):
-        """处理单行主日志"""
-        line = line.strip()
-        if not line:
-            return
-        
+    def _process_cache_hit_entry(self, timestamp: datetime, data: Dict[str, Any], daily: Dict[str, Any]):
+        """处理缓存命中条目：记录因命中缓存而节省的Token"""
+        bucket = self._day_bucket(daily, timestamp)
+        bucket['cache_hits'] = bucket.get('cache_hits', 0) + 1
+        bucket['tokens_saved'] = bucket.get('tokens_saved', 0) + data.get('token_usage', {}).get('total_tokens', 0)
+    
+    def _process_main_record(self, text: str, daily: Dict[str, Any]) -> bool:
+        """处理主日志中的一条记录"""
+        timestamp = datetime.strptime(text[:19], '%Y-%m-%d %H:%M:%S')
+        content = text[22:]
         # 解析错误日志
-        if 'ERROR' in line and 'GLM-4.5 API请求失败' in line:
-            self.stats['failed_requests'] += 1
+        if 'ERROR' in content and 'GLM-4.5 API请求失败' in content:
+            bucket = self._day_bucket(daily, timestamp)
+            bucket['failed_requests'] += 1
             
             # 提取错误类型
-            error_match = re.search(r'Error: (.+?)(?:\s|$)', line)
+            error_match = re.search(r'Error: (.+?)(?:\s|$)', content)
             if error_match:
                 error_type = error_match.group(1)
-                self.stats['error_types'][error_type] = self.stats['error_types'].get(error_type, 0) + 1
+                bucket['error_types'][error_type] = bucket['error_types'].get(error_type, 0) + 1
+        return True
+    
+    def _aggregate_daily(self, daily: Dict[str, Any], date_filter: Optional[Tuple[datetime, datetime]]):
+        """将按天累计的统计汇总到 self.stats"""
+        for date_key in sorted(daily):
+            if date_filter:
+                start_date, end_date = date_filter
+                if not (start_date <= datetime.strptime(date_key, '%Y-%m-%d') < end_date):
+                    continue
+            
+            bucket = daily[date_key]
+            self.stats['total_requests'] += bucket['requests']
+            self.stats['successful_requests'] += bucket['successful_requests']
+            self.stats['failed_requests'] += bucket['failed_requests']
+            self.stats['input_tokens'] += bucket['input_tokens']
+            self.stats['output_tokens'] += bucket['output_tokens']
+            self.stats['total_tokens'] += bucket['total_tokens']
+            self.stats['cache_hits'] += bucket.get('cache_hits', 0)
+            self.stats['tokens_saved'] += bucket.get('tokens_saved', 0)
+            if bucket['requests']:
+                self.stats['daily_usage'][date_key] = bucket['requests']
+            
+            for target, source in (('models_used', 'models'), ('hourly_usage', 'hours'), ('error_types', 'error_types')):
+                for key, count in bucket[source].items():
+                    self.stats[target][key] = self.stats[target].get(key, 0) + count
     
     def _calculate_derived_stats(self):
         """计算派生统计数据"""
@@ -304,6 +450,13 @@ class GLM4LogAnalyzer:
         report_lines.append(f"  平均总Token: {self.stats['avg_total_tokens']:.1f}")
         report_lines.append("")
         
+        # 缓存统计
+        if self.stats['cache_hits']:
+            report_lines.append("💾 缓存统计:")
+            report_lines.append(f"  缓存命中: {self.stats['cache_hits']:,} 次")
+            report_lines.append(f"  节省Token: {self.stats['tokens_saved']:,}")
+            report_lines.append("")
+        
         # 模型使用统计
         if self.stats['models_used']:
             report_lines.append("🤖 模型使用统计:")
@@ -363,6 +516,7 @@ class GLM4LogAnalyzer:
                 'successful_requests': self.stats['successful_requests'],
                 'success_rate': self.stats['success_rate'],
                 'total_tokens': self.stats['total_tokens'],
+                'tokens_saved': self.stats['tokens_saved'],
                 'most_used_model': max(self.stats['models_used'].items(), key=lambda x: x[1])[0] if self.stats['models_used'] else None
             }
         }
@@ -401,6 +555,7 @@ def main():
     parser.add_argument('--output', help='报告输出文件')
     parser.add_argument('--export-json', help='导出JSON统计文件')
     parser.add_argument('--clean-logs', type=int, metavar='DAYS', help='清理N天前的旧日志')
+    parser.add_argument('--full-rescan', action='store_true', help='忽略检查点，从头重新分析全部日志')
     
     args = parser.parse_args()
     
@@ -413,7 +568,7 @@ def main():
         return
     
     # 分析日志
-    stats = analyzer.analyze_logs(args.start_date, args.end_date)
+    stats = analyzer.analyze_logs(args.start_date, args.end_date, full_rescan=args.full_rescan)
     
     # 生成报告
     report = analyzer.generate_report(args.output)
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+共享HTTP客户端
+GitHot - GitHub热门项目评测
+
+为所有分析器提供统一的HTTP访问层：
+- Keep-Alive 连接池复用，避免每次请求重新建立TLS连接
+- 按主机配置连接池大小（api.github.com 等高频主机使用更大的池）
+- 基于 urllib3 Retry 的连接错误与 5xx 自动重试和指数退避（限流响应由速率限制调度器处理）
+- 默认启用 gzip/deflate 压缩传输
+- 可选的 GitHub 响应磁盘缓存（ETag/Last-Modified 条件请求，见 github_cache.py）
+- 可选的 GitHub 速率限制调度（按配额令牌桶，见 rate_limiter.py）
+- 每次实际发出的请求上报给流水线追踪（见 pipeline_profiler.py）
+
+各分析器通过构造参数 http_client 注入，未注入时使用进程内共享实例。
+"""
+
+import os
+import time
+import atexit
+import threading
+from typing import Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from github_cache import GitHubResponseCache
+from rate_limiter import GitHubRateLimiter
+import pipeline_profiler
+
+
+# 高频主机的连接池大小
+DEFAULT_HOST_POOL_SIZES = {
+    'api.github.com': 16,
+    'open.bigmodel.cn': 8,
+    'api.producthunt.com': 4,
+    'www.producthunt.com': 4,
+}
+
+
+class HTTPClient:
+    """带连接池、重试退避和压缩支持的HTTP客户端（线程安全，可在多个分析器间共享）"""
+
+    def __init__(self,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 host_pool_sizes: Optional[Dict[str, int]] = None,
+                 max_retries: int = 3,
+                 backoff_factor: float = 0.5,
+                 status_forcelist: Iterable[int] = (500, 502, 503, 504),
+                 retry_methods: Iterable[str] = ('GET', 'HEAD', 'OPTIONS'),
+                 timeout: float = 30,
+                 cache: Optional[GitHubResponseCache] = None,
+                 rate_limiter: Optional[GitHubRateLimiter] = None):
+        """
+        初始化HTTP客户端
+
+        Args:
+            pool_connections: 默认适配器缓存的连接池数量
+            pool_maxsize: 默认适配器每个连接池的最大连接数
+            host_pool_sizes: 按主机覆盖的连接池大小，如 {'api.github.com': 16}
+            max_retries: 最大重试次数（连接错误和 status_forcelist 中的状态码；
+                429/403 限流响应不在此重试，由速率限制调度器等待后重试）
+            backoff_factor: 指数退避系数，第n次重试等待 backoff_factor * 2^(n-1) 秒
+            status_forcelist: 触发重试的HTTP状态码
+            retry_methods: 允许重试的HTTP方法（默认只重试幂等方法）
+            timeout: 未显式指定时使用的请求超时（秒）
+            cache: GitHub响应缓存，为None时不缓存
+            rate_limiter: GitHub速率限制器，为None时不做配额调度
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.status_forcelist = tuple(status_forcelist)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+
+        self.session = requests.Session()
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+
+        default_adapter = self._build_adapter(pool_connections, pool_maxsize)
+        self.session.mount('https://', default_adapter)
+        self.session.mount('http://', default_adapter)
+
+        sizes = DEFAULT_HOST_POOL_SIZES if host_pool_sizes is None else host_pool_sizes
+        for host, size in sizes.items():
+            self.session.mount(f'https://{host}/', self._build_adapter(1, size))
+
+    def _build_retry(self) -> Retry:
+        """构建重试策略"""
+        return Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=self.status_forcelist,
+            allowed_methods=self.retry_methods,
+            # 不在 urllib3 内部按 Retry-After 休眠：限流等待由 GitHubRateLimiter 按配额调度
+            respect_retry_after_header=False,
+            raise_on_status=False
+        )
+
+    def _build_adapter(self, pool_connections: int, pool_maxsize: int) -> HTTPAdapter:
+        """构建带连接池和重试策略的适配器"""
+        return HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=self._build_retry()
+        )
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """发送HTTP请求（GitHub API请求先获取配额，遇到限流响应等待后重试一次）"""
+        kwargs.setdefault('timeout', self.timeout)
+        resource = self.rate_limiter.resource_for(url) if self.rate_limiter else None
+        if resource is None:
+            return self._send(method, url, **kwargs)
+
+        for attempt in range(2):
+            self.rate_limiter.acquire(resource)
+            response = self._send(method, url, **kwargs)
+            self.rate_limiter.update_from_response(resource, response)
+            if attempt or not self.rate_limiter.is_rate_limited(response):
+                break
+            print(f"⚠️  GitHub API速率限制 ({resource})，等待配额恢复后重试")
+        return response
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        method = method.upper()
+        response = None
+        start = time.perf_counter()
+        try:
+            if method == 'GET':
+                response = self.session.get(url, **kwargs)
+            elif method == 'POST':
+                response = self.session.post(url, **kwargs)
+            else:
+                response = self.session.request(method, url, **kwargs)
+            return response
+        finally:
+            pipeline_profiler.record_http(url, response, time.perf_counter() - start)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """发送GET请求（可缓存的GitHub端点走条件请求缓存）"""
+        if self.cache is not None and self.cache.is_cacheable(url):
+            return self._cached_get(url, **kwargs)
+        return self.request('GET', url, **kwargs)
+
+    def _cached_get(self, url: str, **kwargs) -> requests.Response:
+        """
+        带缓存的GET请求
+
+        新鲜期内直接返回缓存；过期后带 If-None-Match/If-Modified-Since 重新验证，
+        收到304时复用缓存响应体。
+        """
+        full_url = requests.Request('GET', url, params=kwargs.get('params')).prepare().url
+        headers = dict(kwargs.get('headers') or {})
+        key = self.cache.make_key(full_url, headers)
+        entry = self.cache.lookup(key)
+
+        if entry and self.cache.is_fresh(entry):
+            self.cache.record('fresh_hits')
+            return self.cache.build_response(key, entry)
+
+        if entry:
+            headers.update(self.cache.conditional_headers(entry))
+            kwargs['headers'] = headers
+        else:
+            self.cache.record('misses')
+
+        response = self.request('GET', url, **kwargs)
+
+        if entry and response.status_code == 304:
+            self.cache.mark_revalidated(key)
+            return self.cache.build_response(key, entry)
+
+        self.cache.store(key, full_url, response)
+        return response
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """发送POST请求"""
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        """关闭连接池并持久化缓存索引"""
+        if self.cache is not None:
+            self.cache.flush()
+        self.session.close()
+
+
+_shared_client: Optional[HTTPClient] = None
+_shared_client_lock = threading.Lock()
+
+
+def get_shared_client() -> HTTPClient:
+    """
+    获取进程内共享的HTTP客户端
+
+    连接池大小可通过环境变量 HTTP_POOL_MAXSIZE 调整（默认10），
+    重试次数可通过 HTTP_MAX_RETRIES 调整（默认3）。
+    GitHub响应缓存配置见 GitHubResponseCache.from_env。
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = HTTPClient(
+                    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', '10')),
+                    max_retries=int(os.getenv('HTTP_MAX_RETRIES', '3')),
+                    cache=GitHubResponseCache.from_env(),
+                    rate_limiter=GitHubRateLimiter.from_env()
+                )
+                atexit.register(_shared_client.close)
+    return _shared_client
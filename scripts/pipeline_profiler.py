@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+流水线阶段计时与性能剖析
+GitHot - GitHub热门项目评测
+
+每个工作流步骤有 25 分钟预算，但无法看出时间花在搜索、详情获取、评估、
+渲染还是等待上。本模块提供轻量的阶段埋点：
+
+    with pipeline_run('claude_agents'):          # 一次运行，结束时写出 JSON 追踪
+        with stage('github.search'):              # 阶段上下文管理器
+            ...
+
+    @profiled('github.details')                  # 或使用装饰器
+    def get_project_details(...): ...
+
+每个阶段记录墙钟时间、HTTP 请求数、传输字节数、HTTP 耗时、速率限制等待
+时间以及 GitHub 返回的剩余配额。HTTP 与等待数据由 http_client / rate_limiter
+上报（record_http / record_wait），按当前上下文的阶段栈归属到所有外层阶段；
+线程池中的任务用 propagate() 包装后可继承提交时的阶段栈。
+
+没有活动运行时 stage/profiled 不做任何记录，单元测试和库调用不受影响。
+
+环境变量：
+    PIPELINE_TRACE=0                  关闭追踪文件（默认写入 data/traces/）
+    PIPELINE_TRACE_DIR                追踪文件目录
+    PIPELINE_PROFILE=cprofile         同时用 cProfile 剖析整个运行（输出 .prof 与文本摘要）
+    PIPELINE_PROFILE=pyinstrument     使用 pyinstrument（未安装时回退到 cProfile）
+"""
+
+import os
+import json
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Iterator, Tuple
+from urllib.parse import urlparse
+
+TRACE_VERSION = 1
+DEFAULT_TRACE_DIR = 'data/traces'
+
+# 当前上下文中打开的阶段（由外到内）
+_stage_stack: contextvars.ContextVar[Tuple['Stage', ...]] = contextvars.ContextVar('pipeline_stages', default=())
+
+_active_run: Optional['PipelineRun'] = None
+
+
+class Stage:
+    """一个阶段的计量数据"""
+
+    def __init__(self, stage_id: int, name: str, parent: Optional[int], offset: float, meta: Dict[str, Any]):
+        self.id = stage_id
+        self.name = name
+        self.parent = parent
+        self.offset = offset
+        self.meta = meta
+        self.thread = threading.current_thread().name
+        self.wall_seconds = 0.0
+        self.http_calls = 0
+        self.http_bytes = 0
+        self.http_seconds = 0.0
+        self.http_errors = 0
+        self.wait_seconds = 0.0
+        self.rate_limit: Dict[str, int] = {}
+        self.error: Optional[str] = None
+        self.closed = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'parent': self.parent,
+            'thread': self.thread,
+            'start': round(self.offset, 4),
+            'wall_seconds': round(self.wall_seconds, 4),
+            'http_calls': self.http_calls,
+            'http_bytes': self.http_bytes,
+            'http_seconds': round(self.http_seconds, 4),
+            'http_errors': self.http_errors,
+            'wait_seconds': round(self.wait_seconds, 4),
+            'rate_limit_remaining': dict(self.rate_limit),
+        }
+        if self.meta:
+            data['meta'] = self.meta
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class PipelineRun:
+    """一次流水线运行的追踪（线程安全）"""
+
+    def __init__(self, name: str, clock: Callable[[], float] = time.perf_counter):
+        self.name = name
+        self.clock = clock
+        self.started_at = datetime.now()
+        self._start = clock()
+        self._lock = threading.Lock()
+        self._next_id = 0
+        self.stages: List[Stage] = []
+        self.wall_seconds = 0.0
+        # 运行级汇总（包括不在任何阶段内的请求）
+        self.totals = Stage(-1, name, None, 0.0, {})
+        self.hosts: Dict[str, Dict[str, float]] = {}
+
+    def open_stage(self, name: str, parent: Optional[Stage], meta: Dict[str, Any]) -> Stage:
+        with self._lock:
+            stage = Stage(self._next_id, name, parent.id if parent else None, self.clock() - self._start, meta)
+            self._next_id += 1
+            self.stages.append(stage)
+        return stage
+
+    def _targets(self) -> Tuple[Stage, ...]:
+        return (self.totals,) + _stage_stack.get()
+
+    def record_http(self, url: str, response: Any, seconds: float) -> None:
+        """记录一次HTTP请求，计入运行汇总与当前所有外层阶段"""
+        size = _response_size(response)
+        headers = getattr(response, 'headers', None) or {}
+        resource = headers.get('X-RateLimit-Resource')
+        remaining = headers.get('X-RateLimit-Remaining')
+        status = getattr(response, 'status_code', None)
+        failed = response is None or (isinstance(status, int) and status >= 400)
+        host = urlparse(url).hostname or ''
+
+        with self._lock:
+            for target in self._targets():
+                target.http_calls += 1
+                target.http_bytes += size
+                target.http_seconds += seconds
+                if failed:
+                    target.http_errors += 1
+                if resource and remaining is not None and str(remaining).isdigit():
+                    target.rate_limit[resource] = int(remaining)
+            entry = self.hosts.setdefault(host, {'calls': 0, 'bytes': 0, 'seconds': 0.0})
+            entry['calls'] += 1
+            entry['bytes'] += size
+            entry['seconds'] += seconds
+
+    def record_wait(self, seconds: float) -> None:
+        """记录一次等待（速率限制或节流睡眠）"""
+        with self._lock:
+            for target in self._targets():
+                target.wait_seconds += seconds
+
+    def finish(self) -> None:
+        now = self.clock() - self._start
+        self.wall_seconds = now
+        self.totals.wall_seconds = now
+        with self._lock:
+            # 运行结束时仍未退出的阶段（如超时后不再等待的线程）
+            for unfinished in self.stages:
+                if not unfinished.closed:
+                    unfinished.wall_seconds = now - unfinished.offset
+                    unfinished.error = unfinished.error or 'unfinished'
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """按阶段名聚合"""
+        result: Dict[str, Dict[str, Any]] = {}
+        for stage in self.stages:
+            entry = result.setdefault(stage.name, {
+                'count': 0, 'wall_seconds': 0.0, 'max_seconds': 0.0, 'http_calls': 0,
+                'http_bytes': 0, 'http_seconds': 0.0, 'wait_seconds': 0.0, 'errors': 0
+            })
+            entry['count'] += 1
+            entry['wall_seconds'] = round(entry['wall_seconds'] + stage.wall_seconds, 4)
+            entry['max_seconds'] = round(max(entry['max_seconds'], stage.wall_seconds), 4)
+            entry['http_calls'] += stage.http_calls
+            entry['http_bytes'] += stage.http_bytes
+            entry['http_seconds'] = round(entry['http_seconds'] + stage.http_seconds, 4)
+            entry['wait_seconds'] = round(entry['wait_seconds'] + stage.wait_seconds, 4)
+            entry['errors'] += 1 if stage.error else 0
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        totals = self.totals.to_dict()
+        return {
+            'version': TRACE_VERSION,
+            'run': self.name,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'wall_seconds': round(self.wall_seconds, 4),
+            'http': {
+                'calls': totals['http_calls'],
+                'bytes': totals['http_bytes'],
+                'seconds': totals['http_seconds'],
+                'errors': totals['http_errors'],
+                'hosts': {
+                    host: {**entry, 'seconds': round(entry['seconds'], 4)}
+                    for host, entry in sorted(self.hosts.items())
+                },
+            },
+            'wait_seconds': totals['wait_seconds'],
+            'rate_limit_remaining': totals['rate_limit_remaining'],
+            'summary': self.summary(),
+            'stages': [stage.to_dict() for stage in self.stages],
+        }
+
+    def write(self, trace_dir: str) -> str:
+        """写出追踪文件，返回路径"""
+        os.makedirs(trace_dir, exist_ok=True)
+        path = os.path.join(trace_dir, f"{self.name}-{self.started_at.strftime('%Y%m%d-%H%M%S')}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def print_summary(self) -> None:
+        """打印按耗时排序的阶段摘要"""
+        data = self.to_dict()
+        print(f"⏱️  {self.name} 用时 {data['wall_seconds']:.1f}s，"
+              f"HTTP {data['http']['calls']} 次 / {data['http']['bytes'] / 1024:.0f} KB / {data['http']['seconds']:.1f}s，"
+              f"等待 {data['wait_seconds']:.1f}s")
+        for name, entry in sorted(data['summary'].items(), key=lambda item: item[1]['wall_seconds'], reverse=True):
+            print(f"   {name}: {entry['count']} 次 {entry['wall_seconds']:.2f}s "
+                  f"(HTTP {entry['http_calls']} 次 {entry['http_seconds']:.2f}s, 等待 {entry['wait_seconds']:.2f}s)")
+
+
+def _response_size(response: Any) -> int:
+    """响应传输字节数：优先使用 Content-Length，非流式响应使用已读取的响应体长度"""
+    if response is None:
+        return 0
+    length = (getattr(response, 'headers', None) or {}).get('Content-Length')
+    if length is not None and str(length).isdigit():
+        return int(length)
+    content = getattr(response, '_content', None)
+    return len(content) if isinstance(content, (bytes, bytearray)) else 0
+
+
+def get_active_run() -> Optional[PipelineRun]:
+    """获取当前活动的运行（没有时返回None）"""
+    return _active_run
+
+
+@contextmanager
+def stage(name: str, **meta: Any) -> Iterator[Optional[Stage]]:
+    """
+    记录一个阶段
+
+    Args:
+        name: 阶段名，如 'github.search'
+        **meta: 附加到追踪中的元数据（需可JSON序列化）
+
+    Returns:
+        阶段对象（没有活动运行时为None）
+    """
+    run = _active_run
+    if run is None:
+        yield None
+        return
+
+    stack = _stage_stack.get()
+    current = run.open_stage(name, stack[-1] if stack else None, meta)
+    token = _stage_stack.set(stack + (current,))
+    start = run.clock()
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        current.wall_seconds = run.clock() - start
+        current.closed = True
+        _stage_stack.reset(token)
+
+
+def profiled(name: str) -> Callable[[Callable], Callable]:
+    """把函数调用记录为阶段的装饰器"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_run is None:
+                return func(*args, **kwargs)
+            with stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def propagate(func: Callable) -> Callable:
+    """包装提交到线程池的函数，使其继承当前的阶段栈"""
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        # 每次调用使用独立副本，同一个Context不能被多个线程同时进入
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+
+def record_http(url: str, response: Any, seconds: float) -> None:
+    """HTTP客户端上报一次请求（没有活动运行时忽略）"""
+    run = _active_run
+    if run is not None:
+        run.record_http(url, response, seconds)
+
+
+def record_wait(seconds: float) -> None:
+    """上报一次等待（没有活动运行时忽略）"""
+    run = _active_run
+    if run is not None:
+        run.record_wait(seconds)
+
+
+def sleep(seconds: float) -> None:
+    """计入等待时间的 time.sleep"""
+    record_wait(seconds)
+    time.sleep(seconds)
+
+
+class _CodeProfiler:
+    """可选的整体剖析（cProfile 或 pyinstrument）"""
+
+    def __init__(self, kind: str):
+        self.kind = kind
+        self._profiler = None
+        if kind == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+                self._profiler = Profiler()
+            except ImportError:
+                print("⚠️  未安装 pyinstrument，改用 cProfile")
+                self.kind = 'cprofile'
+        if self.kind == 'cprofile':
+            import cProfile
+            self._profiler = cProfile.Profile()
+
+    def start(self) -> None:
+        if self.kind == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self, base_path: str) -> List[str]:
+        """停止剖析并写出结果文件"""
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            html_path = base_path + '.html'
+            with open(html_path, 'w', encoding='utf-8') as f:
+                f.write(self._profiler.output_html())
+            return [html_path]
+
+        import io
+        import pstats
+        self._profiler.disable()
+        prof_path = base_path + '.prof'
+        self._profiler.dump_stats(prof_path)
+        text_path = base_path + '.txt'
+        buffer = io.StringIO()
+        pstats.Stats(self._profiler, stream=buffer).sort_stats('cumulative').print_stats(40)
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+        return [prof_path, text_path]
+
+
+@contextmanager
+def pipeline_run(name: str,
+                 trace_dir: Optional[str] = None,
+                 write_trace: Optional[bool] = None,
+                 profile: Optional[str] = None) -> Iterator[PipelineRun]:
+    """
+    开始一次运行，结束时打印摘要并写出追踪文件
+
+    Args:
+        name: 运行名，用于追踪文件名
+        trace_dir: 追踪目录，默认 PIPELINE_TRACE_DIR 或 data/traces
+        write_trace: 是否写出追踪，默认由 PIPELINE_TRACE 决定（未设置时写出）
+        profile: 'cprofile' / 'pyinstrument'，默认读取 PIPELINE_PROFILE
+
+    Returns:
+        运行对象
+    """
+    global _active_run
+    trace_dir = trace_dir or os.getenv('PIPELINE_TRACE_DIR', DEFAULT_TRACE_DIR)
+    if write_trace is None:
+        write_trace = os.getenv('PIPELINE_TRACE', '1') != '0'
+    profile = (profile if profile is not None else os.getenv('PIPELINE_PROFILE', '')).strip().lower()
+
+    previous = _active_run
+    run = PipelineRun(name)
+    _active_run = run
+    code_profiler = _CodeProfiler(profile) if profile in ('cprofile', 'pyinstrument') else None
+    if code_profiler:
+        code_profiler.start()
+    try:
+        with stage(name):
+            yield run
+    finally:
+        profile_files = []
+        if code_profiler:
+            os.makedirs(trace_dir, exist_ok=True)
+            base_path = os.path.join(trace_dir, f"{name}-{run.started_at.strftime('%Y%m%d-%H%M%S')}")
+            profile_files = code_profiler.stop(base_path)
+        _active_run = previous
+        run.finish()
+        run.print_summary()
+        if write_trace:
+            try:
+                print(f"🧭 运行追踪已写入: {run.write(trace_dir)}")
+            except OSError as e:
+                print(f"⚠️  写入运行追踪失败: {e}")
+        for path in profile_files:
+            print(f"🔬 性能剖析已写入: {path}")
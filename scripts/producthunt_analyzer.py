@@ -4,24 +4,32 @@ Product Hunt今日TOP3产品自动分析和文章生成器
 每日抓取Product Hunt主页的"Top Products Launching Today"榜单前三名，生成专业评测文章
 """
 
-import requests
 import json
 import os
 import datetime
 from typing import List, Dict, Any, Set
-import time
 import re
 import hashlib
 from bs4 import BeautifulSoup
-from difflib import SequenceMatcher
 from dotenv import load_dotenv
+from http_client import HTTPClient, get_shared_client
+from producthunt_history import ProductHistoryIndex, normalize_product_name
+from similarity_index import SimilarityIndex, MinHasher
+import pipeline_profiler
+from pipeline_profiler import pipeline_run, profiled
+
+# 产品描述近似重复的相似度阈值（MinHash 估计的 Jaccard 相似度）
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('PRODUCTHUNT_SIMILARITY_THRESHOLD', '0.8'))
 
 # 加载环境变量
 load_dotenv()
 
 
 class ProductHuntAnalyzer:
-    def __init__(self):
+    def __init__(self, http_client: HTTPClient = None):
+        # 共享HTTP客户端（连接池复用）
+        self.http = http_client or get_shared_client()
+        
         # API配置
         self.api_base_url = os.getenv('PRODUCT_HUNT_BASE_URL', 'https://api.producthunt.com/v2/api/graphql')
         self.developer_token = os.getenv('PRODUCT_HUNT_DEVELOPER_TOKEN')
@@ -58,6 +66,10 @@ class ProductHuntAnalyzer:
         # 产品历史记录文件路径
         self.history_file = 'data/producthunt_products.json'
         self.content_history_file = 'data/producthunt_content_history.json'
+        self.similarity_index_file = 'data/similarity_index.json'
+        self._history_index = None
+        self._similarity_index = None
+        self.last_article_path = None
         self.ensure_data_directory()
         
         # 打印API状态
@@ -106,9 +118,32 @@ class ProductHuntAnalyzer:
         except Exception as e:
             print(f"⚠️  保存内容历史记录失败: {e}")
     
+    @property
+    def similarity_index(self) -> SimilarityIndex:
+        """产品与文章的 MinHash LSH 索引（首次使用时加载一次）"""
+        if self._similarity_index is None:
+            self._similarity_index = SimilarityIndex.load(self.similarity_index_file)
+        return self._similarity_index
+    
     def calculate_content_similarity(self, text1: str, text2: str) -> float:
-        """计算两个文本的相似度"""
-        return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
+        """计算两个文本的相似度（MinHash 估计的 Jaccard 相似度）"""
+        hasher = self.similarity_index.hasher
+        return MinHasher.similarity(hasher.signature(text1), hasher.signature(text2))
+    
+    @staticmethod
+    def _product_text(product: Dict) -> str:
+        """用于近似重复比较的产品文本"""
+        return f"{product.get('name', '')} {product.get('description', '')}"
+    
+    def record_similarity(self, products: List[Dict]) -> None:
+        """把本次发布的产品和文章加入相似度索引"""
+        index = self.similarity_index
+        for product in products:
+            index.add(f"product:{normalize_product_name(product.get('name', ''))}", self._product_text(product),
+                      kind='product', label=product.get('name', ''))
+        if self.last_article_path and os.path.exists(self.last_article_path):
+            index.add_post(self.last_article_path)
+        index.save()
     
     def generate_content_hash(self, products: List[Dict]) -> str:
         """生成产品组合的内容哈希"""
@@ -129,30 +164,32 @@ class ProductHuntAnalyzer:
         
         return hashlib.md5(' '.join(key_features).encode('utf-8')).hexdigest()
     
-    def has_recent_product(self, product_name: str, days: int = 7) -> bool:
-        """检查最近几天是否已经分析过同名产品"""
+    @property
+    def history_index(self) -> ProductHistoryIndex:
+        """已分析产品的内存索引（首次使用时加载一次）"""
+        if self._history_index is None:
+            self._history_index = self._load_history_index()
+        return self._history_index
+    
+    def _load_history_index(self) -> ProductHistoryIndex:
+        """读取持久化的索引，旧文件没有索引时从 analyzed_products 迁移"""
         try:
-            analyzed_products = self.load_analyzed_products()
-            today = datetime.datetime.now()
-            
-            for product_id in analyzed_products:
-                if product_name.lower() in product_id.lower():
-                    # 从产品ID中提取日期
-                    parts = product_id.split('-')
-                    if len(parts) >= 2:
-                        date_str = '-'.join(parts[-3:])  # 取最后3部分作为日期
-                        try:
-                            product_date = datetime.datetime.strptime(date_str, '%Y-%m-%d')
-                            days_diff = (today - product_date).days
-                            if days_diff <= days:
-                                print(f"🔄 产品 {product_name} 在 {days_diff} 天前已经分析过")
-                                return True
-                        except ValueError:
-                            continue
-            return False
+            if os.path.exists(self.history_file):
+                with open(self.history_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if isinstance(data.get('history_index'), dict):
+                    return ProductHistoryIndex.from_dict(data['history_index'])
         except Exception as e:
-            print(f"⚠️  检查最近产品失败: {e}")
+            print(f"⚠️  加载产品历史索引失败: {e}")
+        return ProductHistoryIndex.from_ids(self.load_analyzed_products())
+    
+    def has_recent_product(self, product_name: str, days: int = 7) -> bool:
+        """检查最近几天是否已经分析过同名产品"""
+        days_diff = self.history_index.seen_within(product_name, days)
+        if days_diff is None:
             return False
+        print(f"🔄 产品 {product_name} 在 {days_diff} 天前已经分析过")
+        return True
     
     def is_duplicate_content(self, products: List[Dict]) -> bool:
         """检查是否为重复内容"""
@@ -189,6 +226,17 @@ class ProductHuntAnalyzer:
                             print(f"🔄 检测到 {days_diff} 天前相似产品特征")
                             return True
             
+            # 检查描述近似重复的产品（最近3天，LSH 只比较候选条目）
+            for product in products:
+                matches = self.similarity_index.find_similar(
+                    self._product_text(product), NEAR_DUPLICATE_THRESHOLD, days=3, kind='product'
+                )
+                if matches:
+                    item_id, score = matches[0]
+                    print(f"🔄 产品 {product.get('name', '')} 与最近的 {self.similarity_index.label(item_id)} "
+                          f"相似度 {score:.0%}")
+                    return True
+            
             return False
         except Exception as e:
             print(f"⚠️  内容重复检查失败: {e}")
@@ -209,16 +257,23 @@ class ProductHuntAnalyzer:
     def save_analyzed_products(self, analyzed_products: Set[str]):
         """保存已分析的产品历史记录"""
         try:
+            index = self.history_index
+            for product_id in analyzed_products:
+                if product_id not in index.ids:
+                    index.add_id(product_id)
+            
             data = {
                 'last_updated': datetime.datetime.now().isoformat(),
                 'analyzed_products': list(analyzed_products),
-                'total_products': len(analyzed_products)
+                'total_products': len(analyzed_products),
+                'history_index': index.to_dict()
             }
             with open(self.history_file, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
         except Exception as e:
             print(f"⚠️  保存产品历史记录失败: {e}")
     
+    @profiled('producthunt.fetch')
     def fetch_top_products(self) -> List[Dict]:
         """抓取Product Hunt今日TOP3产品 - 优先使用官方API"""
         # 尝试使用官方API
@@ -279,7 +334,7 @@ class ProductHuntAnalyzer:
             }
             """
             
-            response = requests.post(
+            response = self.http.post(
                 self.api_base_url,
                 headers=self.api_headers,
                 json={'query': query},
@@ -324,7 +379,7 @@ class ProductHuntAnalyzer:
         
         try:
             print("🔍 尝试从网页抓取Product Hunt今日热门产品...")
-            response = requests.get(main_url, headers=self.headers, timeout=30)
+            response = self.http.get(main_url, headers=self.headers, timeout=30)
             
             if response.status_code == 403:
                 print("⚠️  网页访问被阻止（Cloudflare保护）")
@@ -576,6 +631,7 @@ class ProductHuntAnalyzer:
             print(f"⚠️  提取产品信息失败: {e}")
             return {}
     
+    @profiled('producthunt.details')
     def get_product_details(self, product: Dict) -> Dict:
         """获取产品详细信息"""
         try:
@@ -583,7 +639,7 @@ class ProductHuntAnalyzer:
                 return product
             
             print(f"📝 获取产品详情: {product['name']}")
-            response = requests.get(product['url'], headers=self.headers, timeout=15)
+            response = self.http.get(product['url'], headers=self.headers, timeout=15)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -725,6 +781,7 @@ class ProductHuntAnalyzer:
         
         return analysis
     
+    @profiled('render.article')
     def generate_article(self, products: List[Dict]) -> bool:
         """生成评测文章"""
         if not products:
@@ -823,12 +880,14 @@ tags: ["Product Hunt", "产品评测", "创业项目", "科技创新", "热门
         try:
             with open(filepath, 'w', encoding='utf-8') as f:
                 f.write(content)
+            self.last_article_path = filepath
             print(f"✅ 成功生成文章: {filename}")
             return True
         except Exception as e:
             print(f"❌ 生成文章失败: {e}")
             return False
     
+    @profiled('producthunt.run_analysis')
     def run_analysis(self, max_products: int = 3) -> bool:
         """运行完整的分析流程"""
         print("🚀 开始Product Hunt TOP3产品分析...")
@@ -867,7 +926,7 @@ tags: ["Product Hunt", "产品评测", "创业项目", "科技创新", "热门
                 analyzed_products.add(product_id)
                 
                 # 添加延迟避免过于频繁的请求
-                time.sleep(2)
+                pipeline_profiler.sleep(2)
             else:
                 print(f"⏭️  产品 {product['name']} 今日已分析过，跳过")
         
@@ -886,6 +945,7 @@ tags: ["Product Hunt", "产品评测", "创业项目", "科技创新", "热门
                 content_hash = self.generate_content_hash(new_products)
                 product_signature = self.generate_product_signature(new_products[0])  # 使用第一个产品作为代表
                 self.save_content_history(content_hash, product_signature)
+                self.record_similarity(new_products)
                 
                 print(f"🎉 分析完成！共分析 {len(new_products)} 个产品")
                 return True
@@ -896,8 +956,9 @@ tags: ["Product Hunt", "产品评测", "创业项目", "科技创新", "热门
 
 def main():
     """主函数"""
-    analyzer = ProductHuntAnalyzer()
-    success = analyzer.run_analysis(max_products=3)
+    with pipeline_run('producthunt'):
+        analyzer = ProductHuntAnalyzer()
+        success = analyzer.run_analysis(max_products=3)
     
     if not success:
         print("❌ 分析过程中出现问题")
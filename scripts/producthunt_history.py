@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Product Hunt 已分析产品的内存索引
+GitHot - GitHub热门项目评测
+
+旧格式只保存 "产品名-YYYY-MM-DD" 字符串列表，每次查询都要重新读文件、
+逐条做子串匹配并解析日期。本模块在加载时建立一次索引：
+
+    规范化产品名 -> 升序的分析日期（date.toordinal()）
+
+"最近 N 天是否分析过" 变为一次字典查询加一次二分查找。索引以
+{"规范化名称": {"name": 原名称, "dates": ["YYYY-MM-DD", ...]}} 的形式
+与旧的 analyzed_products 列表一起保存，读取时不再需要解析字符串。
+"""
+
+import re
+import datetime
+from bisect import bisect_left, bisect_right, insort
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+HISTORY_INDEX_VERSION = 1
+
+_ID_PATTERN = re.compile(r'^(.*)-(\d{4}-\d{2}-\d{2})$')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_product_name(name: str) -> str:
+    """规范化产品名：小写并合并空白"""
+    return _WHITESPACE.sub(' ', (name or '').strip().lower())
+
+
+class ProductHistoryIndex:
+    """按规范化产品名索引的分析日期"""
+
+    def __init__(self):
+        self._dates: Dict[str, List[int]] = {}
+        self._names: Dict[str, str] = {}
+        # 已收录的旧格式ID，避免保存时重复解析
+        self.ids: Set[str] = set()
+
+    @classmethod
+    def from_ids(cls, product_ids: Iterable[str]) -> 'ProductHistoryIndex':
+        """从旧格式 "产品名-YYYY-MM-DD" 列表建立索引（仅迁移时解析一次）"""
+        index = cls()
+        for product_id in product_ids:
+            index.add_id(product_id)
+        return index
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ProductHistoryIndex':
+        """从持久化格式加载"""
+        index = cls()
+        for key, entry in (data.get('products') or {}).items():
+            for date_str in entry.get('dates', []):
+                try:
+                    index.add(entry.get('name') or key, datetime.date.fromisoformat(date_str))
+                except ValueError:
+                    continue
+        return index
+
+    def to_dict(self) -> Dict[str, Any]:
+        """持久化格式"""
+        return {
+            'version': HISTORY_INDEX_VERSION,
+            'products': {
+                key: {
+                    'name': self._names[key],
+                    'dates': [datetime.date.fromordinal(day).isoformat() for day in days]
+                }
+                for key, days in sorted(self._dates.items())
+            }
+        }
+
+    def add(self, name: str, date: datetime.date) -> None:
+        """记录产品在某天被分析"""
+        key = normalize_product_name(name)
+        if not key:
+            return
+        days = self._dates.setdefault(key, [])
+        day = date.toordinal()
+        position = bisect_left(days, day)
+        if position == len(days) or days[position] != day:
+            insort(days, day)
+        self._names.setdefault(key, name)
+        self.ids.add(f"{name}-{date.isoformat()}")
+
+    def add_id(self, product_id: str) -> bool:
+        """解析并记录旧格式ID，无法解析时返回False"""
+        match = _ID_PATTERN.match(product_id)
+        if not match:
+            return False
+        try:
+            date = datetime.date.fromisoformat(match.group(2))
+        except ValueError:
+            return False
+        self.add(match.group(1), date)
+        self.ids.add(product_id)
+        return True
+
+    def seen_within(self, name: str, days: int, today: Optional[datetime.date] = None) -> Optional[int]:
+        """
+        最近 days 天内是否分析过该产品
+
+        Returns:
+            距今天数（未分析过时返回None）
+        """
+        history = self._dates.get(normalize_product_name(name))
+        if not history:
+            return None
+        today_ordinal = (today or datetime.date.today()).toordinal()
+        # 不晚于今天的最近一次分析
+        position = bisect_right(history, today_ordinal)
+        if position == 0 or history[position - 1] < today_ordinal - days:
+            return None
+        return today_ordinal - history[position - 1]
+
+    def __len__(self) -> int:
+        return len(self._dates)
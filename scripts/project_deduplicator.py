@@ -11,26 +11,105 @@
 """
 
 import os
-import json
 import hashlib
 import re
 import datetime
-from typing import Dict, Set, Any, Optional
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Set, Any, Optional, Iterator, Iterable, List, Callable, Tuple
 from urllib.parse import urlparse
 
+from dedup_storage import DedupStorage, create_storage, migrate_v1_list
+
+
+# SSH格式 git@github.com:owner/repo(.git)
+_SSH_PATTERN = re.compile(r'git@github\.com:([^/]+/[^/]+?)(?:\.git)?(?:/|$)')
+_GITHUB_HOSTS = frozenset({'github.com', 'api.github.com'})
+
+
+@lru_cache(maxsize=4096)
+def _normalize_github_url(github_url: str) -> str:
+    """normalize_github_url 的实现，按原始URL做有界缓存"""
+    # 移除前后空白
+    url = github_url.strip()
+    
+    # 处理SSH格式
+    ssh_match = _SSH_PATTERN.match(url)
+    if ssh_match:
+        return ssh_match.group(1)
+    
+    # 处理HTTPS格式
+    try:
+        parsed = urlparse(url)
+        if parsed.hostname in _GITHUB_HOSTS:
+            path = parsed.path.strip('/')
+            
+            # 处理 api.github.com/repos/owner/repo 格式
+            if path.startswith('repos/'):
+                path = path[6:]  # 移除 'repos/' 前缀
+            
+            # 移除 .git 后缀
+            if path.endswith('.git'):
+                path = path[:-4]
+            
+            # 验证格式为 owner/repo
+            parts = path.split('/')
+            if len(parts) >= 2:
+                return f"{parts[0]}/{parts[1]}"
+    except Exception:
+        # 解析失败，返回原始URL
+        pass
+    
+    return github_url
+
+
+def project_identifier(project: Dict[str, Any]) -> str:
+    """
+    项目标准化标识符（与 ProjectDeduplicator 的历史记录键一致，无需加载历史）
+
+    Args:
+        project: 项目信息字典
+
+    Returns:
+        小写的 owner/repo 标识符
+    """
+    if project.get('full_name'):
+        return project['full_name'].lower()
+
+    html_url = project.get('html_url')
+    return _identifier_with(project, _normalize_github_url(html_url) if isinstance(html_url, str) and html_url else None)
+
+
+def _identifier_with(project: Dict[str, Any], normalized_url: Optional[str]) -> str:
+    # 优先使用 full_name
+    if 'full_name' in project and project['full_name']:
+        return project['full_name'].lower()
+    
+    # 使用标准化URL
+    if normalized_url and normalized_url != project['html_url']:
+        return normalized_url.lower()
+    
+    # 备用方案：使用owner/name组合
+    owner = project.get('owner', {}).get('login', 'unknown')
+    name = project.get('name', 'unknown')
+    return f"{owner}/{name}".lower()
+
 
 class ProjectDeduplicator:
     """项目去重管理器 - 负责检查和管理项目重复性"""
     
-    def __init__(self, history_file_path: str):
+    def __init__(self, history_file_path: str, storage: Optional[DedupStorage] = None):
         """
         初始化去重器
         
         Args:
             history_file_path: 历史记录文件路径
+            storage: 存储后端，默认按 DEDUP_STORAGE 环境变量创建
         """
         self.history_file_path = history_file_path
         self._ensure_directory()
+        self.storage = storage if storage is not None else create_storage(history_file_path)
+        self._batch_depth = 0
         self._analyzed_projects = self._load_analyzed_projects()
     
     def _ensure_directory(self) -> None:
@@ -41,7 +120,7 @@ class ProjectDeduplicator:
     
     def normalize_github_url(self, github_url: str) -> str:
         """
-        标准化GitHub URL
+        标准化GitHub URL（结果按原始URL缓存）
         
         Args:
             github_url: 原始GitHub URL
@@ -58,38 +137,7 @@ class ProjectDeduplicator:
         if not github_url or not isinstance(github_url, str):
             return github_url
         
-        # 移除前后空白
-        url = github_url.strip()
-        
-        # 处理SSH格式 git@github.com:owner/repo.git
-        ssh_pattern = r'git@github\.com:([^/]+/[^/]+)(?:\.git)?'
-        ssh_match = re.match(ssh_pattern, url)
-        if ssh_match:
-            return ssh_match.group(1)
-        
-        # 处理HTTPS格式
-        try:
-            parsed = urlparse(url)
-            if parsed.hostname == 'github.com' or parsed.hostname == 'api.github.com':
-                path = parsed.path.strip('/')
-                
-                # 处理 api.github.com/repos/owner/repo 格式
-                if path.startswith('repos/'):
-                    path = path[6:]  # 移除 'repos/' 前缀
-                
-                # 移除 .git 后缀
-                if path.endswith('.git'):
-                    path = path[:-4]
-                
-                # 验证格式为 owner/repo
-                if '/' in path and len(path.split('/')) >= 2:
-                    parts = path.split('/')
-                    return f"{parts[0]}/{parts[1]}"
-        except Exception:
-            # 解析失败，返回原始URL
-            pass
-        
-        return github_url
+        return _normalize_github_url(github_url)
     
     def generate_project_hash(self, project_info: Dict[str, Any]) -> str:
         """
@@ -101,6 +149,44 @@ class ProjectDeduplicator:
         Returns:
             项目的SHA256哈希标识符
         """
+        return self._hash_with(project_info, self._normalized_html_url(project_info))
+    
+    def _get_project_identifier(self, project: Dict[str, Any]) -> str:
+        """
+        获取项目标准化标识符
+        
+        Args:
+            project: 项目信息字典
+            
+        Returns:
+            标准化的项目标识符
+        """
+        # 优先使用 full_name，此时无需标准化URL
+        if 'full_name' in project and project['full_name']:
+            return project['full_name'].lower()
+        
+        return self._identifier_with(project, self._normalized_html_url(project))
+    
+    def _get_project_keys(self, project: Dict[str, Any]) -> Tuple[str, str]:
+        """
+        一次计算项目的标识符和哈希（共享同一次URL标准化）
+        
+        Returns:
+            (项目标识符, 项目哈希)
+        """
+        normalized_url = self._normalized_html_url(project)
+        return self._identifier_with(project, normalized_url), self._hash_with(project, normalized_url)
+    
+    def _normalized_html_url(self, project: Dict[str, Any]) -> Optional[str]:
+        """返回标准化后的 html_url，没有 html_url 时返回None"""
+        if 'html_url' in project and project['html_url']:
+            return self.normalize_github_url(project['html_url'])
+        return None
+    
+    def _identifier_with(self, project: Dict[str, Any], normalized_url: Optional[str]) -> str:
+        return _identifier_with(project, normalized_url)
+    
+    def _hash_with(self, project_info: Dict[str, Any], normalized_url: Optional[str]) -> str:
         # 提取关键标识信息
         identifier_parts = []
         
@@ -109,8 +195,7 @@ class ProjectDeduplicator:
             identifier_parts.append(project_info['full_name'].lower())
         
         # 使用标准化的GitHub URL
-        if 'html_url' in project_info and project_info['html_url']:
-            normalized_url = self.normalize_github_url(project_info['html_url'])
+        if normalized_url is not None:
             identifier_parts.append(normalized_url.lower())
         
         # 使用项目ID作为备用标识
@@ -121,31 +206,6 @@ class ProjectDeduplicator:
         combined_identifier = '|'.join(identifier_parts)
         return hashlib.sha256(combined_identifier.encode('utf-8')).hexdigest()
     
-    def _get_project_identifier(self, project: Dict[str, Any]) -> str:
-        """
-        获取项目标准化标识符
-        
-        Args:
-            project: 项目信息字典
-            
-        Returns:
-            标准化的项目标识符
-        """
-        # 优先使用 full_name
-        if 'full_name' in project and project['full_name']:
-            return project['full_name'].lower()
-        
-        # 使用标准化URL
-        if 'html_url' in project and project['html_url']:
-            normalized = self.normalize_github_url(project['html_url'])
-            if normalized and normalized != project['html_url']:
-                return normalized.lower()
-        
-        # 备用方案：使用owner/name组合
-        owner = project.get('owner', {}).get('login', 'unknown')
-        name = project.get('name', 'unknown')
-        return f"{owner}/{name}".lower()
-    
     def is_duplicate_project(self, project: Dict[str, Any]) -> bool:
         """
         检查项目是否为重复项目
@@ -160,6 +220,40 @@ class ProjectDeduplicator:
         project_identifier = self._get_project_identifier(project)
         return project_identifier in self._analyzed_projects
     
+    def filter_new_projects(self,
+                            projects: Iterable[Dict[str, Any]],
+                            on_duplicate: Optional[Callable[[Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+        """
+        批量过滤出未分析过的项目
+        
+        每个项目只计算一次标识符；同一批次内标识符相同的项目只保留第一个。
+        
+        Args:
+            projects: 项目信息列表（如GitHub搜索结果）
+            on_duplicate: 遇到已分析项目时的回调（批次内重复不触发）
+            
+        Returns:
+            保持原有顺序的新项目列表
+        """
+        analyzed = self._analyzed_projects
+        seen: Set[str] = set()
+        new_projects = []
+        
+        for project in projects:
+            project_identifier = self._get_project_identifier(project)
+            if project_identifier in seen:
+                continue
+            seen.add(project_identifier)
+            
+            if project_identifier in analyzed:
+                if on_duplicate:
+                    on_duplicate(project)
+                continue
+            
+            new_projects.append(project)
+        
+        return new_projects
+    
     def add_analyzed_project(self, project: Dict[str, Any]) -> None:
         """
         将项目添加到已分析列表
@@ -167,20 +261,74 @@ class ProjectDeduplicator:
         Args:
             project: 项目信息字典
         """
-        project_identifier = self._get_project_identifier(project)
-        project_hash = self.generate_project_hash(project)
+        project_identifier, project_hash = self._get_project_keys(project)
         
         # 添加项目记录
-        self._analyzed_projects[project_identifier] = {
+        self.storage.put(project_identifier, {
             'added_date': datetime.datetime.now().isoformat(),
             'project_hash': project_hash,
             'github_url': project.get('html_url', ''),
             'stars_when_analyzed': project.get('stargazers_count', 0)
-        }
+        })
         
-        # 保存到文件
+        # 批量模式下延迟到 batch 结束时统一保存
+        if not self._batch_depth:
+            self._save_analyzed_projects()
+    
+    @contextmanager
+    def batch(self) -> Iterator['ProjectDeduplicator']:
+        """
+        批量添加上下文：期间的 add_analyzed_project 只修改内存，退出时统一保存
+        
+        Examples:
+            with deduplicator.batch():
+                for project in projects:
+                    deduplicator.add_analyzed_project(project)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._save_analyzed_projects()
+    
+    def flush(self) -> None:
+        """立即保存未持久化的修改"""
         self._save_analyzed_projects()
     
+    def close(self) -> None:
+        """保存并关闭存储后端（追加日志后端会压缩回 v2 JSON 快照）"""
+        self.storage.close()
+    
+    def find_by_hash(self, project_hash: str) -> Optional[str]:
+        """
+        按项目哈希查询已分析项目
+        
+        Args:
+            project_hash: generate_project_hash 生成的哈希
+            
+        Returns:
+            项目标识符，未找到时返回None
+        """
+        return self.storage.find_by_hash(project_hash)
+    
+    def export_v2(self) -> Dict[str, Any]:
+        """导出为 v2 JSON 结构"""
+        return self.storage.export_v2()
+    
+    def import_v2(self, data: Dict[str, Any]) -> int:
+        """
+        导入 v2 JSON 结构的历史记录并保存
+        
+        Returns:
+            导入的记录数
+        """
+        count = self.storage.import_v2(data)
+        if not self._batch_depth:
+            self._save_analyzed_projects()
+        return count
+    
     def get_project_statistics(self) -> Dict[str, Any]:
         """
         获取项目统计信息
@@ -208,26 +356,9 @@ class ProjectDeduplicator:
         加载已分析的项目历史记录
         
         Returns:
-            已分析项目字典
+            已分析项目字典（存储后端的内存索引）
         """
-        try:
-            if os.path.exists(self.history_file_path):
-                with open(self.history_file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    
-                    # 处理旧格式数据（列表格式）
-                    if 'analyzed_projects' in data:
-                        if isinstance(data['analyzed_projects'], list):
-                            # 迁移旧格式数据
-                            return self._migrate_from_list_format(data['analyzed_projects'])
-                        elif isinstance(data['analyzed_projects'], dict):
-                            return data['analyzed_projects']
-                    
-                    return {}
-            return {}
-        except Exception as e:
-            print(f"⚠️  加载项目历史记录失败: {e}")
-            return {}
+        return self.storage.load()
     
     def _migrate_from_list_format(self, old_data: list) -> Dict[str, Any]:
         """
@@ -239,38 +370,11 @@ class ProjectDeduplicator:
         Returns:
             新格式的项目字典
         """
-        migrated_data = {}
-        current_time = datetime.datetime.now().isoformat()
-        
-        for project_key in old_data:
-            if isinstance(project_key, str):
-                migrated_data[project_key] = {
-                    'added_date': current_time,
-                    'project_hash': hashlib.sha256(project_key.encode('utf-8')).hexdigest(),
-                    'github_url': f"https://github.com/{project_key}",
-                    'stars_when_analyzed': 0,
-                    'migrated_from_v1': True
-                }
-        
-        print(f"✅ 已迁移 {len(migrated_data)} 个项目记录到新格式")
-        return migrated_data
+        return migrate_v1_list(old_data)
     
     def _save_analyzed_projects(self) -> None:
         """保存已分析的项目历史记录"""
-        try:
-            data = {
-                'version': '2.0',
-                'last_updated': datetime.datetime.now().isoformat(),
-                'total_projects': len(self._analyzed_projects),
-                'analyzed_projects': self._analyzed_projects
-            }
-            
-            with open(self.history_file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-        except Exception as e:
-            print(f"⚠️  保存项目历史记录失败: {e}")
-
+        self.storage.flush()
 
 if __name__ == "__main__":
     # 简单的演示用法
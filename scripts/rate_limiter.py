@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+GitHub API 速率限制调度器
+GitHot - GitHub热门项目评测
+
+替代代码中固定的 time.sleep 节流：
+- search 与 core（以及 graphql）配额分别使用独立的令牌桶
+- 根据响应头 X-RateLimit-Remaining / X-RateLimit-Reset / X-RateLimit-Limit 校正本地预算
+- 403/429 限流响应根据 Retry-After 或重置时间暂停对应配额
+- 只有预算确实不足时才等待，配额充足时请求不做任何延迟
+"""
+
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import pipeline_profiler
+
+
+class RateLimitExceeded(Exception):
+    """等待时间超过允许上限时抛出"""
+
+
+class TokenBucket:
+    """令牌桶：容量为窗口内的请求上限，按窗口长度匀速补充"""
+
+    def __init__(self, capacity: int, window_seconds: float, clock: Callable[[], float] = time.time):
+        self.window_seconds = window_seconds
+        self.clock = clock
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated_at = clock()
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.window_seconds
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.refill_rate)
+        self.updated_at = now
+
+    def try_take(self) -> float:
+        """尝试取出一个令牌，成功返回0，否则返回需要等待的秒数"""
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.refill_rate
+
+    def refund(self) -> None:
+        """归还令牌（如304响应不计入配额）"""
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+    def resize(self, capacity: int) -> None:
+        """按服务端返回的配额上限调整容量"""
+        self._refill()
+        self.capacity = float(capacity)
+        self.tokens = min(self.tokens, self.capacity)
+
+    def cap(self, remaining: int) -> None:
+        """以服务端剩余配额为准，本地令牌数不得超过剩余配额"""
+        self._refill()
+        self.tokens = min(self.tokens, float(remaining))
+
+
+class GitHubRateLimiter:
+    """按 GitHub 配额类型调度请求的速率限制器（线程安全）"""
+
+    # 配额：(窗口秒数, 认证上限, 未认证上限)
+    QUOTAS = {
+        'search': (60, 30, 10),
+        'core': (3600, 5000, 60),
+        'graphql': (3600, 5000, 0),
+    }
+
+    def __init__(self,
+                 authenticated: bool = True,
+                 max_wait: float = 300,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        初始化速率限制器
+
+        Args:
+            authenticated: 是否使用Token认证（决定初始配额）
+            max_wait: 单次最多等待秒数，超过时抛出 RateLimitExceeded
+            clock: 时间函数（便于测试）
+            sleep: 等待函数（便于测试）
+        """
+        self.max_wait = max_wait
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._blocked_until: Dict[str, float] = {}
+        self._remaining: Dict[str, int] = {}
+        self.total_wait = 0.0
+
+        self.buckets: Dict[str, TokenBucket] = {}
+        for resource, (window, auth_limit, anon_limit) in self.QUOTAS.items():
+            limit = auth_limit if authenticated else anon_limit
+            self.buckets[resource] = TokenBucket(max(limit, 1), window, clock)
+
+    @classmethod
+    def from_env(cls) -> 'GitHubRateLimiter':
+        """根据 GITHUB_TOKEN / GITHUB_RATE_MAX_WAIT 环境变量创建"""
+        return cls(
+            authenticated=bool(os.getenv('GITHUB_TOKEN')),
+            max_wait=float(os.getenv('GITHUB_RATE_MAX_WAIT', '300'))
+        )
+
+    def resource_for(self, url: str) -> Optional[str]:
+        """返回URL对应的配额类型，非GitHub API请求返回None"""
+        parsed = urlparse(url)
+        if parsed.hostname != 'api.github.com':
+            return None
+        if parsed.path.startswith('/search/'):
+            return 'search'
+        if parsed.path.startswith('/graphql'):
+            return 'graphql'
+        return 'core'
+
+    def acquire(self, resource: str) -> None:
+        """获取一次请求配额，预算不足时等待"""
+        while True:
+            with self._lock:
+                now = self.clock()
+                wait = max(self._blocked_until.get(resource, 0) - now, 0)
+                if wait == 0:
+                    wait = self.buckets[resource].try_take()
+                    if wait == 0:
+                        return
+
+            if wait > self.max_wait:
+                raise RateLimitExceeded(f"GitHub {resource} 配额需等待 {wait:.0f} 秒，超过上限 {self.max_wait:.0f} 秒")
+
+            print(f"⏳ GitHub {resource} 配额不足，等待 {wait:.1f} 秒")
+            self.total_wait += wait
+            pipeline_profiler.record_wait(wait)
+            self.sleep(wait)
+
+    def update_from_response(self, resource: str, response) -> None:
+        """根据响应头校正配额状态"""
+        headers = response.headers
+        with self._lock:
+            bucket = self.buckets[resource]
+
+            if response.status_code == 304:
+                # 条件请求命中不计入配额
+                bucket.refund()
+
+            limit = _int_header(headers, 'X-RateLimit-Limit')
+            if limit and limit != int(bucket.capacity):
+                bucket.resize(limit)
+
+            remaining = _int_header(headers, 'X-RateLimit-Remaining')
+            reset = _int_header(headers, 'X-RateLimit-Reset')
+            if remaining is not None:
+                self._remaining[resource] = remaining
+                bucket.cap(remaining)
+                if remaining == 0 and reset:
+                    self._blocked_until[resource] = max(self._blocked_until.get(resource, 0), reset + 1)
+
+            if self.is_rate_limited(response):
+                retry_after = _int_header(headers, 'Retry-After')
+                if retry_after is not None:
+                    until = self.clock() + retry_after
+                elif reset:
+                    until = reset + 1
+                else:
+                    until = self.clock() + 60
+                self._blocked_until[resource] = max(self._blocked_until.get(resource, 0), until)
+
+    def is_rate_limited(self, response) -> bool:
+        """判断响应是否为限流响应（主/次级速率限制）"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        headers = response.headers
+        return headers.get('Retry-After') is not None or headers.get('X-RateLimit-Remaining') == '0'
+
+    def get_status(self) -> Dict[str, Dict[str, float]]:
+        """获取各配额的当前状态"""
+        with self._lock:
+            return {
+                resource: {
+                    'tokens': round(bucket.tokens, 2),
+                    'capacity': bucket.capacity,
+                    'remaining': self._remaining.get(resource),
+                    'blocked_until': self._blocked_until.get(resource, 0)
+                }
+                for resource, bucket in self.buckets.items()
+            }
+
+
+def _int_header(headers, name: str) -> Optional[int]:
+    value = headers.get(name)
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
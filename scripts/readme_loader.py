@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+按需加载的 README 摘要
+GitHot - GitHub热门项目评测
+
+原先每个候选项目都通过 /repos/{owner}/{repo}/readme 下载完整的 base64 README，
+解码后只保留前 2000 个字符，大型 README 会白白下载和解码数 MB。本模块：
+
+- 以原始格式（application/vnd.github.raw）流式读取，最多读取摘要所需的字节数后断开，
+  同时带 Range 头，服务端支持时只返回所需范围
+- 在本地 SQLite 中按项目标识符记录 README 的 blob SHA、ETag、pushed_at 和摘要：
+  blob SHA（GraphQL 查询得到）或 pushed_at 未变化时直接复用摘要，不发请求；
+  否则带 If-None-Match 发送条件请求，304 不计入速率限制
+- project_details 只携带加载函数（readme_loader），由 readme_text() 在评估、
+  分类等真正需要 README 的阶段首次访问时才获取
+
+数据库默认放在 data/github_cache/ 下，随 GitHub 响应缓存一起在工作流间保留。
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Any, Optional
+
+from http_client import HTTPClient, get_shared_client
+from project_deduplicator import project_identifier
+
+README_EXCERPT_CHARS = 2000
+DEFAULT_DB_PATH = 'data/github_cache/readmes.sqlite3'
+
+
+def readme_text(project_details: Dict[str, Any]) -> str:
+    """
+    获取 project_details 中的 README 摘要
+
+    摘要尚未加载时调用其中的 readme_loader（只调用一次，结果写回 readme_content）。
+
+    Args:
+        project_details: 项目详情（含 readme_content 或 readme_loader）
+
+    Returns:
+        README 摘要，没有README或获取失败时为空字符串
+    """
+    if 'readme_content' not in project_details:
+        loader = project_details.pop('readme_loader', None)
+        project_details['readme_content'] = (loader() if loader else '') or ''
+    return project_details['readme_content'] or ''
+
+
+class ReadmeLoader:
+    """README 摘要加载器（线程安全，数据库在首次加载时打开）"""
+
+    RAW_ACCEPT = 'application/vnd.github.raw'
+
+    def __init__(self,
+                 headers: Dict[str, str],
+                 http_client: HTTPClient = None,
+                 db_path: str = DEFAULT_DB_PATH,
+                 max_chars: int = README_EXCERPT_CHARS):
+        """
+        初始化加载器
+
+        Args:
+            headers: GitHub请求头（Accept 会被替换为原始格式）
+            http_client: 共享HTTP客户端
+            db_path: README 记录数据库路径
+            max_chars: 摘要字符数
+        """
+        self.headers = {**headers, 'Accept': self.RAW_ACCEPT}
+        self.http = http_client or get_shared_client()
+        self.db_path = db_path
+        self.max_chars = max_chars
+        # UTF-8 每个字符最多4字节，读取这么多字节足以得到完整摘要
+        self.max_bytes = max_chars * 4
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats = {'sha_hits': 0, 'unchanged_hits': 0, 'revalidated': 0, 'fetched': 0, 'bytes': 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库（持锁调用）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS readmes (
+                    name TEXT PRIMARY KEY,
+                    sha TEXT,
+                    etag TEXT,
+                    pushed_at TEXT,
+                    excerpt TEXT NOT NULL,
+                    fetched_at REAL NOT NULL
+                ) WITHOUT ROWID
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def _get(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT sha, etag, pushed_at, excerpt FROM readmes WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('sha', 'etag', 'pushed_at', 'excerpt'), row))
+
+    def _put(self, name: str, sha: Optional[str], etag: Optional[str],
+             pushed_at: Optional[str], excerpt: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO readmes (name, sha, etag, pushed_at, excerpt, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (name, sha, etag, pushed_at, excerpt, time.time())
+            )
+            conn.commit()
+
+    def _record(self, event: str, amount: int = 1) -> None:
+        with self._lock:
+            self.stats[event] += amount
+
+    def load(self, project: Dict[str, Any], sha: Optional[str] = None) -> Optional[str]:
+        """
+        获取 README 摘要
+
+        Args:
+            project: 仓库信息（需包含 full_name，pushed_at 可选）
+            sha: 当前 README 的 blob SHA（GraphQL 查询得到，可选）
+
+        Returns:
+            README 摘要（仓库没有README时为空字符串），请求失败时返回None
+        """
+        name = project_identifier(project)
+        pushed_at = project.get('pushed_at')
+        entry = self._get(name)
+
+        if entry:
+            if sha and entry['sha'] == sha:
+                self._record('sha_hits')
+                return entry['excerpt']
+            if not sha and pushed_at and entry['pushed_at'] == pushed_at:
+                self._record('unchanged_hits')
+                return entry['excerpt']
+
+        headers = dict(self.headers)
+        headers['Range'] = f'bytes=0-{self.max_bytes - 1}'
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+
+        url = f"https://api.github.com/repos/{project['full_name']}/readme"
+        try:
+            # 不经过响应缓存：缓存会读取并保存完整响应体
+            response = self.http.request('GET', url, headers=headers, stream=True, timeout=15)
+        except Exception as e:
+            print(f"⚠️  获取README失败 {project['full_name']}: {e}")
+            return None
+
+        try:
+            if entry and response.status_code == 304:
+                self._record('revalidated')
+                self._put(name, sha or entry['sha'], entry['etag'], pushed_at, entry['excerpt'])
+                return entry['excerpt']
+            if response.status_code == 404:
+                self._put(name, sha, None, pushed_at, '')
+                return ''
+            if response.status_code not in (200, 206):
+                return None
+            excerpt = self._read_excerpt(response)
+            self._put(name, sha, response.headers.get('ETag'), pushed_at, excerpt)
+            return excerpt
+        except Exception as e:
+            print(f"⚠️  读取README失败 {project['full_name']}: {e}")
+            return None
+        finally:
+            response.close()
+
+    def _read_excerpt(self, response) -> str:
+        """流式读取最多 max_bytes 字节并解码为摘要"""
+        data = bytearray()
+        for chunk in response.iter_content(chunk_size=4096):
+            data.extend(chunk)
+            if len(data) >= self.max_bytes:
+                break
+        self._record('fetched')
+        self._record('bytes', min(len(data), self.max_bytes))
+        # 截断处可能切开多字节字符，忽略不完整的尾部
+        return bytes(data[:self.max_bytes]).decode('utf-8', errors='ignore')[:self.max_chars]
+
+    def get_stats(self) -> Dict[str, int]:
+        """获取加载统计"""
+        with self._lock:
+            return dict(self.stats)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+每日统一分析调度器
+GitHot - GitHub热门项目评测
+
+在一个进程内并发运行三个分析器，取代工作流中依次启动的三个 Python 进程：
+- Claude Agent（crypto-project-analyzer.py）
+- Claude Prompts（claude_prompts_analyzer.py）
+- Product Hunt（producthunt_analyzer.py）
+
+三个分析器共享同一个 HTTP 连接池与 GitHub 速率限制预算（get_shared_client），
+两个 GitHub 分析器共享候选池（candidate_pool.py：相同搜索与仓库详情当日只获取一次，
+同一仓库只会被一篇文章选用）和 Star 历史（star_history.py）。去重器由调度器按历史文件创建一次并在结束时统一关闭
+（即使分析器失败；超时分析器的线程可能仍在写入，它使用的去重器不关闭，本次修改可能丢失）。
+每个分析器在独立线程中运行，异常只影响自身；超过各自的时限后调度器不再等待，
+结果记为 timeout（线程为守护线程，随进程退出）。总耗时接近最慢的分析器。
+
+用法：
+    python scripts/run_daily_analysis.py                         # 运行全部
+    python scripts/run_daily_analysis.py --only producthunt      # 只运行指定分析器
+    python scripts/run_daily_analysis.py --timeout 1200          # 每个分析器的时限（秒）
+
+在 GitHub Actions 中会把 <名称>_success / <名称>_status 写入 GITHUB_OUTPUT。
+"""
+
+import os
+import sys
+import time
+import argparse
+import importlib.util
+import threading
+import contextvars
+from typing import Dict, Any, List, Optional, Callable
+
+from http_client import get_shared_client
+from project_deduplicator import ProjectDeduplicator
+from candidate_pool import CandidatePool
+from star_history import StarHistory
+from pipeline_profiler import pipeline_run, stage
+
+# 默认时限与原工作流每个步骤的 timeout-minutes 一致
+DEFAULT_TIMEOUT = float(os.getenv('ANALYZER_TIMEOUT', str(25 * 60)))
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 当前线程输出所属的分析器（线程池任务通过 pipeline_profiler.propagate 继承）
+_output_label: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('analyzer_label', default=None)
+
+
+class _LabeledStream:
+    """按分析器给输出行加前缀，避免并发输出难以分辨"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._lock = threading.Lock()
+        self._partial: Dict[Optional[str], str] = {}
+
+    def write(self, text: str) -> int:
+        label = _output_label.get()
+        if label is None:
+            return self._stream.write(text)
+        with self._lock:
+            buffered = self._partial.pop(label, '') + text
+            lines = buffered.split('\n')
+            if lines[-1]:
+                self._partial[label] = lines[-1]
+            for line in lines[:-1]:
+                self._stream.write(f"[{label}] {line}\n")
+        return len(text)
+
+    def flush(self) -> None:
+        """输出当前分析器未换行的内容（进度行等），再刷新底层流"""
+        label = _output_label.get()
+        with self._lock:
+            labels = list(self._partial) if label is None else [label]
+            for key in labels:
+                partial = self._partial.pop(key, '')
+                if partial:
+                    self._stream.write(f"[{key}] {partial}\n")
+        self._stream.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._stream, name)
+
+
+class AnalyzerResult:
+    """单个分析器的运行结果"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = 'pending'
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+    @property
+    def success(self) -> bool:
+        return self.status == 'success'
+
+
+def load_script(module_name: str, filename: str):
+    """按文件加载脚本模块（crypto-project-analyzer.py 文件名含连字符，无法直接 import）"""
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class DailyAnalysis:
+    """并发运行各分析器的调度器"""
+
+    # 分析器名称，同时是 GITHUB_OUTPUT 键前缀（与原工作流步骤输出保持一致）
+    ANALYZERS = ('claude_agent', 'claude_prompts', 'producthunt')
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, http_client=None):
+        """
+        初始化调度器
+
+        Args:
+            timeout: 每个分析器的时限（秒）
+            http_client: 共享HTTP客户端，默认使用进程内共享实例
+        """
+        self.timeout = timeout
+        self.http = http_client or get_shared_client()
+        self.github_token = os.getenv('GITHUB_TOKEN')
+        self.days_back = int(os.getenv('DAYS_BACK', '7'))
+        self.max_projects = int(os.getenv('MAX_PROJECTS', '3'))
+        self.candidate_pool = CandidatePool()
+        self.star_history = StarHistory()
+        self._deduplicators: Dict[str, ProjectDeduplicator] = {}
+        # 去重器由哪些分析器使用（超时的分析器可能仍在写入，不能关闭）
+        self._dedup_users: Dict[str, set] = {}
+        self._dedup_lock = threading.Lock()
+
+    def deduplicator(self, history_file: str) -> ProjectDeduplicator:
+        """按历史文件获取进程内共享的去重器"""
+        with self._dedup_lock:
+            if history_file not in self._deduplicators:
+                self._deduplicators[history_file] = ProjectDeduplicator(history_file)
+            self._dedup_users.setdefault(history_file, set()).add(_output_label.get())
+            return self._deduplicators[history_file]
+
+    # ---- 各分析器入口（返回 False 表示没有生成内容）----
+
+    def run_claude_agent(self) -> bool:
+        module = load_script('crypto_project_analyzer', 'crypto-project-analyzer.py')
+        analyzer = module.ClaudeAgentAnalyzer(
+            self.github_token, self.http,
+            deduplicator=self.deduplicator('data/analyzed_projects.json'),
+            candidate_pool=self.candidate_pool,
+            star_history=self.star_history
+        )
+        # 没有生成文章时记为 no_content，与其他分析器一致
+        return module.main(analyzer) > 0
+
+    def run_claude_prompts(self) -> bool:
+        from claude_prompts_analyzer import ClaudePromptsAnalyzer
+        analyzer = ClaudePromptsAnalyzer(
+            self.github_token, self.http,
+            deduplicator=self.deduplicator('data/claude_prompts_projects.json'),
+            candidate_pool=self.candidate_pool,
+            star_history=self.star_history
+        )
+        return analyzer.run_analysis(self.days_back, self.max_projects)
+
+    def run_producthunt(self) -> bool:
+        from producthunt_analyzer import ProductHuntAnalyzer
+        return ProductHuntAnalyzer(self.http).run_analysis(max_products=3)
+
+    # ---- 调度 ----
+
+    def _run_one(self, name: str, func: Callable[[], bool], result: AnalyzerResult) -> None:
+        _output_label.set(name)
+        start = time.perf_counter()
+        error = None
+        try:
+            with stage(name):
+                status = 'success' if func() else 'no_content'
+        except SystemExit as e:
+            status = 'failed' if e.code else 'success'
+            error = f"exit {e.code}" if e.code else None
+        except Exception as e:
+            status = 'failed'
+            error = f"{type(e).__name__}: {e}"
+            print(f"❌ 运行失败: {error}")
+        finally:
+            # 输出分析器最后一行未换行的内容
+            sys.stdout.flush()
+        # 已判定超时的分析器事后完成也不再改写结果
+        if result.status == 'pending':
+            result.status, result.error = status, error
+            result.seconds = time.perf_counter() - start
+
+    def run(self, names: Optional[List[str]] = None) -> List[AnalyzerResult]:
+        """
+        并发运行分析器
+
+        Args:
+            names: 要运行的分析器，默认全部
+
+        Returns:
+            各分析器的结果（顺序与 names 一致）
+        """
+        names = names or list(self.ANALYZERS)
+        results = [AnalyzerResult(name) for name in names]
+        threads = []
+        start = time.monotonic()
+        for name, result in zip(names, results):
+            func = getattr(self, f'run_{name}')
+            # 每个线程在当前上下文的副本中运行，继承运行追踪的阶段栈
+            context = contextvars.copy_context()
+            thread = threading.Thread(
+                target=context.run, args=(self._run_one, name, func, result),
+                name=f'analyzer-{name}', daemon=True
+            )
+            thread.start()
+            threads.append(thread)
+
+        for thread, result in zip(threads, results):
+            thread.join(max(self.timeout - (time.monotonic() - start), 0))
+            if thread.is_alive():
+                result.status = 'timeout'
+                result.seconds = time.monotonic() - start
+                result.error = f"超过时限 {self.timeout:.0f} 秒"
+                print(f"⏰ {result.name} {result.error}，不再等待")
+
+        self.close(skip=[result.name for result in results if result.status == 'timeout'])
+        return results
+
+    def close(self, skip: Optional[List[str]] = None) -> None:
+        """
+        保存并关闭去重器
+
+        Args:
+            skip: 超时的分析器名称，它们使用的去重器可能仍在被写入，不关闭
+        """
+        skip = set(skip or [])
+        with self._dedup_lock:
+            for history_file, deduplicator in self._deduplicators.items():
+                busy = self._dedup_users.get(history_file, set()) & skip
+                if busy:
+                    print(f"⚠️  {', '.join(sorted(busy))} 超时仍在运行，未保存去重历史 ({history_file})，本次修改可能丢失")
+                    continue
+                try:
+                    deduplicator.close()
+                except Exception as e:
+                    print(f"⚠️  保存去重历史失败 ({deduplicator.history_file_path}): {e}")
+
+
+def write_github_output(results: List[AnalyzerResult], output_path: str) -> None:
+    """写入各分析器的结果供后续步骤使用"""
+    with open(output_path, 'a', encoding='utf-8') as f:
+        for result in results:
+            f.write(f"{result.name}_success={'true' if result.success else 'false'}\n")
+            f.write(f"{result.name}_status={result.status}\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description='并发运行每日分析器')
+    parser.add_argument('--only', nargs='+', choices=DailyAnalysis.ANALYZERS, help='只运行指定的分析器')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='每个分析器的时限（秒）')
+    args = parser.parse_args(argv)
+
+    os.chdir(os.path.dirname(SCRIPT_DIR))
+    sys.stdout = _LabeledStream(sys.stdout)
+
+    with pipeline_run('daily_analysis'):
+        analysis = DailyAnalysis(timeout=args.timeout)
+        results = analysis.run(args.only)
+
+    stats = analysis.candidate_pool.get_stats()
+    print(f"🗂️  候选池: 搜索命中 {stats['search_hits']}/{stats['search_hits'] + stats['search_misses']}，"
+          f"详情命中 {stats['field_hits']}/{stats['field_hits'] + stats['field_misses']}")
+
+    print("📊 分析器运行结果:")
+    for result in results:
+        suffix = f" - {result.error}" if result.error else ''
+        print(f"   {result.name}: {result.status} ({result.seconds:.1f}s){suffix}")
+
+    output_path = os.getenv('GITHUB_OUTPUT')
+    if output_path:
+        write_github_output(results, output_path)
+
+    # 与原工作流一致：单个分析器失败不影响后续步骤，全部失败时才返回非零
+    return 0 if any(result.status in ('success', 'no_content') for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+近似重复检测：MinHash 签名 + 分段 LSH 索引
+GitHot - GitHub热门项目评测
+
+原来的重复检测只比较 MD5 签名，描述稍有改动的同一产品就会漏过；
+逐对使用 SequenceMatcher 又是平方复杂度。本模块：
+
+1. 把文本切分为字符 n-gram（shingle），中英文通用
+2. 计算 MinHash 签名，两个签名相同位置相等的比例近似 Jaccard 相似度
+3. 签名分为若干段（band），每段哈希后放入桶中；只有至少一段完全相同的
+   条目才会成为候选，查询不需要与全部历史逐一比较
+4. 索引保存在 data/similarity_index.json，可同时存放产品与生成的文章
+
+默认 64 个哈希、16 段 × 4 行，相似度约 0.5 以上的条目大概率成为候选，
+最终按签名估计值与阈值比较。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import base64
+import struct
+import random
+import hashlib
+import argparse
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+SIMILARITY_INDEX_VERSION = 1
+
+_MASK64 = (1 << 64) - 1
+_WHITESPACE = re.compile(r'\s+')
+_MARKUP = re.compile(r'[#>*_`|\-\[\]()!]+')
+
+
+def normalize_text(text: str) -> str:
+    """小写、去掉常见 Markdown 标记并合并空白"""
+    return _WHITESPACE.sub(' ', _MARKUP.sub(' ', (text or '').lower())).strip()
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """字符 n-gram 集合（文本短于 size 时整体作为一个 shingle）"""
+    text = normalize_text(text)
+    if len(text) <= size:
+        return {text} if text else set()
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def strip_front_matter(text: str) -> str:
+    """去掉 Hugo 文章开头的 front matter"""
+    for delimiter in ('+++', '---'):
+        if text.startswith(delimiter):
+            parts = text.split(f"\n{delimiter}", 1)
+            if len(parts) == 2:
+                return parts[1]
+    return text
+
+
+class MinHasher:
+    """64位 multiply-shift 哈希族的 MinHash"""
+
+    def __init__(self, num_perm: int = 64, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._params = [(rng.getrandbits(64) | 1, rng.getrandbits(64)) for _ in range(num_perm)]
+
+    def signature(self, text: str) -> List[int]:
+        """计算文本的 MinHash 签名（每个值为32位整数）"""
+        hashes = [
+            int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'little')
+            for shingle in shingles(text, self.shingle_size)
+        ]
+        if not hashes:
+            return [0xFFFFFFFF] * self.num_perm
+        return [min(((a * h + b) & _MASK64) >> 32 for h in hashes) for a, b in self._params]
+
+    @staticmethod
+    def similarity(signature1: List[int], signature2: List[int]) -> float:
+        """签名估计的 Jaccard 相似度"""
+        if not signature1 or len(signature1) != len(signature2):
+            return 0.0
+        return sum(1 for x, y in zip(signature1, signature2) if x == y) / len(signature1)
+
+
+class SimilarityIndex:
+    """带时间戳的 MinHash LSH 索引（线程安全）"""
+
+    def __init__(self,
+                 path: Optional[str] = 'data/similarity_index.json',
+                 num_perm: int = 64,
+                 bands: int = 16,
+                 retention_days: int = 180,
+                 clock=time.time):
+        """
+        初始化索引
+
+        Args:
+            path: 索引文件路径，None 表示只在内存中使用
+            num_perm: MinHash 哈希个数，必须能被 bands 整除
+            bands: LSH 分段数（段数越多，越低的相似度也能成为候选）
+            retention_days: 保存时丢弃早于该天数的条目
+            clock: 当前时间函数（便于测试）
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm 必须能被 bands 整除")
+        self.path = path
+        self.hasher = MinHasher(num_perm)
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.retention_days = retention_days
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._buckets: List[Dict[bytes, set]] = [{} for _ in range(bands)]
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str = 'data/similarity_index.json', **kwargs) -> 'SimilarityIndex':
+        """读取索引文件，参数不一致或文件损坏时返回空索引"""
+        index = cls(path, **kwargs)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return index
+        except Exception as e:
+            print(f"⚠️  读取相似度索引失败，将重新建立: {e}")
+            return index
+
+        if data.get('num_perm') != index.hasher.num_perm or data.get('bands') != index.bands:
+            print("⚠️  相似度索引参数已变化，将重新建立")
+            return index
+        for item_id, item in data.get('items', {}).items():
+            signature = list(struct.unpack(f"<{index.hasher.num_perm}I", base64.b64decode(item['sig'])))
+            index._insert(item_id, signature, item.get('kind', ''), item.get('ts', 0), item.get('label', ''))
+        index._dirty = False
+        return index
+
+    def add(self, item_id: str, text: str, kind: str = '', label: str = '',
+            timestamp: Optional[float] = None) -> None:
+        """
+        添加或替换条目
+
+        Args:
+            item_id: 唯一ID，如 product:Cosine CLI 或 post:xxx.md
+            text: 用于比较的文本
+            kind: 条目类型（product / post 等），查询时可按类型过滤
+            label: 展示用名称
+            timestamp: 条目时间，默认为当前时间
+        """
+        signature = self.hasher.signature(text)
+        with self._lock:
+            self._remove(item_id)
+            self._insert(item_id, signature, kind, timestamp if timestamp is not None else self.clock(), label)
+
+    def add_post(self, path: str, timestamp: Optional[float] = None) -> None:
+        """按正文（去掉 front matter）添加生成的文章"""
+        with open(path, 'r', encoding='utf-8') as f:
+            body = strip_front_matter(f.read())
+        self.add(f"post:{os.path.basename(path)}", body, kind='post', label=os.path.basename(path),
+                 timestamp=timestamp if timestamp is not None else os.path.getmtime(path))
+
+    def find_similar(self, text: str, threshold: float = 0.8, days: Optional[float] = None,
+                     kind: Optional[str] = None, exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """
+        查询近似重复条目
+
+        Args:
+            text: 待检查的文本
+            threshold: 相似度阈值（0~1）
+            days: 只考虑最近 days 天内的条目，None 表示不限
+            kind: 只考虑指定类型
+            exclude: 排除的条目ID（如检查自身时）
+
+        Returns:
+            [(条目ID, 相似度)]，按相似度从高到低排序
+        """
+        signature = self.hasher.signature(text)
+        cutoff = self.clock() - days * 86400 if days is not None else None
+        with self._lock:
+            candidates = set()
+            for band, key in enumerate(self._band_keys(signature)):
+                candidates.update(self._buckets[band].get(key, ()))
+
+            results = []
+            for item_id in candidates:
+                item = self._items[item_id]
+                if item_id == exclude or (kind and item['kind'] != kind):
+                    continue
+                if cutoff is not None and item['ts'] < cutoff:
+                    continue
+                score = MinHasher.similarity(signature, item['sig'])
+                if score >= threshold:
+                    results.append((item_id, score))
+        return sorted(results, key=lambda result: result[1], reverse=True)
+
+    def is_near_duplicate(self, text: str, threshold: float = 0.8, days: Optional[float] = None,
+                          kind: Optional[str] = None) -> bool:
+        """最近 days 天内是否有相似度不低于 threshold 的条目"""
+        return bool(self.find_similar(text, threshold, days, kind))
+
+    def label(self, item_id: str) -> str:
+        with self._lock:
+            item = self._items.get(item_id)
+            return (item.get('label') or item_id) if item else item_id
+
+    def save(self) -> bool:
+        """丢弃过期条目并原子写入索引文件"""
+        if not self.path:
+            return True
+        with self._lock:
+            if self.retention_days:
+                cutoff = self.clock() - self.retention_days * 86400
+                for item_id in [i for i, item in self._items.items() if item['ts'] < cutoff]:
+                    self._remove(item_id)
+            if not self._dirty and os.path.exists(self.path):
+                return True
+
+            data = {
+                'version': SIMILARITY_INDEX_VERSION,
+                'num_perm': self.hasher.num_perm,
+                'bands': self.bands,
+                'items': {
+                    item_id: {
+                        'kind': item['kind'],
+                        'label': item['label'],
+                        'ts': round(item['ts'], 3),
+                        'sig': base64.b64encode(struct.pack(f"<{self.hasher.num_perm}I", *item['sig'])).decode('ascii')
+                    }
+                    for item_id, item in sorted(self._items.items())
+                }
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=1)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+                return True
+            except Exception as e:
+                print(f"⚠️  保存相似度索引失败: {e}")
+                return False
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def __contains__(self, item_id: str) -> bool:
+        with self._lock:
+            return item_id in self._items
+
+    # ---- 内部方法（调用方持有 self._lock） ----
+
+    def _band_keys(self, signature: List[int]) -> List[bytes]:
+        return [
+            hashlib.blake2b(struct.pack(f"<{self.rows}I", *signature[band * self.rows:(band + 1) * self.rows]),
+                            digest_size=8).digest()
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, item_id: str, signature: List[int], kind: str, timestamp: float, label: str) -> None:
+        self._items[item_id] = {'sig': signature, 'kind': kind, 'ts': timestamp, 'label': label}
+        for band, key in enumerate(self._band_keys(signature)):
+            self._buckets[band].setdefault(key, set()).add(item_id)
+        self._dirty = True
+
+    def _remove(self, item_id: str) -> None:
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return
+        for band, key in enumerate(self._band_keys(item['sig'])):
+            bucket = self._buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._buckets[band][key]
+        self._dirty = True
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description='近似重复检测索引')
+    parser.add_argument('--index', default='data/similarity_index.json', help='索引文件路径')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    index_parser = subparsers.add_parser('index-posts', help='把 content/posts 下的文章加入索引')
+    index_parser.add_argument('--posts-dir', default='content/posts')
+    index_parser.add_argument('--days', type=float, default=90, help='只索引最近N天修改的文章')
+
+    check_parser = subparsers.add_parser('check', help='检查文章是否与最近的文章近似重复')
+    check_parser.add_argument('files', nargs='+')
+    check_parser.add_argument('--days', type=float, default=30)
+    check_parser.add_argument('--threshold', type=float, default=0.8)
+
+    args = parser.parse_args(argv)
+    index = SimilarityIndex.load(args.index)
+
+    if args.command == 'index-posts':
+        cutoff = time.time() - args.days * 86400
+        added = 0
+        for name in sorted(os.listdir(args.posts_dir)):
+            path = os.path.join(args.posts_dir, name)
+            if name.endswith('.md') and os.path.getmtime(path) >= cutoff:
+                index.add_post(path)
+                added += 1
+        index.save()
+        print(f"✅ 已索引 {added} 篇文章，索引共 {len(index)} 条")
+        return 0
+
+    duplicates = 0
+    for path in args.files:
+        with open(path, 'r', encoding='utf-8') as f:
+            body = strip_front_matter(f.read())
+        matches = index.find_similar(body, args.threshold, args.days, kind='post',
+                                     exclude=f"post:{os.path.basename(path)}")
+        if matches:
+            duplicates += 1
+            print(f"🔄 {path} 与以下文章近似重复:")
+            for item_id, score in matches[:5]:
+                print(f"  - {index.label(item_id)} ({score:.0%})")
+        else:
+            print(f"✅ {path} 未发现近似重复")
+    return 1 if duplicates else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
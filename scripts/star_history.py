@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+仓库 Star 历史时间序列
+GitHot - GitHub热门项目评测
+
+ClaudeAgentAnalyzer 原先用 "总星数 / 项目天数" 估算增长速度，偏向老项目，
+也发现不了真正的短期爆发。本模块在每次运行时把看到的每个仓库的
+stargazers_count / forks_count 记入本地 SQLite（每个仓库每天一行），
+之后按 1/7/30 天窗口计算真实增量，不需要额外的 API 请求。
+
+表结构（WITHOUT ROWID，主键即聚簇索引）：
+    repos(id, name)                      name 为 ProjectDeduplicator 标识符 owner/repo
+    snapshots(repo_id, day, stars, forks) day 为 date.toordinal()
+
+同一天多次记录时保留最新值；超过保留期的快照在记录时清理。
+"""
+
+import os
+import sqlite3
+import datetime
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from project_deduplicator import project_identifier
+
+DEFAULT_WINDOWS = (1, 7, 30)
+
+# SQLite 单条语句的参数上限较低，批量查询时分块
+_QUERY_CHUNK = 500
+
+
+def _counts(project: Dict[str, Any]) -> Tuple[Optional[int], int]:
+    """兼容 GitHub API（stargazers_count）与分析器内部（stars）两种字段名"""
+    stars = project.get('stargazers_count', project.get('stars'))
+    forks = project.get('forks_count', project.get('forks')) or 0
+    return stars, forks
+
+
+class StarHistory:
+    """仓库 Star/Fork 每日快照存储（线程安全，数据库在首次使用时打开）"""
+
+    def __init__(self,
+                 db_path: str = 'data/star_history.sqlite3',
+                 retention_days: int = 120,
+                 today: Optional[datetime.date] = None):
+        """
+        初始化存储
+
+        Args:
+            db_path: SQLite 数据库路径
+            retention_days: 快照保留天数（需大于最大查询窗口）
+            today: 固定的"今天"（便于测试），默认使用当前日期
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._today = today
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """打开数据库（持锁调用）"""
+        if self._conn is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS repos (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    repo_id INTEGER NOT NULL,
+                    day INTEGER NOT NULL,
+                    stars INTEGER NOT NULL,
+                    forks INTEGER NOT NULL,
+                    PRIMARY KEY (repo_id, day)
+                ) WITHOUT ROWID;
+            """)
+            self._conn.commit()
+        return self._conn
+
+    @property
+    def today(self) -> datetime.date:
+        return self._today or datetime.date.today()
+
+    def record(self, projects: Iterable[Dict[str, Any]], day: Optional[datetime.date] = None) -> int:
+        """
+        记录一批仓库的当日快照
+
+        Args:
+            projects: 仓库信息（GitHub 搜索结果或分析器内部格式）
+            day: 快照日期，默认今天
+
+        Returns:
+            记录的仓库数
+        """
+        ordinal = (day or self.today).toordinal()
+        rows = {}
+        for project in projects:
+            stars, forks = _counts(project)
+            if stars is None:
+                continue
+            rows[project_identifier(project)] = (int(stars), int(forks))
+        if not rows:
+            return 0
+
+        with self._lock:
+            conn = self._connect()
+            conn.executemany("INSERT OR IGNORE INTO repos (name) VALUES (?)", [(name,) for name in rows])
+            ids = self._repo_ids(list(rows))
+            conn.executemany(
+                "INSERT OR REPLACE INTO snapshots (repo_id, day, stars, forks) VALUES (?, ?, ?, ?)",
+                [(ids[name], ordinal, stars, forks) for name, (stars, forks) in rows.items()]
+            )
+            conn.execute("DELETE FROM snapshots WHERE day < ?", (ordinal - self.retention_days,))
+            conn.commit()
+        return len(rows)
+
+    def _repo_ids(self, names: List[str]) -> Dict[str, int]:
+        """按名称批量查询仓库ID（持锁调用）"""
+        ids = {}
+        for start in range(0, len(names), _QUERY_CHUNK):
+            chunk = names[start:start + _QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            ids.update(self._connect().execute(
+                f"SELECT name, id FROM repos WHERE name IN ({placeholders})", chunk
+            ).fetchall())
+        return ids
+
+    def _series(self, names: List[str], since: int) -> Dict[str, List[Tuple[int, int, int]]]:
+        """批量读取 since 之后的快照，按日期升序（持锁调用）"""
+        series: Dict[str, List[Tuple[int, int, int]]] = {name: [] for name in names}
+        for start in range(0, len(names), _QUERY_CHUNK):
+            chunk = names[start:start + _QUERY_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._connect().execute(
+                "SELECT r.name, s.day, s.stars, s.forks FROM snapshots s JOIN repos r ON r.id = s.repo_id "
+                f"WHERE r.name IN ({placeholders}) AND s.day >= ? ORDER BY s.day",
+                (*chunk, since)
+            ).fetchall()
+            for name, day, stars, forks in rows:
+                series[name].append((day, stars, forks))
+        return series
+
+    @staticmethod
+    def _window_delta(points: List[Tuple[int, int, int]], today: int, days: int) -> Optional[Dict[str, float]]:
+        """
+        计算窗口内的增量
+
+        以今天（或之前最近一次）的快照为终点，以窗口起点当天或之前最近的快照为起点；
+        历史不足一个窗口时使用最早的快照，按实际间隔天数计算日均值。
+        """
+        points = [p for p in points if p[0] <= today]
+        if len(points) < 2:
+            return None
+        end = points[-1]
+        target = end[0] - days
+        start = points[0]
+        for point in points:
+            if point[0] > target:
+                break
+            start = point
+        span = end[0] - start[0]
+        if span <= 0:
+            return None
+        return {
+            'stars': end[1] - start[1],
+            'forks': end[2] - start[2],
+            'days': span,
+            'stars_per_day': (end[1] - start[1]) / span,
+        }
+
+    def deltas(self,
+               projects: Iterable[Dict[str, Any]],
+               windows: Iterable[int] = DEFAULT_WINDOWS) -> Dict[str, Dict[int, Optional[Dict[str, float]]]]:
+        """
+        批量计算各窗口的 Star/Fork 增量
+
+        Args:
+            projects: 仓库信息
+            windows: 窗口天数
+
+        Returns:
+            {标识符: {窗口天数: {'stars', 'forks', 'days', 'stars_per_day'} 或 None}}
+        """
+        windows = tuple(windows)
+        names = list(dict.fromkeys(project_identifier(project) for project in projects))
+        today = self.today.toordinal()
+        with self._lock:
+            # 多取一个窗口长度，保证能找到窗口起点之前的快照
+            series = self._series(names, today - 2 * max(windows))
+        return {
+            name: {days: self._window_delta(points, today, days) for days in windows}
+            for name, points in series.items()
+        }
+
+    def velocity(self, project: Dict[str, Any], days: int = 7) -> Optional[float]:
+        """单个仓库在窗口内的日均 Star 增量，历史不足时返回None"""
+        delta = self.deltas([project], (days,))[project_identifier(project)][days]
+        return delta['stars_per_day'] if delta else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -7,6 +7,8 @@ import os
 import sys
 import importlib.util
 
+from readme_loader import readme_text
+
 # 动态导入分析器模块
 script_dir = os.path.dirname(__file__)
 analyzer_path = os.path.join(script_dir, 'crypto-project-analyzer.py')
@@ -47,7 +49,7 @@ def test_analyzer():
         test_project = projects[0]
         details = analyzer.get_project_details(test_project)
         print(f"✅ 获取项目详情: {test_project['name']}")
-        print(f"   - README长度: {len(details.get('readme_content', ''))}")
+        print(f"   - README长度: {len(readme_text(details))}")
         print(f"   - 最近提交: {len(details.get('recent_commits', []))}")
         print(f"   - 编程语言: {len(details.get('languages', {}))}")
     except Exception as e:
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+分片搜索索引单元测试
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from build_search_index import SearchIndexBuilder, split_front_matter, tokenize, term_bucket
+
+
+TOML_POST = """+++
+date = "{date}"
+draft = {draft}
+title = "{title}"
+tags = ["GitHub", "项目评测"]
++++
+
+## 📊 项目概览
+
+[claude-code](https://github.com/anthropics/claude-code) 是**热门**项目。
+"""
+
+YAML_POST = """---
+title: "Product Hunt今日TOP3"
+date: 2025-08-28T22:04:12+08:00
+draft: false
+tags: ["Product Hunt"]
+---
+
+正文
+"""
+
+
+class TestSearchIndexBuilder(unittest.TestCase):
+    """SearchIndexBuilder单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.temp_dir, 'content')
+        self.output_dir = os.path.join(self.temp_dir, 'static', 'search')
+        os.makedirs(os.path.join(self.content_dir, 'posts'))
+        self.builder = SearchIndexBuilder(self.content_dir, self.output_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write_post(self, name: str, text: str):
+        with open(os.path.join(self.content_dir, 'posts', name), 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def read_json(self, *parts):
+        with open(os.path.join(self.output_dir, *parts), encoding='utf-8') as f:
+            return json.load(f)
+
+    def test_front_matter_formats(self):
+        """测试解析TOML与YAML front matter"""
+        front_matter, body = split_front_matter(YAML_POST)
+        self.assertEqual(front_matter['title'], 'Product Hunt今日TOP3')
+        self.assertFalse(front_matter['draft'])
+        self.assertEqual(front_matter['tags'], ['Product Hunt'])
+        self.assertEqual(body.strip(), '正文')
+
+    def test_monthly_shards_and_manifest(self):
+        """测试按月分片、跳过草稿与未来文章、生成纯文本摘要"""
+        self.write_post('a-2026-07-30.md', TOML_POST.format(date='2026-07-30T10:00:00+08:00', draft='false', title='A'))
+        self.write_post('b-2026-08-01.md', TOML_POST.format(date='2026-08-01T10:00:00+08:00', draft='false', title='B'))
+        self.write_post('draft.md', TOML_POST.format(date='2026-08-02T10:00:00+08:00', draft='true', title='D'))
+        self.write_post('future.md', TOML_POST.format(date='2099-01-01T10:00:00+08:00', draft='false', title='F'))
+        self.write_post('ph.md', YAML_POST)
+
+        manifest = self.builder.build(self.builder.collect_documents(now=datetime(2026, 8, 10, tzinfo=timezone.utc)))
+
+        self.assertEqual(manifest['total'], 3)
+        self.assertEqual([shard['id'] for shard in manifest['shards']], ['2026-08', '2026-07', '2025-08'])
+        self.assertEqual(self.read_json('manifest.json')['shards'][0]['url'], '/search/shards/2026-08.json')
+        self.assertIn('c', manifest['terms']['buckets'])
+        self.assertTrue(os.path.exists(os.path.join(self.output_dir, 'terms', 'c.json')))
+
+        docs = self.read_json('shards', '2026-08.json')
+        self.assertEqual(docs[0]['url'], '/posts/b-2026-08-01/')
+        self.assertEqual(docs[0]['content'], '📊 项目概览 claude-code 是热门项目。')
+        self.assertEqual(docs[0]['tags'], ['GitHub', '项目评测'])
+
+    def test_only_changed_shards_rewritten(self):
+        """测试新增文章只重写所在月份的分片，并删除不再存在的分片"""
+        self.write_post('a.md', TOML_POST.format(date='2026-07-30T10:00:00+08:00', draft='false', title='A'))
+        self.write_post('ph.md', YAML_POST)
+        self.builder.build()
+        self.assertEqual(self.builder.build()['_written'], 0)
+
+        self.write_post('b.md', TOML_POST.format(date='2026-07-31T10:00:00+08:00', draft='false', title='B'))
+        os.remove(os.path.join(self.content_dir, 'posts', 'ph.md'))
+        manifest = self.builder.build()
+
+        self.assertGreaterEqual(manifest['_removed'], 1)
+        self.assertEqual(os.listdir(os.path.join(self.output_dir, 'shards')), ['2026-07.json'])
+
+    def test_doc_ids_stable_when_posts_added(self):
+        """测试文档编号从旧到新分配，新增文章不改变已有文章的编号"""
+        self.write_post('a.md', TOML_POST.format(date='2026-07-30T10:00:00+08:00', draft='false', title='Alpha'))
+        self.write_post('b.md', TOML_POST.format(date='2026-08-01T10:00:00+08:00', draft='false', title='Beta'))
+        self.write_post('ph.md', YAML_POST)
+        manifest = self.builder.build()
+
+        self.assertEqual([(s['id'], s['offset']) for s in manifest['shards']],
+                         [('2026-08', 2), ('2026-07', 1), ('2025-08', 0)])
+        before = self.read_json('terms', 'a.json')
+
+        self.write_post('c.md', TOML_POST.format(date='2026-08-05T10:00:00+08:00', draft='false', title='Zed'))
+        manifest = self.builder.build()
+
+        self.assertEqual(self.read_json('terms', 'a.json'), before)
+        self.assertEqual(self.read_json('shards', '2026-08.json')[1]['url'], '/posts/c/')
+        self.assertEqual(self.read_json('terms', 'z.json')['zed'], [(3 << 2) | 1])
+        self.assertEqual(manifest['shards'][0]['offset'], 2)
+
+    def test_tokenize_cjk_bigrams(self):
+        """测试英文按单词、中文按二元组切分"""
+        self.assertEqual(tokenize('Claude Code提示词 v2 a'), ['claude', 'code', '提示', '示词', 'v2'])
+        self.assertEqual(term_bucket('claude'), 'c')
+        self.assertEqual(term_bucket('提示'), f"c{ord('提') % 16:x}")
+
+    def test_inverted_index_postings(self):
+        """测试倒排表按文档编号差值编码，并记录标题/标签字段"""
+        documents = [
+            {'title': '提示词工程', 'content': 'claude', 'tags': None},
+            {'title': 'Agent', 'content': '提示词', 'tags': ['Claude']},
+        ]
+        buckets = SearchIndexBuilder.build_terms(documents)
+
+        self.assertEqual(buckets[term_bucket('提示')]['提示'], [(0 << 2) | 1, ((1 << 2) | 0) - 1])
+        self.assertEqual(buckets['c']['claude'], [0, (1 << 2) | 2])
+        self.assertEqual(buckets['a']['agent'], [(1 << 2) | 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
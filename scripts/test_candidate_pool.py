@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+候选项目池单元测试
+"""
+
+import os
+import sys
+import time
+import shutil
+import datetime
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from candidate_pool import CandidatePool
+from claude_prompts_analyzer import ClaudePromptsAnalyzer
+from readme_loader import readme_text
+from star_history import StarHistory
+
+
+class TestCandidatePool(unittest.TestCase):
+    """CandidatePool单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.featured_path = os.path.join(self.temp_dir, 'featured.json')
+        self.day = datetime.date(2025, 9, 10)
+        self.pool = CandidatePool(self.featured_path, today=lambda: self.day)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_search_cached_per_day(self):
+        """测试搜索结果当日缓存、返回副本、失败不缓存"""
+        fetch = Mock(return_value=[{'full_name': 'Octo/Agent'}])
+        first = self.pool.search('claude-code', 10, fetch)
+        first[0]['_source'] = 'trending'
+        self.assertEqual(self.pool.search('claude-code', 10, fetch), [{'full_name': 'Octo/Agent'}])
+        self.assertEqual(fetch.call_count, 1)
+
+        self.day += datetime.timedelta(days=1)
+        self.pool.search('claude-code', 10, fetch)
+        self.assertEqual(fetch.call_count, 2)
+
+        failing = Mock(return_value=None)
+        self.assertEqual(self.pool.search('claude agent', 10, failing), [])
+        self.pool.search('claude agent', 10, failing)
+        self.assertEqual(failing.call_count, 2)
+
+    def test_field_fetched_once_across_threads(self):
+        """测试并发请求同一字段只获取一次，键为去重标识符"""
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return 'readme'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda p=project: results.append(self.pool.field(p, 'readme_content', fetch)))
+            for project in ({'full_name': 'Octo/Agent'}, {'html_url': 'https://github.com/octo/agent.git'})
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ['readme', 'readme'])
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.pool.cached_fields({'full_name': 'octo/agent'}, ['readme_content']),
+                         {'readme_content': 'readme'})
+        self.assertIsNone(self.pool.cached_fields({'full_name': 'octo/agent'}, ['readme_content', 'issues']))
+
+    def test_claims_persist_and_release(self):
+        """测试选用登记跨实例持久化与撤销"""
+        project = {'full_name': 'octo/agent'}
+        self.assertTrue(self.pool.claim(project, 'claude_agent'))
+        self.assertTrue(self.pool.claim(project, 'claude_agent'))
+
+        other = CandidatePool(self.featured_path, today=lambda: self.day)
+        self.assertFalse(other.claim({'html_url': 'https://github.com/Octo/Agent'}, 'claude_prompts'))
+        self.assertFalse(other.is_available(project, 'claude_prompts'))
+        self.assertEqual(other.claimed_by(project), 'claude_agent')
+
+        other.release(project, 'claude_prompts')
+        self.assertEqual(other.claimed_by(project), 'claude_agent')
+        other.release(project, 'claude_agent')
+        self.assertTrue(CandidatePool(self.featured_path).claim(project, 'claude_prompts'))
+
+    def test_prompts_analyzer_reuses_pool_fields(self):
+        """测试Prompts分析器复用其他分析器已获取的详情"""
+        http = Mock()
+        self.pool.store_fields({'full_name': 'octo/agent'}, {'readme_content': 'cached readme', 'recent_commits': []})
+        star_history = StarHistory(os.path.join(self.temp_dir, 'star_history.sqlite3'))
+        analyzer = ClaudePromptsAnalyzer('token', http, deduplicator=Mock(), candidate_pool=self.pool,
+                                         star_history=star_history)
+
+        details = analyzer.get_repository_details({'full_name': 'Octo/Agent'})
+
+        self.assertEqual(readme_text(details), 'cached readme')
+        self.assertEqual(details['recent_commits'], [])
+        http.get.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
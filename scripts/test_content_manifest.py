@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+内容清单单元测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from content_manifest import ContentManifest, page_url, write_github_output
+
+
+class TestContentManifest(unittest.TestCase):
+    """ContentManifest单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.temp_dir, 'content')
+        self.manifest = ContentManifest(self.content_dir, os.path.join(self.temp_dir, 'data', 'manifest.json'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def write(self, rel_path: str, text: str):
+        path = os.path.join(self.content_dir, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_detects_added_modified_removed(self):
+        """测试检测新增、修改、删除，无变化时为空"""
+        self.write('posts/a.md', 'a')
+        self.write('posts/b.md', 'b')
+        self.assertEqual(self.manifest.update()['added'], ['posts/a.md', 'posts/b.md'])
+        self.assertFalse(any(self.manifest.update().values()))
+
+        self.write('posts/a.md', 'a2')
+        self.write('posts/c.md', 'c')
+        os.remove(os.path.join(self.content_dir, 'posts/b.md'))
+        changes = self.manifest.update()
+
+        self.assertEqual(changes, {'added': ['posts/c.md'], 'modified': ['posts/a.md'], 'removed': ['posts/b.md']})
+        self.assertEqual(sorted(self.manifest.load()), ['posts/a.md', 'posts/c.md'])
+
+    def test_dry_run_keeps_manifest(self):
+        """测试 dry-run 不更新清单"""
+        self.write('posts/a.md', 'a')
+        self.manifest.update(dry_run=True)
+        self.assertEqual(self.manifest.load(), {})
+
+    def test_github_output(self):
+        """测试GITHUB_OUTPUT格式与页面URL"""
+        self.assertEqual(page_url('posts/foo.md'), '/posts/foo/')
+        self.assertEqual(page_url('search.md'), '/search/')
+        self.assertEqual(page_url('posts/_index.md'), '/posts/')
+
+        output = os.path.join(self.temp_dir, 'output')
+        write_github_output({'added': ['posts/foo.md'], 'modified': [], 'removed': []}, output)
+        with open(output, encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn('has_changes=true\n', text)
+        self.assertIn('changed_pages<<EOF_CHANGED_PAGES\n/posts/foo/\nEOF_CHANGED_PAGES\n', text)
+
+
+if __name__ == '__main__':
+    unittest.main()
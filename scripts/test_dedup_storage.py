@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+去重历史存储后端单元测试
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from dedup_storage import DedupStorage, JSONFileStorage, JSONLLogStorage, create_storage
+from project_deduplicator import ProjectDeduplicator
+
+
+def make_project(i: int) -> dict:
+    return {
+        "full_name": f"owner/repo-{i}",
+        "html_url": f"https://github.com/owner/repo-{i}",
+        "stargazers_count": i
+    }
+
+
+class TestDedupStorage(unittest.TestCase):
+    """存储后端单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.temp_dir, 'history.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_batch_defers_json_writes(self):
+        """测试批量模式下只在结束时写入一次"""
+        deduplicator = ProjectDeduplicator(self.history_file, storage=JSONFileStorage(self.history_file))
+
+        with patch.object(deduplicator.storage, '_write_snapshot', wraps=deduplicator.storage._write_snapshot) as write:
+            with deduplicator.batch():
+                for i in range(50):
+                    deduplicator.add_analyzed_project(make_project(i))
+                self.assertFalse(os.path.exists(self.history_file))
+
+        self.assertEqual(write.call_count, 1)
+        with open(self.history_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(data['version'], '2.0')
+        self.assertEqual(data['total_projects'], 50)
+
+    def test_jsonl_appends_and_replays(self):
+        """测试追加日志后端：首次添加写入快照，之后只追加日志，重新加载时回放"""
+        storage = JSONLLogStorage(self.history_file)
+        deduplicator = ProjectDeduplicator(self.history_file, storage=storage)
+        deduplicator.add_analyzed_project(make_project(1))
+        self.assertTrue(os.path.exists(self.history_file))
+        self.assertFalse(os.path.exists(storage.log_path))
+
+        deduplicator.add_analyzed_project(make_project(2))
+        deduplicator.add_analyzed_project(make_project(3))
+
+        with open(self.history_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['total_projects'], 1)
+        with open(storage.log_path, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 2)
+
+        reloaded = ProjectDeduplicator(self.history_file, storage=JSONLLogStorage(self.history_file))
+        self.assertTrue(reloaded.is_duplicate_project(make_project(3)))
+        self.assertEqual(reloaded.get_project_statistics()['total_projects'], 3)
+
+    def test_jsonl_compaction_writes_v2_snapshot(self):
+        """测试日志超过阈值及close时压缩为v2 JSON快照"""
+        storage = JSONLLogStorage(self.history_file, compact_threshold=3)
+        deduplicator = ProjectDeduplicator(self.history_file, storage=storage)
+        # 第一个项目写入初始快照，之后4条日志超过阈值触发压缩
+        for i in range(5):
+            deduplicator.add_analyzed_project(make_project(i))
+
+        self.assertFalse(os.path.exists(storage.log_path))
+        deduplicator.add_analyzed_project(make_project(5))
+        self.assertTrue(os.path.exists(storage.log_path))
+        deduplicator.close()
+
+        self.assertFalse(os.path.exists(storage.log_path))
+        plain = ProjectDeduplicator(self.history_file, storage=JSONFileStorage(self.history_file))
+        self.assertEqual(len(plain._analyzed_projects), 6)
+
+    def test_truncated_log_line_ignored(self):
+        """测试日志最后一行不完整时忽略该行"""
+        storage = JSONLLogStorage(self.history_file)
+        deduplicator = ProjectDeduplicator(self.history_file, storage=storage)
+        deduplicator.add_analyzed_project(make_project(0))
+        deduplicator.add_analyzed_project(make_project(1))
+        with open(storage.log_path, 'a', encoding='utf-8') as f:
+            f.write('{"id": "owner/repo-2", "rec')
+
+        reloaded = ProjectDeduplicator(self.history_file, storage=JSONLLogStorage(self.history_file))
+        self.assertEqual(len(reloaded._analyzed_projects), 2)
+
+    def test_hash_index_and_v2_round_trip(self):
+        """测试按哈希查询以及v2格式导入导出"""
+        deduplicator = ProjectDeduplicator(self.history_file)
+        project = make_project(7)
+        deduplicator.add_analyzed_project(project)
+
+        project_hash = deduplicator.generate_project_hash(project)
+        self.assertEqual(deduplicator.find_by_hash(project_hash), 'owner/repo-7')
+        self.assertIsNone(deduplicator.find_by_hash('missing'))
+
+        other_file = os.path.join(self.temp_dir, 'other.json')
+        other = ProjectDeduplicator(other_file, storage=JSONLLogStorage(other_file))
+        self.assertEqual(other.import_v2(deduplicator.export_v2()), 1)
+        self.assertTrue(other.is_duplicate_project(project))
+        self.assertEqual(other.find_by_hash(project_hash), 'owner/repo-7')
+
+    def test_create_storage_from_env(self):
+        """测试按环境变量选择后端"""
+        with patch.dict(os.environ, {'DEDUP_STORAGE': 'jsonl'}):
+            self.assertIsInstance(create_storage(self.history_file), JSONLLogStorage)
+        self.assertIsInstance(create_storage(self.history_file, 'json'), JSONFileStorage)
+        with self.assertRaises(ValueError):
+            create_storage(self.history_file, 'sqlite3')
+
+    def test_incomplete_backend_rejected(self):
+        """测试未实现写入方法的后端在实例化时即报错"""
+        class PartialStorage(DedupStorage):
+            def flush(self) -> None:
+                pass
+
+        with self.assertRaises(TypeError):
+            PartialStorage(self.history_file)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+GitHubResponseCache单元测试
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from github_cache import GitHubResponseCache
+from http_client import HTTPClient
+
+
+def make_response(status_code: int = 200, body=None, etag: str = None) -> requests.Response:
+    """构造真实的 requests.Response 对象"""
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(body).encode('utf-8') if body is not None else b''
+    response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+    if etag:
+        response.headers['ETag'] = etag
+    return response
+
+
+class TestGitHubResponseCache(unittest.TestCase):
+    """GitHubResponseCache单元测试类"""
+
+    REPO_URL = 'https://api.github.com/repos/owner/repo'
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, 'github_cache')
+        self.cache = GitHubResponseCache(self.cache_dir, ttl_seconds=3600)
+        self.client = HTTPClient(cache=self.cache)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_is_cacheable(self):
+        """测试可缓存端点判断"""
+        self.assertTrue(self.cache.is_cacheable(self.REPO_URL))
+        for suffix in ('readme', 'languages', 'releases', 'issues'):
+            with self.subTest(suffix=suffix):
+                self.assertTrue(self.cache.is_cacheable(f'{self.REPO_URL}/{suffix}'))
+        self.assertFalse(self.cache.is_cacheable('https://api.github.com/search/repositories'))
+        self.assertFalse(self.cache.is_cacheable('https://www.producthunt.com/posts/x'))
+
+    @patch('requests.Session.get')
+    def test_fresh_hit_skips_network(self, mock_get):
+        """测试新鲜期内直接命中缓存"""
+        mock_get.return_value = make_response(body={'Python': 100}, etag='"abc"')
+
+        first = self.client.get(f'{self.REPO_URL}/languages')
+        second = self.client.get(f'{self.REPO_URL}/languages')
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(first.json(), second.json())
+        self.assertTrue(getattr(second, 'from_cache', False))
+        self.assertEqual(self.cache.stats['fresh_hits'], 1)
+
+    @patch('requests.Session.get')
+    def test_revalidation_with_etag(self, mock_get):
+        """测试过期后发送条件请求，304时复用缓存"""
+        mock_get.return_value = make_response(body=[{'tag_name': 'v1.0'}], etag='"v1"')
+        self.client.get(f'{self.REPO_URL}/releases')
+
+        self.cache.ttl_seconds = 0
+        mock_get.return_value = make_response(status_code=304)
+        response = self.client.get(f'{self.REPO_URL}/releases')
+
+        sent_headers = mock_get.call_args.kwargs['headers']
+        self.assertEqual(sent_headers['If-None-Match'], '"v1"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'tag_name': 'v1.0'}])
+        self.assertEqual(self.cache.stats['revalidated'], 1)
+
+    @patch('requests.Session.get')
+    def test_persistence_across_instances(self, mock_get):
+        """测试缓存跨实例持久化"""
+        mock_get.return_value = make_response(body={'full_name': 'owner/repo'}, etag='"r"')
+        self.client.get(self.REPO_URL)
+        # 索引在关闭客户端时写入
+        self.client.close()
+
+        reloaded = HTTPClient(cache=GitHubResponseCache(self.cache_dir, ttl_seconds=3600))
+        response = reloaded.get(self.REPO_URL)
+
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(response.json()['full_name'], 'owner/repo')
+
+    @patch('requests.Session.get')
+    def test_params_are_part_of_key(self, mock_get):
+        """测试查询参数不同的请求分开缓存"""
+        mock_get.side_effect = [
+            make_response(body=[1], etag='"a"'),
+            make_response(body=[1, 2], etag='"b"'),
+        ]
+
+        self.client.get(f'{self.REPO_URL}/issues', params={'per_page': 1})
+        response = self.client.get(f'{self.REPO_URL}/issues', params={'per_page': 2})
+
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(response.json(), [1, 2])
+
+    @patch('requests.Session.get')
+    def test_responses_without_validators_not_cached(self, mock_get):
+        """测试没有ETag/Last-Modified的响应不缓存"""
+        mock_get.return_value = make_response(body={'a': 1})
+
+        self.client.get(self.REPO_URL)
+        self.client.get(self.REPO_URL)
+
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.get')
+    def test_lru_eviction(self, mock_get):
+        """测试超过条目上限时淘汰最久未访问的条目"""
+        self.cache.max_entries = 2
+        mock_get.side_effect = lambda url, **kwargs: make_response(body={'url': url}, etag=f'"{url}"')
+
+        self.client.get(f'{self.REPO_URL}/readme')
+        self.client.get(f'{self.REPO_URL}/languages')
+        self.client.get(f'{self.REPO_URL}/readme')  # 命中，刷新访问时间
+        self.client.get(f'{self.REPO_URL}/releases')  # 触发淘汰 languages
+
+        cached_urls = {entry['url'] for entry in self.cache._index.values()}
+        self.assertEqual(cached_urls, {f'{self.REPO_URL}/readme', f'{self.REPO_URL}/releases'})
+        self.assertEqual(self.cache.stats['evicted'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+GitHubGraphQLFetcher单元测试
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from github_graphql import GitHubGraphQLFetcher
+from github_repo_evaluator import GitHubRepoEvaluator
+from http_client import HTTPClient
+
+
+def make_repo_node(readme_sha: str = 'a1b2c3'):
+    return {
+        'readmeUpper': {'oid': readme_sha} if readme_sha is not None else None,
+        'readmeLower': None,
+        'readmePlain': None,
+        'defaultBranchRef': {'target': {'history': {'nodes': [
+            {'message': 'feat: initial commit', 'author': {'name': 'dev', 'date': '2025-08-24T00:00:00Z'}}
+        ]}}},
+        'languages': {'edges': [
+            {'size': 3000, 'node': {'name': 'Python'}},
+            {'size': 1000, 'node': {'name': 'Shell'}}
+        ]},
+        'releases': {'nodes': [{'tagName': 'v1.2.0', 'name': 'v1.2.0', 'publishedAt': '2025-08-20T00:00:00Z'}]},
+        'issues': {'nodes': [
+            {'title': 'Bug', 'body': 'Something is broken in the parser module', 'state': 'OPEN', 'createdAt': '2025-08-21T00:00:00Z'},
+            {'title': 'Feature', 'body': '', 'state': 'CLOSED', 'createdAt': '2025-08-22T00:00:00Z'}
+        ]}
+    }
+
+
+class TestGitHubGraphQLFetcher(unittest.TestCase):
+    """GitHubGraphQLFetcher单元测试类"""
+
+    def setUp(self):
+        headers = {'Accept': 'application/vnd.github.v3+json', 'Authorization': 'token test'}
+        self.fetcher = GitHubGraphQLFetcher(headers, HTTPClient(), batch_size=2)
+        self.projects = [
+            {'full_name': f'owner{i}/repo{i}', 'name': f'repo{i}', 'topics': ['ai']}
+            for i in range(3)
+        ]
+
+    def test_available_requires_token(self):
+        """测试未认证时不可用"""
+        self.assertTrue(self.fetcher.available)
+        self.assertFalse(GitHubGraphQLFetcher({'Accept': 'x'}, HTTPClient()).available)
+
+    def test_build_query_uses_variables(self):
+        """测试查询使用变量而非拼接仓库名"""
+        query, variables = self.fetcher.build_query(self.projects[:2])
+
+        self.assertIn('repo0: repository(owner: $owner0, name: $name0)', query)
+        self.assertIn('repo1: repository(owner: $owner1, name: $name1)', query)
+        self.assertEqual(variables, {'owner0': 'owner0', 'name0': 'repo0', 'owner1': 'owner1', 'name1': 'repo1'})
+
+    @patch('requests.Session.post')
+    def test_fetch_details_batches_and_shape(self, mock_post):
+        """测试分批查询并返回REST兼容的详情结构"""
+        def fake_post(url, **kwargs):
+            count = len(kwargs['json']['variables']) // 2
+            response = Mock(status_code=200)
+            response.json.return_value = {'data': {f'repo{i}': make_repo_node() for i in range(count)}}
+            return response
+
+        mock_post.side_effect = fake_post
+
+        details = self.fetcher.fetch_details(self.projects)
+
+        self.assertEqual(mock_post.call_count, 2)  # 3个仓库，每批2个
+        self.assertEqual(len(details), 3)
+        first = details[0]
+        self.assertIs(first['basic_info'], self.projects[0])
+        self.assertEqual(first['readme_sha'], 'a1b2c3')
+        self.assertNotIn('readme_content', first)
+        self.assertEqual(first['languages'], {'Python': 3000, 'Shell': 1000})
+        self.assertEqual(first['recent_commits'][0]['author'], 'dev')
+        self.assertEqual(first['releases'][0]['tag_name'], 'v1.2.0')
+        self.assertEqual([i['state'] for i in first['issues']], ['open', 'closed'])
+        self.assertEqual(first['topics'], ['ai'])
+
+        # 结果可直接用于七维度评估
+        result = GitHubRepoEvaluator({}, HTTPClient()).evaluate(first)
+        release_dim = next(d for d in result['dimensions'] if d['name'] == '版本状态')
+        self.assertEqual(release_dim['status'], 'pass')
+
+    @patch('requests.Session.post')
+    def test_missing_repo_and_readme(self, mock_post):
+        """测试仓库不存在或README非标准文件名"""
+        response = Mock(status_code=200)
+        response.json.return_value = {
+            'data': {'repo0': None, 'repo1': make_repo_node(readme_sha=None)},
+            'errors': [{'message': 'Could not resolve to a Repository'}]
+        }
+        mock_post.return_value = response
+
+        details = self.fetcher.fetch_details(self.projects[:2])
+
+        self.assertEqual(details[0], {'basic_info': self.projects[0]})
+        self.assertNotIn('readme_sha', details[1])
+        self.assertEqual(details[1]['languages'], {'Python': 3000, 'Shell': 1000})
+
+    @patch('requests.Session.post')
+    def test_query_error_raises(self, mock_post):
+        """测试整体查询失败时抛出异常（调用方回退到REST）"""
+        response = Mock(status_code=200)
+        response.json.return_value = {'errors': [{'message': 'Bad credentials'}]}
+        mock_post.return_value = response
+
+        with self.assertRaises(RuntimeError):
+            self.fetcher.fetch_details(self.projects[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+GLM4Budget单元测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from glm4_budget import GLM4Budget, BudgetExceededError, estimate_tokens, estimate_prompt_tokens
+
+
+def make_request(content: str = '你好' * 50, model: str = 'glm-4-plus', max_tokens: int = 1000) -> dict:
+    return {'model': model, 'messages': [{'role': 'user', 'content': content}], 'max_tokens': max_tokens}
+
+
+class TestGLM4Budget(unittest.TestCase):
+    """预算控制单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_path = os.path.join(self.temp_dir, 'budget.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_budget(self, **kwargs) -> GLM4Budget:
+        kwargs.setdefault('state_path', self.state_path)
+        kwargs.setdefault('clock', lambda: datetime(2025, 8, 24, 10, 0))
+        return GLM4Budget(**kwargs)
+
+    def test_estimate_tokens(self):
+        """测试中文按字计数，英文约4字符1个Token"""
+        self.assertEqual(estimate_tokens(''), 0)
+        self.assertEqual(estimate_tokens('你好世界'), 4)
+        self.assertEqual(estimate_tokens('abcdefgh'), 2)
+        self.assertEqual(estimate_prompt_tokens(make_request()['messages']), 3 + 4 + 100)
+
+    def test_lowers_max_tokens_then_switches_model(self):
+        """测试预算不足时先降低 max_tokens，再切换备用模型"""
+        budget = self.make_budget(per_run_cost=0.035, min_max_tokens=400, fallback_model='glm-4-flash',
+                                  prices={'glm-4-plus': 50, 'glm-4-flash': 0})
+
+        planned, reservation = budget.plan(make_request())
+        self.assertEqual((planned['model'], planned['max_tokens']), ('glm-4-plus', 700 - 107))
+        budget.commit(reservation, {'total_tokens': 300})
+
+        # 剩余费用只够 glm-4-plus 输出 293 Token（低于下限），切换到免费模型
+        planned, reservation = budget.plan(make_request())
+        self.assertEqual((planned['model'], planned['max_tokens']), ('glm-4-flash', 1000))
+        self.assertEqual(budget.get_status()['degraded_requests'], 2)
+
+    def test_raises_when_nothing_fits(self):
+        """测试降级后仍超出预算时抛出异常，且并发预占计入剩余额度"""
+        budget = self.make_budget(per_run_tokens=500, min_max_tokens=256)
+        _, reservation = budget.plan(make_request(max_tokens=300))
+        with self.assertRaises(BudgetExceededError):
+            budget.plan(make_request(max_tokens=300))
+
+        budget.release(reservation)
+        budget.plan(make_request(max_tokens=300))
+
+    def test_daily_usage_shared_across_instances(self):
+        """测试每日用量持久化，新进程继续累计"""
+        first = self.make_budget(per_day_tokens=1000)
+        first.commit(first.plan(make_request(max_tokens=300))[1], {'total_tokens': 800})
+
+        second = self.make_budget(per_day_tokens=1000)
+        self.assertEqual(second.get_status()['day_tokens'], 800)
+        with self.assertRaises(BudgetExceededError):
+            second.plan(make_request(max_tokens=300))
+
+        tomorrow = self.make_budget(per_day_tokens=1000, clock=lambda: datetime(2025, 8, 25, 9, 0))
+        planned, _ = tomorrow.plan(make_request(max_tokens=300))
+        self.assertEqual(planned['max_tokens'], 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+GLM4ResponseCache单元测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from glm4_cache import GLM4ResponseCache
+
+
+def make_response(tokens: int = 10) -> dict:
+    return {'id': 'x', 'model': 'glm-4-plus', 'usage': {'total_tokens': tokens}}
+
+
+class TestGLM4ResponseCache(unittest.TestCase):
+    """GLM4ResponseCache单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'cache', 'glm4.sqlite3')
+        self.cache = GLM4ResponseCache(self.db_path, ttl_seconds=100, max_entries=2)
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_key_is_canonical(self):
+        """测试键与参数顺序无关、与参数值相关"""
+        a = GLM4ResponseCache.make_key({'model': 'm', 'messages': [], 'temperature': 0.7})
+        b = GLM4ResponseCache.make_key({'temperature': 0.7, 'messages': [], 'model': 'm'})
+        c = GLM4ResponseCache.make_key({'temperature': 0.8, 'messages': [], 'model': 'm'})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_ttl_expiry(self):
+        """测试超过TTL的条目视为未命中"""
+        with patch('glm4_cache.time.time', return_value=1000.0):
+            self.cache.put('k', make_response(42))
+        with patch('glm4_cache.time.time', return_value=1050.0):
+            self.assertEqual(self.cache.get('k')['usage']['total_tokens'], 42)
+        with patch('glm4_cache.time.time', return_value=1200.0):
+            self.assertIsNone(self.cache.get('k'))
+        self.assertEqual(self.cache.stats['tokens_saved'], 42)
+
+    def test_lru_eviction_and_persistence(self):
+        """测试超过条目上限时淘汰最久未访问的条目，且跨实例持久化"""
+        with patch('glm4_cache.time.time', side_effect=[1.0, 2.0, 3.0, 4.0]):
+            self.cache.put('a', make_response())
+            self.cache.put('b', make_response())
+            self.cache.get('a')
+            self.cache.put('c', make_response())
+
+        self.assertEqual(self.cache.stats['evicted'], 1)
+        reopened = GLM4ResponseCache(self.db_path, ttl_seconds=10 ** 10)
+        try:
+            self.assertIsNone(reopened.get('b'))
+            self.assertIsNotNone(reopened.get('a'))
+            self.assertEqual(len(reopened), 2)
+        finally:
+            reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+GLM4Client单元测试
+"""
+
+import os
+import sys
+import json
+import asyncio
+import threading
+import shutil
+import logging
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from glm4_client import GLM4Client
+from glm4_config import GLM4Config
+from glm4_log_analyzer import GLM4LogAnalyzer
+from http_client import HTTPClient
+
+
+LOGGER_NAMES = ('GLM4Client', 'GLM4Requests', 'GLM4RequestsJSONL')
+
+
+def make_api_response(content: str = '你好', prompt_tokens: int = 12, completion_tokens: int = 30) -> Mock:
+    response = Mock(status_code=200)
+    response.json.return_value = {
+        'id': 'chatcmpl-1',
+        'model': 'glm-4-plus',
+        'object': 'chat.completion',
+        'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': completion_tokens,
+                  'total_tokens': prompt_tokens + completion_tokens}
+    }
+    return response
+
+
+def make_stream_response(pieces, prompt_tokens: int = 12) -> Mock:
+    """构造 SSE 流式响应，最后一个数据块携带 usage"""
+    lines = [': keep-alive']
+    for i, piece in enumerate(pieces):
+        chunk = {'id': 'chatcmpl-s', 'model': 'glm-4-plus', 'created': 1,
+                 'choices': [{'index': 0, 'delta': {'role': 'assistant', 'content': piece}}]}
+        if i == len(pieces) - 1:
+            chunk['choices'][0]['finish_reason'] = 'stop'
+            chunk['usage'] = {'prompt_tokens': prompt_tokens, 'completion_tokens': len(pieces),
+                              'total_tokens': prompt_tokens + len(pieces)}
+        lines.extend([f"data: {json.dumps(chunk, ensure_ascii=False)}", ''])
+    lines.append('data: [DONE]')
+
+    response = Mock(status_code=200)
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+class GLM4ClientTestCase(unittest.TestCase):
+    """使用临时日志目录和默认配置创建客户端"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = GLM4Config(os.path.join(self.temp_dir, 'glm4_config.json'))
+        self.config.set('logging.dir', self.temp_dir)
+
+    def tearDown(self):
+        # logger 为进程级单例，清理 handler 以免影响其他测试
+        for name in LOGGER_NAMES:
+            logger = logging.getLogger(name)
+            for handler in list(logger.handlers):
+                handler.close()
+                logger.removeHandler(handler)
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_client(self, **logging_options) -> GLM4Client:
+        for key, value in logging_options.items():
+            self.config.set(f'logging.{key}', value)
+        return GLM4Client(api_key='test-key', http_client=HTTPClient(), config=self.config)
+
+
+class TestGLM4ClientLogging(GLM4ClientTestCase):
+    """请求日志格式测试"""
+
+    MESSAGES = [{'role': 'user', 'content': '请介绍一下GitHot平台' * 20}]
+
+    @patch('requests.Session.post')
+    def test_jsonl_one_record_per_line(self, mock_post):
+        """测试JSONL模式每条记录一行，且可被日志分析器读取"""
+        mock_post.return_value = make_api_response()
+        client = self.make_client(request_format='jsonl')
+
+        client.chat_completion(self.MESSAGES)
+
+        with open(os.path.join(self.temp_dir, 'glm4_requests.jsonl'), encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        self.assertEqual([json.loads(line)['type'] for line in lines], ['REQUEST', 'RESPONSE'])
+
+        stats = GLM4LogAnalyzer(self.temp_dir).analyze_logs()
+        self.assertEqual(stats['total_requests'], 1)
+        self.assertEqual(stats['total_tokens'], 42)
+
+    def test_payload_truncate_and_hash(self):
+        """测试消息内容截断与哈希"""
+        client = self.make_client(request_format='jsonl', payload='truncate', payload_max_chars=10)
+        client.request_logger = Mock()
+        client._log_request_details('r1', {'model': 'glm-4-plus', 'messages': self.MESSAGES})
+        entry = json.loads(client.request_logger.info.call_args[0][0])
+        self.assertTrue(entry['messages'][0]['content'].startswith('请介绍一下GitHo…'))
+        self.assertIn('…(+', entry['messages'][0]['content'])
+
+        client.log_payload = 'hash'
+        client._log_request_details('r2', {'model': 'glm-4-plus', 'messages': self.MESSAGES})
+        entry = json.loads(client.request_logger.info.call_args[0][0])
+        self.assertEqual(entry['messages'][0]['content']['chars'], len(self.MESSAGES[0]['content']))
+        self.assertEqual(len(entry['messages'][0]['content']['sha256']), 64)
+
+        client.log_payload = 'none'
+        client._log_request_details('r3', {'model': 'glm-4-plus', 'messages': self.MESSAGES})
+        entry = json.loads(client.request_logger.info.call_args[0][0])
+        self.assertNotIn('messages', entry)
+        self.assertEqual(entry['message_count'], 1)
+
+    @patch('requests.Session.post')
+    def test_async_logging_uses_queue(self, mock_post):
+        """测试异步模式通过队列写日志"""
+        mock_post.return_value = make_api_response()
+        client = self.make_client(request_format='jsonl', **{'async': True})
+
+        self.assertEqual(type(client.request_logger.handlers[0]).__name__, 'QueueHandler')
+        client.chat_completion(self.MESSAGES)
+
+
+
+class TestGLM4ClientBatch(GLM4ClientTestCase):
+    """批量请求测试"""
+
+    @patch('requests.Session.post')
+    def test_batch_keeps_order_and_isolates_errors(self, mock_post):
+        """测试批量结果保持输入顺序，单项失败不影响其他请求"""
+        in_flight = []
+        peak = []
+        lock = threading.Lock()
+
+        def fake_post(url, **kwargs):
+            content = kwargs['json']['messages'][0]['content']
+            with lock:
+                in_flight.append(content)
+                peak.append(len(in_flight))
+            try:
+                if content == 'bad':
+                    raise ConnectionError('boom')
+                return make_api_response(content=f'echo {content}')
+            finally:
+                with lock:
+                    in_flight.remove(content)
+
+        mock_post.side_effect = fake_post
+        client = self.make_client()
+        message_sets = [[{'role': 'user', 'content': c}] for c in ('a', 'bad', 'c', 'd', 'e')]
+
+        results = client.chat_completion_batch(message_sets, max_concurrency=2, model='glm-4-flash')
+
+        self.assertEqual([r['index'] for r in results], [0, 1, 2, 3, 4])
+        self.assertEqual([r['success'] for r in results], [True, False, True, True, True])
+        self.assertEqual(results[2]['response']['choices'][0]['message']['content'], 'echo c')
+        self.assertIn('boom', results[1]['error'])
+        self.assertLessEqual(max(peak), 2)
+        self.assertEqual(mock_post.call_args.kwargs['json']['model'], 'glm-4-flash')
+
+        stats = client.get_stats()
+        self.assertEqual((stats['successful_requests'], stats['failed_requests']), (4, 1))
+        self.assertEqual(stats['total_tokens_consumed'], 4 * 42)
+
+    @patch('requests.Session.post')
+    def test_async_batch(self, mock_post):
+        """测试异步批量接口"""
+        mock_post.return_value = make_api_response()
+        client = self.make_client()
+
+        results = asyncio.run(client.achat_completion_batch([[{'role': 'user', 'content': 'hi'}]] * 3))
+
+        self.assertTrue(all(r['success'] for r in results))
+        self.assertEqual(client.get_stats()['total_requests'], 3)
+
+
+class TestGLM4ClientStream(GLM4ClientTestCase):
+    """流式请求测试"""
+
+    MESSAGES = [{'role': 'user', 'content': '写一段简介'}]
+
+    @patch('requests.Session.post')
+    def test_stream_yields_tokens_and_logs_like_non_stream(self, mock_post):
+        """测试流式输出增量文本，结束后统计与日志与非流式一致"""
+        mock_post.return_value = make_stream_response(['Git', 'Hot', '平台'])
+        client = self.make_client(request_format='jsonl')
+
+        stream = client.chat_completion_stream(self.MESSAGES, model='glm-4-flash')
+        mock_post.assert_not_called()  # 开始迭代时才发送请求
+        pieces = list(stream)
+
+        self.assertEqual(pieces, ['Git', 'Hot', '平台'])
+        self.assertTrue(mock_post.call_args.kwargs['stream'])
+        self.assertTrue(mock_post.call_args.kwargs['json']['stream'])
+        self.assertEqual(stream.response['choices'][0]['message']['content'], 'GitHot平台')
+        self.assertEqual(stream.response['choices'][0]['finish_reason'], 'stop')
+        self.assertEqual(stream.response['usage']['total_tokens'], 15)
+        mock_post.return_value.close.assert_called_once()
+
+        stats = client.get_stats()
+        self.assertEqual((stats['successful_requests'], stats['total_tokens_consumed']), (1, 15))
+        analyzed = GLM4LogAnalyzer(self.temp_dir).analyze_logs()
+        self.assertEqual((analyzed['total_requests'], analyzed['total_tokens']), (1, 15))
+
+    @patch('requests.Session.post')
+    def test_stream_abort_closes_connection(self, mock_post):
+        """测试中途中止时断开连接并保留部分内容"""
+        mock_post.return_value = make_stream_response(['a', 'b', 'c', 'd'])
+        client = self.make_client()
+
+        with client.chat_completion_stream(self.MESSAGES) as stream:
+            for piece in stream:
+                if piece == 'b':
+                    break
+
+        mock_post.return_value.close.assert_called_once()
+        self.assertEqual(stream.response['choices'][0]['message']['content'], 'ab')
+        stats = client.get_stats()
+        self.assertEqual((stats['aborted_streams'], stats['successful_requests']), (1, 0))
+
+    @patch('requests.Session.post')
+    def test_async_stream(self, mock_post):
+        """测试异步迭代"""
+        mock_post.return_value = make_stream_response(['你', '好'])
+        client = self.make_client()
+
+        async def collect():
+            return [piece async for piece in client.chat_completion_stream(self.MESSAGES)]
+
+        self.assertEqual(asyncio.run(collect()), ['你', '好'])
+        self.assertEqual(client.get_stats()['successful_requests'], 1)
+
+
+class TestGLM4ClientCache(GLM4ClientTestCase):
+    """响应缓存测试"""
+
+    MESSAGES = [{'role': 'user', 'content': '总结这个项目'}]
+
+    @patch('requests.Session.post')
+    def test_identical_request_served_from_cache(self, mock_post):
+        """测试相同请求命中缓存，不同温度视为不同请求"""
+        mock_post.return_value = make_api_response(prompt_tokens=20, completion_tokens=80)
+        self.config.set('cache.enabled', True)
+        self.config.set('cache.path', os.path.join(self.temp_dir, 'glm4_cache.sqlite3'))
+        client = self.make_client(request_format='jsonl')
+
+        first = client.chat_completion(self.MESSAGES, temperature=0.3)
+        second = client.chat_completion(self.MESSAGES, temperature=0.3)
+        client.chat_completion(self.MESSAGES, temperature=0.9)
+
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertEqual(first, second)
+        stats = client.get_stats()
+        self.assertEqual((stats['cache_hits'], stats['cache_misses'], stats['cache_tokens_saved']), (1, 2, 100))
+        self.assertEqual(stats['total_requests'], 2)
+
+        analyzer = GLM4LogAnalyzer(self.temp_dir)
+        analyzed = analyzer.analyze_logs()
+        self.assertEqual((analyzed['cache_hits'], analyzed['tokens_saved']), (1, 100))
+        self.assertIn('节省Token: 100', analyzer.generate_report())
+        client.cache.close()
+
+
+class TestGLM4ClientBudget(GLM4ClientTestCase):
+    """Token预算测试"""
+
+    @patch('requests.Session.post')
+    def test_budget_degrades_and_commits_usage(self, mock_post):
+        """测试预算不足时降低 max_tokens，并按实际 usage 记账"""
+        mock_post.return_value = make_api_response(prompt_tokens=20, completion_tokens=80)
+        self.config.set('budget.enabled', True)
+        self.config.set('budget.per_run_tokens', 600)
+        self.config.set('budget.state_path', os.path.join(self.temp_dir, 'glm4_budget.json'))
+        client = self.make_client()
+
+        client.chat_completion([{'role': 'user', 'content': '总结这个项目'}], max_tokens=4096)
+
+        self.assertEqual(mock_post.call_args.kwargs['json']['max_tokens'], 600 - 13)
+        budget = client.get_stats()['budget']
+        self.assertEqual((budget['run_tokens'], budget['day_tokens'], budget['degraded_requests']), (100, 100, 1))
+
+    @patch('requests.Session.post')
+    def test_unstarted_stream_releases_reservation(self, mock_post):
+        """测试未迭代就关闭的流式请求归还预占额度"""
+        self.config.set('budget.enabled', True)
+        self.config.set('budget.per_run_tokens', 600)
+        self.config.set('budget.state_path', os.path.join(self.temp_dir, 'glm4_budget.json'))
+        client = self.make_client()
+
+        with client.chat_completion_stream([{'role': 'user', 'content': '写一段简介'}], max_tokens=200) as stream:
+            self.assertGreater(client.budget._reserved['tokens'], 0)
+        pending = client.chat_completion_stream([{'role': 'user', 'content': '写一段简介'}], max_tokens=200)
+        iter(pending)
+        pending.close()
+        pending.close()
+
+        mock_post.assert_not_called()
+        self.assertEqual(client.budget._reserved['tokens'], 0)
+        self.assertEqual(client.get_stats()['budget']['run_tokens'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
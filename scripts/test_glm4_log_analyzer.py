@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+GLM4LogAnalyzer单元测试
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from glm4_log_analyzer import GLM4LogAnalyzer
+
+
+def request_record(timestamp: str, request_id: str, model: str = 'glm-4-plus') -> str:
+    entry = {'request_id': request_id, 'type': 'REQUEST', 'model': model,
+             'messages': [{'role': 'user', 'content': '第一行\n第二行'}]}
+    return f"{timestamp} | REQUEST | {json.dumps(entry, ensure_ascii=False, indent=2)}\n"
+
+
+def response_record(timestamp: str, request_id: str, total: int = 30) -> str:
+    entry = {'request_id': request_id, 'type': 'RESPONSE', 'model': 'glm-4-plus', 'choices_count': 1,
+             'token_usage': {'prompt_tokens': 10, 'completion_tokens': total - 10, 'total_tokens': total}}
+    return f"{timestamp} | RESPONSE | {json.dumps(entry, ensure_ascii=False, indent=2)}\n"
+
+
+class TestGLM4LogAnalyzer(unittest.TestCase):
+    """GLM4LogAnalyzer单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.request_log = os.path.join(self.temp_dir, 'glm4_requests.log')
+        self.main_log = os.path.join(self.temp_dir, 'glm4_client.log')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def append(self, path: str, text: str):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text)
+
+    def analyze(self, **kwargs):
+        return GLM4LogAnalyzer(self.temp_dir).analyze_logs(**kwargs)
+
+    def test_multiline_records(self):
+        """测试解析 indent=2 写入的多行记录"""
+        self.append(self.request_log, request_record('2025-08-24 10:00:00', 'a'))
+        self.append(self.request_log, response_record('2025-08-24 10:00:01', 'a', total=30))
+        self.append(self.main_log, '2025-08-24 10:00:05 | ERROR | chat_completion:160 | '
+                                   'GLM-4.5 API请求失败 | RequestID: b | Error: Timeout reading\n')
+
+        stats = self.analyze()
+
+        self.assertEqual(stats['total_requests'], 1)
+        self.assertEqual(stats['successful_requests'], 1)
+        self.assertEqual(stats['failed_requests'], 1)
+        self.assertEqual(stats['total_tokens'], 30)
+        self.assertEqual(stats['models_used'], {'glm-4-plus': 1})
+        self.assertEqual(stats['hourly_usage'], {'10': 1})
+        self.assertEqual(stats['error_types'], {'Timeout': 1})
+
+    def test_incremental_runs_only_read_new_bytes(self):
+        """测试第二次分析只处理新增内容，且累计统计保持正确"""
+        self.append(self.request_log, request_record('2025-08-24 10:00:00', 'a'))
+        self.append(self.request_log, response_record('2025-08-24 10:00:01', 'a'))
+        self.analyze()
+
+        self.append(self.request_log, request_record('2025-08-25 09:00:00', 'b'))
+        self.append(self.request_log, response_record('2025-08-25 09:00:01', 'b', total=50))
+        stats = self.analyze()
+
+        self.assertEqual(len(stats['request_details']), 1)  # 只读取了新增的响应
+        self.assertEqual(stats['total_requests'], 2)
+        self.assertEqual(stats['total_tokens'], 80)
+        self.assertEqual(stats['daily_usage'], {'2025-08-24': 1, '2025-08-25': 1})
+
+        filtered = self.analyze(start_date='2025-08-25', end_date='2025-08-25')
+        self.assertEqual(filtered['total_requests'], 1)
+        self.assertEqual(filtered['total_tokens'], 50)
+
+    def test_rotated_backup_continues_from_checkpoint(self):
+        """测试日志轮转后继续读取备份文件中未处理的部分"""
+        self.append(self.request_log, request_record('2025-08-24 10:00:00', 'a'))
+        self.analyze()
+
+        # 轮转前又写入一条，随后文件被重命名为 .1
+        self.append(self.request_log, response_record('2025-08-24 10:00:01', 'a'))
+        os.rename(self.request_log, self.request_log + '.1')
+        self.append(self.request_log, request_record('2025-08-24 11:00:00', 'b'))
+
+        stats = self.analyze()
+
+        self.assertEqual(stats['total_requests'], 2)
+        self.assertEqual(stats['successful_requests'], 1)
+
+        self.assertEqual(self.analyze(full_rescan=True)['total_requests'], 2)
+
+    def test_partial_trailing_record_deferred(self):
+        """测试文件末尾未写完的记录留到下次处理"""
+        record = request_record('2025-08-24 10:00:00', 'a')
+        self.append(self.request_log, record[:40])
+        self.assertEqual(self.analyze()['total_requests'], 0)
+
+        self.append(self.request_log, record[40:])
+        self.assertEqual(self.analyze()['total_requests'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+HTTPClient单元测试
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch, Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import http_client
+from http_client import HTTPClient, get_shared_client
+
+
+class TestHTTPClient(unittest.TestCase):
+    """HTTPClient单元测试类"""
+
+    def test_host_specific_pool_size(self):
+        """测试按主机配置连接池大小"""
+        client = HTTPClient(pool_maxsize=5, host_pool_sizes={'api.github.com': 20})
+
+        github_adapter = client.session.get_adapter('https://api.github.com/search/repositories')
+        default_adapter = client.session.get_adapter('https://example.com/')
+
+        self.assertEqual(github_adapter._pool_maxsize, 20)
+        self.assertEqual(default_adapter._pool_maxsize, 5)
+        self.assertIsNot(github_adapter, default_adapter)
+
+    def test_retry_policy(self):
+        """测试重试策略只作用于幂等方法"""
+        client = HTTPClient(max_retries=2, backoff_factor=1.0)
+        retry = client.session.get_adapter('https://api.github.com/').max_retries
+
+        self.assertEqual(retry.total, 2)
+        self.assertEqual(retry.backoff_factor, 1.0)
+        self.assertIn(503, retry.status_forcelist)
+        # 限流响应交给速率限制调度器，urllib3 不重试也不按 Retry-After 休眠
+        self.assertNotIn(429, retry.status_forcelist)
+        self.assertNotIn(403, retry.status_forcelist)
+        self.assertFalse(retry.respect_retry_after_header)
+        self.assertIn('GET', retry.allowed_methods)
+        self.assertNotIn('POST', retry.allowed_methods)
+
+    def test_gzip_enabled(self):
+        """测试默认启用压缩传输"""
+        client = HTTPClient()
+        self.assertIn('gzip', client.session.headers['Accept-Encoding'])
+
+    @patch('requests.Session.get')
+    def test_default_timeout(self, mock_get):
+        """测试未指定超时时使用默认超时"""
+        mock_get.return_value = Mock(status_code=200)
+        client = HTTPClient(timeout=12)
+
+        client.get('https://api.github.com/repos/owner/repo')
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], 12)
+
+        client.get('https://api.github.com/repos/owner/repo', timeout=3)
+        self.assertEqual(mock_get.call_args.kwargs['timeout'], 3)
+
+    def test_shared_client_singleton(self):
+        """测试共享客户端为单例"""
+        with patch.object(http_client, '_shared_client', None):
+            first = get_shared_client()
+            second = get_shared_client()
+            self.assertIs(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -10,6 +10,8 @@
 创建时间: 2025-08-24
 """
 
+import io
+import requests
 import unittest
 import tempfile
 import os
@@ -29,6 +31,7 @@ crypto_analyzer_module = importlib.util.module_from_spec(spec)
 spec.loader.exec_module(crypto_analyzer_module)
 ClaudeAgentAnalyzer = crypto_analyzer_module.ClaudeAgentAnalyzer
 from project_deduplicator import ProjectDeduplicator
+from star_history import StarHistory
 
 
 class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
@@ -43,13 +46,15 @@ class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
         os.environ['GITHUB_TOKEN'] = 'test_token_12345'
         
         # 创建测试用的分析器实例
-        self.analyzer = ClaudeAgentAnalyzer()
+        self.star_history = StarHistory(os.path.join(self.temp_dir, 'star_history.sqlite3'))
+        self.analyzer = ClaudeAgentAnalyzer(star_history=self.star_history)
         # 替换历史文件路径为测试文件
         self.analyzer.history_file = self.test_history_file
         self.analyzer.deduplicator = ProjectDeduplicator(self.test_history_file)
     
     def tearDown(self):
         """集成测试后清理"""
+        self.star_history.close()
         if os.path.exists(self.temp_dir):
             shutil.rmtree(self.temp_dir)
         
@@ -74,7 +79,7 @@ class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
             "owner": {"login": full_name.split('/')[0]}
         }
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_search_claude_agents_with_deduplication(self, mock_get):
         """测试带去重的项目搜索功能"""
         # 准备模拟数据
@@ -160,7 +165,7 @@ class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
         # 第二个项目应被识别为重复（大小写不敏感）
         self.assertTrue(self.analyzer.deduplicator.is_duplicate_project(project2))
     
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_end_to_end_deduplication_workflow(self, mock_get):
         """测试端到端去重工作流程"""
         # 准备测试数据
@@ -195,7 +200,7 @@ class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
     def test_data_persistence_across_instances(self):
         """测试数据在不同实例间的持久化"""
         # 第一个分析器实例
-        analyzer1 = ClaudeAgentAnalyzer()
+        analyzer1 = ClaudeAgentAnalyzer(star_history=self.star_history)
         analyzer1.history_file = self.test_history_file
         analyzer1.deduplicator = ProjectDeduplicator(self.test_history_file)
         
@@ -205,7 +210,7 @@ class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
         analyzer1.deduplicator.add_analyzed_project(test_project)
         
         # 创建第二个分析器实例
-        analyzer2 = ClaudeAgentAnalyzer()
+        analyzer2 = ClaudeAgentAnalyzer(star_history=self.star_history)
         analyzer2.history_file = self.test_history_file
         analyzer2.deduplicator = ProjectDeduplicator(self.test_history_file)
         
@@ -265,6 +270,99 @@ class TestClaudeAgentAnalyzerIntegration(unittest.TestCase):
         stats = self.analyzer.deduplicator.get_project_statistics()
         self.assertEqual(stats['total_projects'], 100)
 
+    @patch('requests.Session.get')
+    def test_get_projects_details_concurrent(self, mock_get):
+        """测试并发获取项目详情（保持顺序且字段完整，README在首次访问时才获取）"""
+        from readme_loader import ReadmeLoader, readme_text
+
+        def make_response(body: bytes, headers: dict = None) -> requests.Response:
+            response = requests.Response()
+            response.status_code = 200
+            response.raw = io.BytesIO(body)
+            response.headers.update(headers or {})
+            return response
+
+        def fake_get(url, **kwargs):
+            if url.endswith('/readme'):
+                return make_response(f'README of {url}'.encode('utf-8'), {'ETag': '"readme"'})
+            if '/commits' in url:
+                payload = [{'commit': {'message': 'init', 'author': {'date': '2025-08-24T00:00:00Z', 'name': 'dev'}}}]
+            elif url.endswith('/languages'):
+                payload = {'Python': 1000}
+            else:
+                payload = []
+            return make_response(json.dumps(payload).encode('utf-8'))
+
+        mock_get.side_effect = fake_get
+        self.analyzer.max_concurrency = 3
+        self.analyzer.readme_loader = ReadmeLoader(
+            self.analyzer.headers, self.analyzer.http,
+            db_path=os.path.join(self.temp_dir, 'readmes.sqlite3')
+        )
+
+        projects = []
+        for i in range(6):
+            project = self.create_mock_project(f"project-{i}", f"user{i}/project-{i}")
+            project['url'] = f"https://api.github.com/repos/user{i}/project-{i}"
+            projects.append(project)
+
+        details = self.analyzer.get_projects_details(projects)
+
+        self.assertEqual(len(details), 6)
+        for project, detail in zip(projects, details):
+            self.assertIs(detail['basic_info'], project)
+            self.assertNotIn('readme_content', detail)
+            self.assertEqual(detail['languages'], {'Python': 1000})
+            self.assertEqual(len(detail['recent_commits']), 1)
+            self.assertEqual(detail['releases'], [])
+            self.assertEqual(detail['issues'], [])
+        # 每个项目4个子请求，README尚未获取
+        self.assertEqual(mock_get.call_count, 24)
+
+        for project, detail in zip(projects, details):
+            self.assertIn(project['full_name'], readme_text(detail))
+        self.assertEqual(mock_get.call_count, 30)
+
+    def test_graphql_null_repos_fall_back_to_rest(self):
+        """测试GraphQL返回null的仓库改走REST获取详情，其余仓库不重复请求"""
+        projects = [self.create_mock_project(f"project-{i}", f"user{i}/project-{i}") for i in range(3)]
+        full = {'basic_info': projects[0], 'recent_commits': [], 'languages': {'Python': 1000},
+                'topics': [], 'releases': [], 'issues': []}
+        self.analyzer.use_graphql = True
+        self.analyzer.graphql = Mock()
+        self.analyzer.graphql.fetch_details.return_value = [
+            full, {'basic_info': projects[1]}, {'basic_info': projects[2]}
+        ]
+        rest = Mock(side_effect=lambda project: {'basic_info': project, 'languages': {'Go': 1}})
+
+        with patch.object(self.analyzer, 'get_project_details', rest):
+            details = self.analyzer.get_projects_details(projects)
+
+        self.assertEqual([call.args[0] for call in rest.call_args_list], projects[1:])
+        self.assertIs(details[0], full)
+        self.assertEqual([d['languages'] for d in details], [{'Python': 1000}, {'Go': 1}, {'Go': 1}])
+        self.assertEqual([d['basic_info'] for d in details], projects)
+
+    @patch('requests.Session.get')
+    def test_trending_sweep_languages_from_env(self, mock_get):
+        """测试Trending搜索并发执行且语言列表可由环境变量配置"""
+        def fake_get(url, **kwargs):
+            lang = kwargs['params']['q'].split()[0].split(':')[1]
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {"items": [self.create_mock_project(f"{lang}-repo", f"{lang}/repo", 200)]}
+            return response
+
+        mock_get.side_effect = fake_get
+
+        with patch.dict(os.environ, {'TRENDING_LANGUAGES': 'Python, Go ,Rust', 'TRENDING_PER_LANGUAGE': '3'}):
+            projects = self.analyzer._search_by_trending_now('daily')
+
+        self.assertEqual(mock_get.call_count, 3)
+        self.assertEqual({p['name'] for p in projects}, {'Python-repo', 'Go-repo', 'Rust-repo'})
+        self.assertTrue(all(p['_source'] == 'trending' for p in projects))
+        self.assertTrue(all(call.kwargs['params']['per_page'] == 3 for call in mock_get.call_args_list))
+
 
 class TestDataMigrationIntegration(unittest.TestCase):
     """数据迁移集成测试类"""
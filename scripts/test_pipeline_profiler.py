@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+流水线阶段计时单元测试
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pipeline_profiler
+from pipeline_profiler import pipeline_run, stage, profiled, propagate, record_http, record_wait
+
+
+def fake_response(size: int, remaining: str = None):
+    headers = {'Content-Length': str(size)}
+    if remaining is not None:
+        headers.update({'X-RateLimit-Resource': 'core', 'X-RateLimit-Remaining': remaining})
+    return Mock(status_code=200, headers=headers)
+
+
+class TestPipelineProfiler(unittest.TestCase):
+    """pipeline_profiler单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_inactive_is_noop(self):
+        """测试没有活动运行时不记录"""
+        calls = []
+
+        @profiled('noop')
+        def work():
+            calls.append(1)
+            return 'ok'
+
+        with stage('noop') as current:
+            self.assertIsNone(current)
+        record_http('https://api.github.com/', fake_response(10), 0.1)
+        self.assertEqual(work(), 'ok')
+        self.assertEqual(calls, [1])
+        self.assertIsNone(pipeline_profiler.get_active_run())
+
+    def test_nested_stages_and_threads(self):
+        """测试嵌套阶段归属、线程池继承与追踪文件"""
+
+        @profiled('details')
+        def fetch(size):
+            record_http('https://api.github.com/repos/a/b', fake_response(size, remaining=str(4000 - size)), 0.5)
+            return size
+
+        with pipeline_run('unit', trace_dir=self.temp_dir, profile='') as run:
+            with stage('search'):
+                record_http('https://api.github.com/search/repositories', fake_response(100), 0.2)
+                record_wait(1.5)
+            with stage('batch'):
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    self.assertEqual(list(executor.map(propagate(fetch), [1, 2, 3])), [1, 2, 3])
+            record_http('https://www.producthunt.com/', None, 0.1)
+
+        summary = run.summary()
+        self.assertEqual(summary['search']['http_calls'], 1)
+        self.assertEqual(summary['search']['wait_seconds'], 1.5)
+        self.assertEqual(summary['details']['count'], 3)
+        self.assertEqual(summary['details']['http_bytes'], 6)
+        self.assertEqual(summary['batch']['http_calls'], 3)
+
+        batch = next(s for s in run.stages if s.name == 'batch')
+        self.assertTrue(all(s.parent == batch.id for s in run.stages if s.name == 'details'))
+        self.assertIn(batch.rate_limit['core'], (3997, 3998, 3999))
+
+        files = os.listdir(self.temp_dir)
+        self.assertEqual(len(files), 1)
+        with open(os.path.join(self.temp_dir, files[0]), encoding='utf-8') as f:
+            trace = json.load(f)
+        self.assertEqual(trace['run'], 'unit')
+        self.assertEqual(trace['http']['calls'], 5)
+        self.assertEqual(trace['http']['errors'], 1)
+        self.assertEqual(trace['http']['hosts']['api.github.com']['bytes'], 106)
+        self.assertIsNone(pipeline_profiler.get_active_run())
+
+    def test_error_and_cprofile(self):
+        """测试阶段异常记录与cProfile输出"""
+        with self.assertRaises(ValueError):
+            with pipeline_run('broken', trace_dir=self.temp_dir, profile='cprofile') as run:
+                with stage('render'):
+                    raise ValueError('boom')
+
+        render = next(s for s in run.stages if s.name == 'render')
+        self.assertEqual(render.error, 'ValueError: boom')
+        suffixes = sorted(os.path.splitext(name)[1] for name in os.listdir(self.temp_dir))
+        self.assertEqual(suffixes, ['.json', '.prof', '.txt'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -93,6 +93,48 @@ class TestProductHuntAnalyzer(unittest.TestCase):
         self.assertEqual(data['total_products'], 3)
         self.assertIn('last_updated', data)
 
+    def test_has_recent_product_uses_history_index(self):
+        """测试按规范化产品名查询最近分析记录，旧格式文件自动迁移"""
+        today = datetime.date.today()
+        legacy = {
+            'analyzed_products': [
+                f"Cosine CLI-{(today - datetime.timedelta(days=2)).isoformat()}",
+                f"Surfshark-{today.isoformat()}",
+                f"Oboe-{(today - datetime.timedelta(days=10)).isoformat()}"
+            ]
+        }
+        with open(self.analyzer.history_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+
+        self.assertTrue(self.analyzer.has_recent_product('cosine  cli', days=3))
+        self.assertFalse(self.analyzer.has_recent_product('Cosine CLI', days=1))
+        self.assertFalse(self.analyzer.has_recent_product('Surf', days=3))  # 不再做子串匹配
+        self.assertFalse(self.analyzer.has_recent_product('Oboe', days=7))
+
+        # 保存后索引与旧列表一起持久化，新实例无需解析ID字符串
+        self.analyzer.save_analyzed_products(set(legacy['analyzed_products']) | {f"Oboe-{today.isoformat()}"})
+        with open(self.analyzer.history_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertEqual(len(data['history_index']['products']['oboe']['dates']), 2)
+
+        reloaded = ProductHuntAnalyzer()
+        with patch.object(ProductHuntAnalyzer, 'load_analyzed_products') as mock_load:
+            self.assertTrue(reloaded.has_recent_product('Oboe', days=0))
+            mock_load.assert_not_called()
+
+    def test_is_duplicate_content_detects_near_duplicates(self):
+        """测试描述稍有改动的产品被判定为近似重复"""
+        product = {'name': 'Cosine CLI',
+                   'description': 'An autonomous AI software engineer that lives in your terminal and ships code for you'}
+        self.assertFalse(self.analyzer.is_duplicate_content([product]))
+        self.analyzer.record_similarity([product])
+
+        renamed = {'name': 'Cosine CLI 2.0',
+                   'description': 'An autonomous AI Software Engineer that lives in your terminal and ships code for you.'}
+        fresh = ProductHuntAnalyzer()  # 从 data/ 重新加载索引
+        self.assertTrue(fresh.is_duplicate_content([renamed]))
+        self.assertFalse(fresh.is_duplicate_content([{'name': 'Gromet', 'description': 'Plant care reminders'}]))
+
     def test_save_analyzed_products_error(self):
         """测试保存历史记录出错情况"""
         # 创建一个只读目录
@@ -105,7 +147,7 @@ class TestProductHuntAnalyzer(unittest.TestCase):
         # 这应该不会抛出异常，但会打印错误消息
         analyzer.save_analyzed_products({'test'})
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_top_products_success(self, mock_get):
         """测试成功抓取产品"""
         mock_html = '''
@@ -136,7 +178,7 @@ class TestProductHuntAnalyzer(unittest.TestCase):
         self.assertIsInstance(products, list)
         mock_get.assert_called_once()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_fetch_top_products_request_error(self, mock_get):
         """测试网络请求失败"""
         mock_get.side_effect = Exception("Network error")
@@ -187,7 +229,7 @@ class TestProductHuntAnalyzer(unittest.TestCase):
         product = self.analyzer._extract_product_info(None)
         self.assertEqual(product, {})
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_product_details_success(self, mock_get):
         """测试成功获取产品详情"""
         mock_html = '''
@@ -216,7 +258,7 @@ class TestProductHuntAnalyzer(unittest.TestCase):
         self.assertIn('detailed_description', detailed)
         self.assertIn('tags', detailed)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_product_details_no_url(self, mock_get):
         """测试没有URL的产品"""
         product = {'name': 'Test Product'}
@@ -224,7 +266,7 @@ class TestProductHuntAnalyzer(unittest.TestCase):
         self.assertEqual(detailed, product)
         mock_get.assert_not_called()
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_get_product_details_error(self, mock_get):
         """测试获取产品详情出错"""
         mock_get.side_effect = Exception("Request failed")
@@ -442,7 +484,7 @@ class TestIntegration(unittest.TestCase):
         os.chdir(self.original_cwd)
         shutil.rmtree(self.test_dir, ignore_errors=True)
 
-    @patch('requests.get')
+    @patch('requests.Session.get')
     def test_full_workflow_mock(self, mock_get):
         """测试完整工作流程（使用Mock）"""
         # Mock第一次请求（获取产品列表）
@@ -69,7 +69,7 @@ def test_integration_with_mock():
             
             return mock_response
         
-        with patch('requests.get', side_effect=mock_response_side_effect):
+        with patch('requests.Session.get', side_effect=mock_response_side_effect):
             analyzer = ProductHuntAnalyzer()
             success = analyzer.run_analysis()
             
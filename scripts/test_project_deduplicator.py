@@ -107,6 +107,21 @@ class TestProjectDeduplicator(unittest.TestCase):
                 result = self.deduplicator.normalize_github_url(invalid_input)
                 self.assertEqual(result, invalid_input)
     
+    def test_normalize_github_url_memoized(self):
+        """测试标准化结果按原始URL缓存，且标识符与哈希共享同一次计算"""
+        from project_deduplicator import _normalize_github_url
+        _normalize_github_url.cache_clear()
+        
+        project = {"html_url": "https://github.com/Memo/Repo.git", "id": 42}
+        identifier, project_hash = self.deduplicator._get_project_keys(project)
+        self.deduplicator.normalize_github_url("https://github.com/Memo/Repo.git")
+        
+        info = _normalize_github_url.cache_info()
+        self.assertEqual((info.misses, info.hits), (1, 1))
+        self.assertEqual(identifier, self.deduplicator._get_project_identifier(project))
+        self.assertEqual(project_hash, self.deduplicator.generate_project_hash(project))
+        self.assertEqual(identifier, "memo/repo")
+    
     # 项目哈希生成测试
     def test_generate_project_hash_with_full_name(self):
         """测试使用full_name生成项目哈希"""
@@ -240,6 +255,27 @@ class TestProjectDeduplicator(unittest.TestCase):
         # 第二个项目应被识别为重复（大小写不敏感）
         self.assertTrue(self.deduplicator.is_duplicate_project(project2))
     
+    # 批量过滤测试
+    def test_filter_new_projects(self):
+        """测试批量过滤已分析项目及批次内重复"""
+        self.deduplicator.add_analyzed_project({
+            "full_name": "seen/project",
+            "html_url": "https://github.com/seen/project"
+        })
+        
+        projects = [
+            {"full_name": "new/one", "html_url": "https://github.com/new/one"},
+            {"full_name": "seen/project", "html_url": "https://github.com/seen/project"},
+            {"full_name": "New/One", "html_url": "https://github.com/New/One"},  # 批次内重复
+            {"html_url": "https://github.com/new/two.git"},
+        ]
+        duplicates = []
+        
+        new_projects = self.deduplicator.filter_new_projects(iter(projects), on_duplicate=duplicates.append)
+        
+        self.assertEqual(new_projects, [projects[0], projects[3]])
+        self.assertEqual(duplicates, [projects[1]])
+    
     # 添加已分析项目测试
     def test_add_analyzed_project_success(self):
         """测试成功添加已分析项目"""
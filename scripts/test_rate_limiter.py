@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+GitHubRateLimiter单元测试
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from rate_limiter import GitHubRateLimiter, RateLimitExceeded
+from http_client import HTTPClient
+
+
+class FakeClock:
+    """可控时钟，sleep 直接推进时间"""
+
+    def __init__(self, start: float = 1_000_000.0):
+        self.now = start
+        self.sleeps = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_response(status_code: int = 200, **headers) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = b'{}'
+    response.headers = CaseInsensitiveDict({k.replace('_', '-'): str(v) for k, v in headers.items()})
+    return response
+
+
+class TestGitHubRateLimiter(unittest.TestCase):
+    """GitHubRateLimiter单元测试类"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = GitHubRateLimiter(authenticated=True, clock=self.clock.time, sleep=self.clock.sleep)
+
+    def test_resource_for(self):
+        """测试按URL区分配额类型"""
+        self.assertEqual(self.limiter.resource_for('https://api.github.com/search/repositories'), 'search')
+        self.assertEqual(self.limiter.resource_for('https://api.github.com/repos/o/r/readme'), 'core')
+        self.assertEqual(self.limiter.resource_for('https://api.github.com/graphql'), 'graphql')
+        self.assertIsNone(self.limiter.resource_for('https://www.producthunt.com/'))
+
+    def test_no_wait_when_budget_available(self):
+        """测试配额充足时不等待"""
+        for _ in range(30):
+            self.limiter.acquire('search')
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_waits_when_search_bucket_empty(self):
+        """测试search配额耗尽后按补充速率等待，且不影响core配额"""
+        for _ in range(30):
+            self.limiter.acquire('search')
+
+        self.limiter.acquire('core')
+        self.assertEqual(self.clock.sleeps, [])
+
+        self.limiter.acquire('search')
+        self.assertEqual(len(self.clock.sleeps), 1)
+        self.assertAlmostEqual(self.clock.sleeps[0], 2.0, places=3)  # 30次/60秒
+
+    def test_remaining_zero_blocks_until_reset(self):
+        """测试剩余配额为0时等待到重置时间"""
+        reset = int(self.clock.now) + 20
+        response = make_response(200, X_RateLimit_Remaining=0, X_RateLimit_Reset=reset, X_RateLimit_Limit=5000)
+        self.limiter.update_from_response('core', response)
+
+        self.limiter.acquire('core')
+        self.assertGreaterEqual(self.clock.now, reset)
+
+    def test_retry_after_on_secondary_limit(self):
+        """测试次级速率限制按 Retry-After 等待"""
+        response = make_response(403, Retry_After=7)
+        self.assertTrue(self.limiter.is_rate_limited(response))
+        self.limiter.update_from_response('core', response)
+
+        self.limiter.acquire('core')
+        self.assertEqual(self.clock.sleeps, [7])
+
+    def test_max_wait_exceeded(self):
+        """测试等待时间超过上限时抛出异常"""
+        self.limiter.max_wait = 10
+        response = make_response(429, Retry_After=600)
+        self.limiter.update_from_response('search', response)
+
+        with self.assertRaises(RateLimitExceeded):
+            self.limiter.acquire('search')
+
+    def test_limit_header_resizes_bucket(self):
+        """测试根据 X-RateLimit-Limit 调整配额容量"""
+        limiter = GitHubRateLimiter(authenticated=False, clock=self.clock.time, sleep=self.clock.sleep)
+        self.assertEqual(limiter.buckets['search'].capacity, 10)
+
+        limiter.update_from_response('search', make_response(200, X_RateLimit_Limit=30, X_RateLimit_Remaining=29))
+        self.assertEqual(limiter.buckets['search'].capacity, 30)
+
+    def test_not_modified_refunds_token(self):
+        """测试304响应归还令牌"""
+        self.limiter.acquire('core')
+        before = self.limiter.buckets['core'].tokens
+        self.limiter.update_from_response('core', make_response(304))
+        self.assertEqual(self.limiter.buckets['core'].tokens, before + 1)
+
+    @patch('requests.Session.get')
+    def test_http_client_retries_after_rate_limit(self, mock_get):
+        """测试HTTP客户端遇到限流响应后等待并重试"""
+        mock_get.side_effect = [make_response(403, Retry_After=3), make_response(200)]
+        client = HTTPClient(rate_limiter=self.limiter)
+
+        response = client.get('https://api.github.com/search/repositories', params={'q': 'claude'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(mock_get.call_count, 2)
+        self.assertEqual(self.clock.sleeps, [3])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+README按需加载单元测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from readme_loader import ReadmeLoader, readme_text
+
+
+def raw_response(status: int = 200, body: bytes = b'', etag: str = None):
+    response = Mock(status_code=status, headers={'ETag': etag} if etag else {})
+    response.iter_content.return_value = [body[i:i + 4096] for i in range(0, len(body), 4096)]
+    return response
+
+
+class TestReadmeLoader(unittest.TestCase):
+    """ReadmeLoader单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.http = Mock()
+        self.loader = ReadmeLoader({'Accept': 'application/vnd.github.v3+json'}, self.http,
+                                   db_path=os.path.join(self.temp_dir, 'readmes.sqlite3'), max_chars=100)
+        self.project = {'full_name': 'Octo/Agent', 'pushed_at': '2025-09-01T00:00:00Z'}
+
+    def tearDown(self):
+        self.loader.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_streamed_excerpt_is_bounded(self):
+        """测试以原始格式流式读取，只读取摘要所需的字节"""
+        body = ('说明' * 50000).encode('utf-8')
+        self.http.request.return_value = raw_response(body=body, etag='"v1"')
+
+        excerpt = self.loader.load(self.project)
+
+        self.assertEqual(excerpt, '说明' * 50)
+        kwargs = self.http.request.call_args.kwargs
+        self.assertTrue(kwargs['stream'])
+        self.assertEqual(kwargs['headers']['Accept'], 'application/vnd.github.raw')
+        self.assertEqual(kwargs['headers']['Range'], 'bytes=0-399')
+        self.assertLessEqual(self.loader.get_stats()['bytes'], 400)
+        self.http.request.return_value.close.assert_called_once()
+
+    def test_sha_and_push_short_circuit(self):
+        """测试blob SHA或pushed_at未变化时不发请求，变化后带ETag重新验证"""
+        self.http.request.return_value = raw_response(body=b'# Agent', etag='"v1"')
+        self.assertEqual(self.loader.load(self.project, sha='abc'), '# Agent')
+
+        self.assertEqual(self.loader.load({'full_name': 'octo/agent'}, sha='abc'), '# Agent')
+        self.assertEqual(self.loader.load(self.project), '# Agent')
+        self.assertEqual(self.http.request.call_count, 1)
+
+        self.http.request.return_value = raw_response(status=304)
+        pushed = dict(self.project, pushed_at='2025-09-02T00:00:00Z')
+        self.assertEqual(self.loader.load(pushed), '# Agent')
+        self.assertEqual(self.http.request.call_args.kwargs['headers']['If-None-Match'], '"v1"')
+        self.assertEqual(self.loader.get_stats()['revalidated'], 1)
+
+        self.http.request.return_value = raw_response(body=b'# Agent v2', etag='"v2"')
+        self.assertEqual(self.loader.load(pushed, sha='def'), '# Agent v2')
+        self.assertEqual(self.http.request.call_count, 3)
+
+    def test_missing_and_failed(self):
+        """测试没有README记为空摘要，请求失败返回None且不记录"""
+        self.http.request.return_value = raw_response(status=404)
+        self.assertEqual(self.loader.load(self.project), '')
+        self.assertEqual(self.loader.load(self.project), '')
+        self.assertEqual(self.http.request.call_count, 1)
+
+        self.http.request.side_effect = ConnectionError('reset')
+        self.assertIsNone(self.loader.load({'full_name': 'octo/other'}))
+
+    def test_readme_text_is_lazy(self):
+        """测试project_details中的README在首次访问时才加载且只加载一次"""
+        loader = Mock(return_value=None)
+        details = {'basic_info': {}, 'readme_loader': loader}
+        loader.assert_not_called()
+
+        self.assertEqual(readme_text(details), '')
+        self.assertEqual(readme_text(details), '')
+        loader.assert_called_once()
+        self.assertEqual(readme_text({'readme_content': 'ready'}), 'ready')
+        self.assertEqual(readme_text({}), '')
+
+
+if __name__ == '__main__':
+    unittest.main()
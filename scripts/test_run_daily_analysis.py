@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+每日统一分析调度器单元测试
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from run_daily_analysis import DailyAnalysis, write_github_output, _LabeledStream, _output_label
+from star_history import StarHistory
+
+
+class FakeDailyAnalysis(DailyAnalysis):
+    """用假的分析器入口替换真实分析器"""
+
+    def __init__(self, history_dir: str, **kwargs):
+        super().__init__(http_client=Mock(), **kwargs)
+        self.history_dir = history_dir
+        self.star_history = StarHistory(os.path.join(history_dir, 'star_history.sqlite3'))
+
+    def run_claude_agent(self) -> bool:
+        self.deduplicator(os.path.join(self.history_dir, 'agents.json')).add_analyzed_project(
+            {'full_name': 'octo/agent', 'html_url': 'https://github.com/octo/agent'}
+        )
+        time.sleep(0.3)
+        return True
+
+    def run_claude_prompts(self) -> bool:
+        time.sleep(0.3)
+        raise RuntimeError('boom')
+
+    def run_producthunt(self) -> bool:
+        self.deduplicator(os.path.join(self.history_dir, 'ph.json'))
+        time.sleep(5)
+        return True
+
+
+class TestDailyAnalysis(unittest.TestCase):
+    """DailyAnalysis单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_concurrent_isolation_and_timeout(self):
+        """测试并发运行、失败隔离、超时与去重器关闭"""
+        analysis = FakeDailyAnalysis(self.temp_dir, timeout=1)
+        ph_deduplicator = Mock()
+        analysis._deduplicators[os.path.join(self.temp_dir, 'ph.json')] = ph_deduplicator
+        start = time.monotonic()
+        results = {result.name: result for result in analysis.run()}
+        elapsed = time.monotonic() - start
+
+        # 并发运行：总耗时接近时限而不是各分析器之和
+        self.assertLess(elapsed, 2)
+        self.assertEqual(results['claude_agent'].status, 'success')
+        self.assertEqual(results['claude_prompts'].status, 'failed')
+        self.assertIn('boom', results['claude_prompts'].error)
+        self.assertEqual(results['producthunt'].status, 'timeout')
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, 'agents.json')))
+        # 超时分析器仍可能在写入，它的去重器不关闭
+        ph_deduplicator.close.assert_not_called()
+
+        output = os.path.join(self.temp_dir, 'output')
+        write_github_output(list(results.values()), output)
+        with open(output, encoding='utf-8') as f:
+            text = f.read()
+        self.assertIn('claude_agent_success=true\n', text)
+        self.assertIn('producthunt_status=timeout\n', text)
+
+    def test_claude_agent_without_articles_is_no_content(self):
+        """测试Claude Agent分析器没有生成文章时返回False（记为no_content）"""
+        module = Mock()
+        module.main.side_effect = [0, 2]
+        analysis = FakeDailyAnalysis(self.temp_dir)
+        with patch('run_daily_analysis.load_script', return_value=module):
+            self.assertFalse(DailyAnalysis.run_claude_agent(analysis))
+            self.assertTrue(DailyAnalysis.run_claude_agent(analysis))
+
+    def test_shared_deduplicator(self):
+        """测试同一历史文件只创建一个去重器"""
+        analysis = FakeDailyAnalysis(self.temp_dir)
+        path = os.path.join(self.temp_dir, 'agents.json')
+        self.assertIs(analysis.deduplicator(path), analysis.deduplicator(path))
+
+
+class TestLabeledStream(unittest.TestCase):
+    """_LabeledStream单元测试类"""
+
+    def test_flush_writes_partial_line(self):
+        """测试刷新时输出未换行的内容，不丢失分析器最后一行"""
+        target = io.StringIO()
+        stream = _LabeledStream(target)
+        token = _output_label.set('producthunt')
+        try:
+            stream.write('进度 1/3\n进度 2/3')
+            self.assertEqual(target.getvalue(), '[producthunt] 进度 1/3\n')
+            stream.flush()
+        finally:
+            _output_label.reset(token)
+
+        self.assertEqual(target.getvalue(), '[producthunt] 进度 1/3\n[producthunt] 进度 2/3\n')
+        stream.flush()
+        self.assertEqual(target.getvalue().count('进度 2/3'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
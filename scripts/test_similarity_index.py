@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+MinHash LSH 近似重复索引单元测试
+"""
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from similarity_index import SimilarityIndex, MinHasher
+
+BASE = ("Cosine CLI is an autonomous AI software engineer in your terminal. "
+        "It plans, writes and tests code across large repositories, 支持多种编程语言。")
+
+
+class TestSimilarityIndex(unittest.TestCase):
+    """SimilarityIndex单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'similarity_index.json')
+        self.now = 1_750_000_000.0
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def make_index(self, **kwargs) -> SimilarityIndex:
+        return SimilarityIndex.load(self.path, clock=lambda: self.now, **kwargs)
+
+    def test_signature_similarity(self):
+        """测试签名相似度接近真实 Jaccard 相似度"""
+        hasher = MinHasher()
+        self.assertEqual(MinHasher.similarity(hasher.signature(BASE), hasher.signature(BASE)), 1.0)
+        edited = BASE.replace('large', 'huge')
+        self.assertGreater(MinHasher.similarity(hasher.signature(BASE), hasher.signature(edited)), 0.75)
+        self.assertLess(MinHasher.similarity(hasher.signature(BASE), hasher.signature('完全不同的另一款产品')), 0.2)
+
+    def test_find_similar_with_kind_and_recency(self):
+        """测试按类型与时间范围查询近似重复"""
+        index = self.make_index()
+        index.add('product:cosine', BASE, kind='product', label='Cosine CLI', timestamp=self.now - 86400)
+        index.add('product:old', BASE + ' v1', kind='product', timestamp=self.now - 30 * 86400)
+        index.add('post:a.md', BASE, kind='post')
+        index.add('product:other', 'A calendar app for remote teams with smart scheduling.', kind='product')
+
+        edited = BASE.replace('terminal', 'shell')
+        matches = index.find_similar(edited, threshold=0.7, days=3, kind='product')
+
+        self.assertEqual([item_id for item_id, _ in matches], ['product:cosine'])
+        self.assertTrue(index.is_near_duplicate(edited, threshold=0.7, days=60, kind='product'))
+        self.assertFalse(index.is_near_duplicate('Totally unrelated text about gardening.', days=60))
+
+    def test_persistence_and_retention(self):
+        """测试保存后重新加载，并丢弃超过保留期的条目"""
+        index = self.make_index(retention_days=10)
+        index.add('product:new', BASE, kind='product')
+        index.add('product:expired', BASE, kind='product', timestamp=self.now - 20 * 86400)
+        self.assertTrue(index.save())
+
+        reloaded = self.make_index(retention_days=10)
+        self.assertEqual(len(reloaded), 1)
+        self.assertIn('product:new', reloaded)
+        self.assertEqual(reloaded.find_similar(BASE, kind='product')[0], ('product:new', 1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
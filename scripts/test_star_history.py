@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Star历史时间序列单元测试
+"""
+
+import os
+import sys
+import shutil
+import datetime
+import tempfile
+import unittest
+import importlib.util
+from unittest.mock import Mock, patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from star_history import StarHistory
+from candidate_pool import CandidatePool
+
+spec = importlib.util.spec_from_file_location(
+    "crypto_project_analyzer", os.path.join(os.path.dirname(os.path.abspath(__file__)), "crypto-project-analyzer.py")
+)
+crypto_analyzer_module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(crypto_analyzer_module)
+
+
+class TestStarHistory(unittest.TestCase):
+    """StarHistory单元测试类"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.today = datetime.date(2025, 9, 30)
+        self.history = StarHistory(os.path.join(self.temp_dir, 'stars.sqlite3'), today=self.today)
+
+    def tearDown(self):
+        self.history.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def day(self, offset: int) -> datetime.date:
+        return self.today - datetime.timedelta(days=offset)
+
+    def test_window_deltas(self):
+        """测试1/7/30天窗口的真实增量"""
+        for offset, stars in ((40, 100), (30, 200), (7, 900), (1, 1000), (0, 1100)):
+            self.history.record([{'full_name': 'Octo/Spike', 'stargazers_count': stars, 'forks_count': stars // 10}],
+                                day=self.day(offset))
+        # 同一天再次记录时保留最新值，分析器内部格式（stars/forks）同样可以记录
+        self.history.record([{'full_name': 'octo/spike', 'stars': 1200, 'forks': 120}])
+
+        deltas = self.history.deltas([{'full_name': 'octo/spike'}])['octo/spike']
+        self.assertEqual(deltas[1], {'stars': 200, 'forks': 20, 'days': 1, 'stars_per_day': 200.0})
+        self.assertEqual(deltas[7]['stars'], 300)
+        self.assertEqual(deltas[30]['stars'], 1000)
+        self.assertAlmostEqual(deltas[30]['stars_per_day'], 1000 / 30)
+
+    def test_short_history_and_unknown(self):
+        """测试历史不足一个窗口时按实际天数计算，没有历史时返回None"""
+        self.history.record([{'full_name': 'octo/new', 'stargazers_count': 10}], day=self.day(2))
+        self.history.record([{'full_name': 'octo/new', 'stargazers_count': 70}])
+
+        self.assertEqual(self.history.velocity({'full_name': 'octo/new'}, 7), 30.0)
+        self.assertIsNone(self.history.velocity({'full_name': 'octo/unknown'}, 7))
+        self.history.record([{'full_name': 'octo/once', 'stargazers_count': 5}])
+        self.assertIsNone(self.history.velocity({'full_name': 'octo/once'}, 1))
+
+    def test_retention(self):
+        """测试超过保留期的快照被清理"""
+        history = StarHistory(os.path.join(self.temp_dir, 'short.sqlite3'), retention_days=10, today=self.today)
+        history.record([{'full_name': 'octo/old', 'stargazers_count': 1}], day=self.day(20))
+        history.record([{'full_name': 'octo/old', 'stargazers_count': 50}])
+        self.assertIsNone(history.velocity({'full_name': 'octo/old'}, 30))
+        history.close()
+
+    def test_ranking_uses_measured_velocity(self):
+        """测试搜索排序使用历史快照的真实增速而不是总星数/项目天数"""
+        now = datetime.datetime.now()
+        created = (now - datetime.timedelta(days=300)).strftime('%Y-%m-%dT%H:%M:%SZ')
+        updated = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        def repo(name, stars):
+            return {'name': name, 'full_name': f'octo/{name}', 'html_url': f'https://github.com/octo/{name}',
+                    'description': name, 'stargazers_count': stars, 'forks_count': 0,
+                    'created_at': created, 'updated_at': updated, '_source': 'trending'}
+
+        history = StarHistory(os.path.join(self.temp_dir, 'rank.sqlite3'))
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        history.record([repo('steady', 9000), repo('spike', 1000)], day=yesterday)
+
+        deduplicator = Mock()
+        deduplicator.get_project_statistics.return_value = {'total_projects': 0}
+        deduplicator.filter_new_projects.side_effect = lambda projects, on_duplicate=None: projects
+        analyzer = crypto_analyzer_module.ClaudeAgentAnalyzer(
+            None, Mock(), deduplicator=deduplicator,
+            candidate_pool=CandidatePool(os.path.join(self.temp_dir, 'featured.json')), star_history=history
+        )
+        with patch.object(analyzer, '_search_by_trending_now', return_value=[repo('steady', 9010), repo('spike', 1500)]), \
+                patch.object(analyzer, '_search_by_claude_keywords', return_value=[]):
+            ranked = analyzer.search_claude_agents(max_projects=2)
+
+        self.assertEqual([p['name'] for p in ranked], ['spike', 'steady'])
+        self.assertEqual(ranked[0]['_stars_velocity'], 500.0)
+        history.close()
+
+    def test_measured_velocity_ranks_before_estimates(self):
+        """测试没有历史快照的估算增速（生命周期平均）不与实测增速混合排序"""
+        now = datetime.datetime.now()
+        updated = now.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+        def repo(name, stars, age_days):
+            created = (now - datetime.timedelta(days=age_days)).strftime('%Y-%m-%dT%H:%M:%SZ')
+            return {'name': name, 'full_name': f'octo/{name}', 'html_url': f'https://github.com/octo/{name}',
+                    'description': name, 'stargazers_count': stars, 'forks_count': 0,
+                    'created_at': created, 'updated_at': updated, '_source': 'trending'}
+
+        history = StarHistory(os.path.join(self.temp_dir, 'mixed.sqlite3'))
+        yesterday = datetime.date.today() - datetime.timedelta(days=1)
+        history.record([repo('spike', 1000, 300), repo('steady', 9000, 300)], day=yesterday)
+
+        deduplicator = Mock()
+        deduplicator.get_project_statistics.return_value = {'total_projects': 0}
+        deduplicator.filter_new_projects.side_effect = lambda projects, on_duplicate=None: projects
+        analyzer = crypto_analyzer_module.ClaudeAgentAnalyzer(
+            None, Mock(), deduplicator=deduplicator,
+            candidate_pool=CandidatePool(os.path.join(self.temp_dir, 'featured.json')), star_history=history
+        )
+        # viral 没有历史快照，估算值 4000/天 高于任何实测增速
+        searched = [repo('viral', 8000, 2), repo('steady', 9010, 300), repo('spike', 1500, 300)]
+        with patch.object(analyzer, '_search_by_trending_now', return_value=searched), \
+                patch.object(analyzer, '_search_by_claude_keywords', return_value=[]):
+            ranked = analyzer.search_claude_agents(max_projects=3)
+
+        self.assertEqual([p['name'] for p in ranked], ['spike', 'steady', 'viral'])
+        self.assertEqual([p['_velocity_source'] for p in ranked], ['measured', 'measured', 'estimated'])
+        self.assertGreater(ranked[2]['_stars_velocity'], ranked[0]['_stars_velocity'])
+        history.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
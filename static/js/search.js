@@ -1,7 +1,195 @@
+// Sharded search index: a small manifest, per-month document shards and an
+// inverted index split into term buckets, all loaded lazily
+// (generated by scripts/build_search_index.py into static/search/)
+const TOKEN_RUN = /[a-z0-9]+|[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+/g;
+const TERM_BUCKETS = 16;
+const FIELD_TITLE = 1;
+const FIELD_TAG = 2;
+
+class ShardedSearchIndex {
+    constructor(manifestUrl = '/search/manifest.json') {
+        this.manifestUrl = manifestUrl;
+        this.manifestPromise = null;
+        this.shardPromises = new Map();
+        this.bucketPromises = new Map();
+    }
+    
+    /**
+     * Split a query like build_search_index.tokenize: ASCII words and CJK
+     * bigrams; only the last word is matched as a prefix (it may still be
+     * being typed). Returns null when the query has a part the index cannot
+     * answer (a single CJK character or a one-letter word).
+     */
+    static tokenize(text) {
+        const terms = [];
+        const runs = text.toLowerCase().match(TOKEN_RUN) || [];
+        for (const [index, run] of runs.entries()) {
+            if (run.length < 2) return null;
+            if (/^[a-z0-9]/.test(run)) {
+                terms.push({ term: run, prefix: index === runs.length - 1 });
+            } else {
+                for (let i = 0; i < run.length - 1; i++) {
+                    terms.push({ term: run.slice(i, i + 2), prefix: false });
+                }
+            }
+        }
+        return terms.length > 0 ? terms : null;
+    }
+    
+    static termBucket(term) {
+        const code = term.codePointAt(0);
+        return code < 128 ? term[0] : `c${(code % TERM_BUCKETS).toString(16)}`;
+    }
+    
+    static shared() {
+        if (!window.shardedSearchIndex) {
+            window.shardedSearchIndex = new ShardedSearchIndex();
+        }
+        return window.shardedSearchIndex;
+    }
+    
+    loadManifest() {
+        if (!this.manifestPromise) {
+            this.manifestPromise = fetch(this.manifestUrl)
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .catch(error => {
+                    this.manifestPromise = null; // allow a retry on the next search
+                    throw error;
+                });
+        }
+        return this.manifestPromise;
+    }
+    
+    loadShard(shard) {
+        if (!this.shardPromises.has(shard.id)) {
+            // the content hash busts stale CDN/browser copies when a shard changes
+            const promise = fetch(`${shard.url}?v=${shard.hash}`)
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .catch(error => {
+                    this.shardPromises.delete(shard.id);
+                    throw error;
+                });
+            this.shardPromises.set(shard.id, promise);
+        }
+        return this.shardPromises.get(shard.id);
+    }
+    
+    loadBucket(manifest, bucket) {
+        const hash = manifest.terms.buckets[bucket];
+        if (!hash) return Promise.resolve({});
+        if (!this.bucketPromises.has(bucket)) {
+            const promise = fetch(`${manifest.terms.url}${bucket}.json?v=${hash}`)
+                .then(response => {
+                    if (!response.ok) throw new Error(`HTTP ${response.status}`);
+                    return response.json();
+                })
+                .catch(error => {
+                    this.bucketPromises.delete(bucket);
+                    throw error;
+                });
+            this.bucketPromises.set(bucket, promise);
+        }
+        return this.bucketPromises.get(bucket);
+    }
+    
+    /**
+     * Look up a query in the inverted index. Every query term must match
+     * (title hits weigh 3, tag hits 2, excerpt hits 1).
+     * Returns matching doc ids ordered by score (or newest first with
+     * order: 'recent'), or null when the query cannot use the index.
+     */
+    async lookup(query, { order = 'score' } = {}) {
+        const terms = ShardedSearchIndex.tokenize(query);
+        const manifest = await this.loadManifest();
+        if (!terms || !manifest.terms) return null;
+        
+        const buckets = await Promise.all(
+            terms.map(({ term }) => this.loadBucket(manifest, ShardedSearchIndex.termBucket(term)))
+        );
+        
+        let scores = null;
+        terms.forEach(({ term, prefix }, i) => {
+            // union of postings for this term (all completions for a prefix)
+            const fields = new Map();
+            const keys = prefix ? Object.keys(buckets[i]).filter(key => key.startsWith(term)) : [term];
+            for (const key of keys) {
+                let value = 0;
+                for (const delta of buckets[i][key] || []) {
+                    value += delta;
+                    const docId = value >> 2;
+                    fields.set(docId, (fields.get(docId) || 0) | (value & 3));
+                }
+            }
+            
+            const next = new Map();
+            for (const [docId, bits] of fields) {
+                if (scores && !scores.has(docId)) continue;
+                const weight = bits & FIELD_TITLE ? 3 : bits & FIELD_TAG ? 2 : 1;
+                next.set(docId, (scores ? scores.get(docId) : 0) + weight);
+            }
+            scores = next;
+        });
+        
+        const ids = Array.from(scores.keys());
+        // doc ids are assigned oldest first, so a higher id is a newer post
+        return order === 'recent'
+            ? ids.sort((a, b) => b - a)
+            : ids.sort((a, b) => scores.get(b) - scores.get(a) || b - a);
+    }
+    
+    /** Resolve doc ids to documents, loading only the shards they live in. */
+    async getDocuments(ids) {
+        const manifest = await this.loadManifest();
+        // each shard covers doc ids [offset, offset + count)
+        const locate = docId => manifest.shards.findIndex(
+            shard => docId >= shard.offset && docId < shard.offset + shard.count
+        );
+        const needed = Array.from(new Set(ids.map(locate)));
+        const loaded = new Map(await Promise.all(
+            needed.map(async index => [index, await this.loadShard(manifest.shards[index])])
+        ));
+        return ids.map(docId => {
+            const index = locate(docId);
+            return loaded.get(index)[docId - manifest.shards[index].offset];
+        });
+    }
+    
+    /**
+     * Scan shards newest first, reporting matches after each shard.
+     * Stops early once isEnough(results) returns true, so a short result
+     * list usually only needs the most recent shard or two.
+     */
+    async search(predicate, { onProgress = null, isEnough = null } = {}) {
+        const manifest = await this.loadManifest();
+        const results = [];
+        
+        for (const shard of manifest.shards) {
+            const documents = await this.loadShard(shard);
+            for (const item of documents) {
+                if (predicate(item)) results.push(item);
+            }
+            if (onProgress) onProgress(results, false);
+            if (isEnough && isEnough(results)) break;
+        }
+        
+        if (onProgress) onProgress(results, true);
+        return results;
+    }
+}
+
+window.ShardedSearchIndex = ShardedSearchIndex;
+
 // Global search functionality
 class SearchManager {
     constructor() {
-        this.searchIndex = null;
+        this.searchIndex = ShardedSearchIndex.shared();
+        this.searchToken = 0;
         this.searchOverlay = document.getElementById('search-overlay');
         this.searchInput = document.getElementById('search-input');
         this.searchResults = document.getElementById('search-results');
@@ -11,17 +199,9 @@ class SearchManager {
         this.init();
     }
     
-    async init() {
-        try {
-            // Load search index
-            const response = await fetch('/index.json');
-            this.searchIndex = await response.json();
-            
-            // Bind events
-            this.bindEvents();
-        } catch (error) {
-            console.error('Failed to load search index:', error);
-        }
+    init() {
+        // The index is fetched on first use, not on every page load
+        this.bindEvents();
     }
     
     bindEvents() {
@@ -62,6 +242,8 @@ class SearchManager {
     openSearch() {
         if (this.searchOverlay) {
             this.searchOverlay.classList.add('active');
+            // Prefetch the manifest while the user starts typing
+            this.searchIndex.loadManifest().catch(error => console.error('Failed to load search index:', error));
             if (this.searchInput) {
                 this.searchInput.focus();
             }
@@ -83,9 +265,10 @@ class SearchManager {
     }
     
     performSearch(query) {
-        if (!this.searchResults || !this.searchIndex) return;
+        if (!this.searchResults) return;
         
         const trimmedQuery = query.trim().toLowerCase();
+        const token = ++this.searchToken;
         
         if (!trimmedQuery) {
             this.searchResults.innerHTML = '';
@@ -97,20 +280,43 @@ class SearchManager {
             return;
         }
         
-        // 阶段1: 基础关键词匹配
-        let results = this.searchIndex.filter(item => {
+        // 阶段1: 基础关键词匹配（分片从新到旧加载）
+        const matches = item => {
             return item.title.toLowerCase().includes(trimmedQuery) ||
                    item.content.toLowerCase().includes(trimmedQuery) ||
                    (item.tags && item.tags.some(tag => tag.toLowerCase().includes(trimmedQuery)));
-        });
+        };
         
         // 阶段2: 相似文章去重 - 同系列文章只保留最新
-        results = this.deduplicateSimilarArticles(results);
+        // 阶段3: 限制结果数量；分片按时间倒序，凑满10条后更旧的分片不会改变结果
+        const finalize = results => this.deduplicateSimilarArticles(results.slice()).slice(0, 10);
         
-        // 阶段3: 限制结果数量
-        results = results.slice(0, 10);
+        const scan = () => this.searchIndex.search(matches, {
+            isEnough: results => finalize(results).length >= 10,
+            onProgress: (results, done) => {
+                if (token !== this.searchToken) return; // a newer query is running
+                if (done || results.length > 0) {
+                    this.displayResults(finalize(results), trimmedQuery);
+                }
+            }
+        });
         
-        this.displayResults(results, trimmedQuery);
+        // Inverted index first; queries it cannot answer fall back to the scan
+        this.searchIndex.lookup(trimmedQuery, { order: 'recent' }).then(async ids => {
+            if (ids === null) return scan();
+            let results = [];
+            for (let start = 0; start < ids.length && finalize(results).length < 10; start += 20) {
+                results = results.concat(await this.searchIndex.getDocuments(ids.slice(start, start + 20)));
+            }
+            if (token === this.searchToken) {
+                this.displayResults(finalize(results), trimmedQuery);
+            }
+        }).catch(error => {
+            console.error('Failed to load search index:', error);
+            if (token === this.searchToken) {
+                this.searchResults.innerHTML = '<div class="search-message">Search is currently unavailable.</div>';
+            }
+        });
     }
     
     /**